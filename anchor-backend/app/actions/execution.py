@@ -0,0 +1,132 @@
+"""
+Execution layer between the runner and action code. Synchronous work (Action.run through the
+pipeline, urllib-based executors) runs on a bounded thread pool so a slow exchange call does not
+stall the worker loop (heartbeats, kill-switch checks, other in-flight commands). AsyncAction is
+awaited on the loop. A per-command-type semaphore caps in-flight executions, so one slow venue
+cannot take every thread from the fast command types.
+
+Env:
+  ACTION_EXECUTOR_THREADS (8)       thread pool size
+  ACTION_CONCURRENCY_DEFAULT (4)    in-flight executions per command type
+  ACTION_CONCURRENCY_<TYPE>         override for one type, e.g. ACTION_CONCURRENCY_ORDER=2
+
+A thread cannot be cancelled: work handed to the pool runs to completion (executors carry their own
+HTTP timeouts), which keeps an order request from being abandoned half-way.
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.actions.pipeline import run_action_with_pipeline, run_action_with_pipeline_async
+from app.actions.protocol import ActionOutput, AsyncAction
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int((os.getenv(name) or "").strip() or default)
+    except ValueError:
+        return default
+
+
+class _Lane:
+    """Semaphore plus counters for one command type."""
+
+    __slots__ = ("limit", "loop", "sem", "in_flight", "waiting", "completed")
+
+    def __init__(self, limit: int, loop: asyncio.AbstractEventLoop) -> None:
+        self.limit = limit
+        self.loop = loop
+        self.sem = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+
+
+class ActionExecutor:
+    """Thread pool plus per-command-type lanes; stats() is reported in the worker heartbeat."""
+
+    def __init__(self, max_threads: Optional[int] = None, default_limit: Optional[int] = None):
+        self.max_threads = max(1, max_threads if max_threads is not None else _env_int("ACTION_EXECUTOR_THREADS", 8))
+        self.default_limit = max(
+            1, default_limit if default_limit is not None else _env_int("ACTION_CONCURRENCY_DEFAULT", 4)
+        )
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lanes: Dict[str, _Lane] = {}
+
+    def limit_for(self, cmd_type: str) -> int:
+        key = (cmd_type or "").strip().upper()
+        return max(1, _env_int(f"ACTION_CONCURRENCY_{key}", self.default_limit)) if key else self.default_limit
+
+    def _lane(self, cmd_type: str) -> _Lane:
+        key = (cmd_type or "").strip().upper()
+        loop = asyncio.get_running_loop()
+        lane = self._lanes.get(key)
+        # asyncio.Semaphore belongs to one loop; a new loop (tests, CLI re-runs) gets fresh lanes.
+        if lane is None or lane.loop is not loop:
+            lane = self._lanes[key] = _Lane(self.limit_for(key), loop)
+        return lane
+
+    def _threads(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="action")
+        return self._pool
+
+    async def _in_lane(self, cmd_type: str, run: Callable[[], Any]) -> Any:
+        lane = self._lane(cmd_type)
+        lane.waiting += 1
+        try:
+            await lane.sem.acquire()
+        finally:
+            lane.waiting -= 1
+        lane.in_flight += 1
+        try:
+            return await run()
+        finally:
+            lane.in_flight -= 1
+            lane.completed += 1
+            lane.sem.release()
+
+    async def run_blocking(self, cmd_type: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) on the pool within cmd_type's concurrency limit. Re-raises fn's exception."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        return await self._in_lane(cmd_type, lambda: loop.run_in_executor(self._threads(), call))
+
+    async def run_action(
+        self, action: Any, ctx: Any, command: Dict[str, Any], default_steps_fn: Any
+    ) -> ActionOutput:
+        """Pipeline for one action: awaited for AsyncAction, on the thread pool otherwise. Raises like the pipeline."""
+        cmd_type = getattr(ctx, "cmd_type", "") or str(command.get("type") or "")
+        if isinstance(action, AsyncAction):
+            return await self._in_lane(
+                cmd_type, lambda: run_action_with_pipeline_async(action, ctx, command, default_steps_fn)
+            )
+        return await self.run_blocking(cmd_type, run_action_with_pipeline, action, ctx, command, default_steps_fn)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threads": self.max_threads,
+            "default_limit": self.default_limit,
+            "lanes": {
+                key: {"limit": lane.limit, "in_flight": lane.in_flight, "waiting": lane.waiting, "completed": lane.completed}
+                for key, lane in sorted(self._lanes.items())
+            },
+        }
+
+    def shutdown(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+_action_executor: Optional[ActionExecutor] = None
+
+
+def get_action_executor() -> ActionExecutor:
+    """The process-wide executor (created on first use, sized from env)."""
+    global _action_executor
+    if _action_executor is None:
+        _action_executor = ActionExecutor()
+    return _action_executor
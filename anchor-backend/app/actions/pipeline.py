@@ -1,6 +1,7 @@
 """
 Action Pipeline: run actions through steps (validate → execute → postprocess).
 StepOutput = ActionOutput; any step returning ok=False stops the pipeline.
+run_pipeline_async is the same loop for AsyncAction: steps with a run_async() are awaited.
 """
 from typing import Any, Dict, List, Optional
 
@@ -25,6 +26,25 @@ class Step:
         raise NotImplementedError
 
 
+def _step_exception(step: Any, e: Exception) -> ActionOutput:
+    return {
+        "ok": False,
+        "result": None,
+        "error": {
+            "code": "STEP_EXCEPTION",
+            "step": getattr(step, "name", "?"),
+            "message": str(e),
+        },
+    }
+
+
+_STEP_FAILED: ActionOutput = {
+    "ok": False,
+    "result": None,
+    "error": {"code": "STEP_FAILED", "message": "step returned no output"},
+}
+
+
 def run_pipeline(
     steps: List[Step],
     ctx: Any,
@@ -39,21 +59,30 @@ def run_pipeline(
         try:
             out = step.run(ctx, command_dict, out)
         except Exception as e:
-            return {
-                "ok": False,
-                "result": None,
-                "error": {
-                    "code": "STEP_EXCEPTION",
-                    "step": getattr(step, "name", "?"),
-                    "message": str(e),
-                },
-            }
+            return _step_exception(step, e)
+        if out is None or not out.get("ok"):
+            return out if out is not None else dict(_STEP_FAILED)
+    return out or {"ok": False, "result": None, "error": None}
+
+
+async def run_pipeline_async(
+    steps: List[Step],
+    ctx: Any,
+    command_dict: Dict[str, Any],
+) -> ActionOutput:
+    """run_pipeline for AsyncAction: a step's run_async() is awaited when it has one, else run() is called."""
+    out: Optional[ActionOutput] = None
+    for step in steps:
+        try:
+            run_async = getattr(step, "run_async", None)
+            if run_async is not None:
+                out = await run_async(ctx, command_dict, out)
+            else:
+                out = step.run(ctx, command_dict, out)
+        except Exception as e:
+            return _step_exception(step, e)
         if out is None or not out.get("ok"):
-            return out if out is not None else {
-                "ok": False,
-                "result": None,
-                "error": {"code": "STEP_FAILED", "message": "step returned no output"},
-            }
+            return out if out is not None else dict(_STEP_FAILED)
     return out or {"ok": False, "result": None, "error": None}
 
 
@@ -70,3 +99,16 @@ def run_action_with_pipeline(
     if steps is None:
         steps = default_steps_fn(action, ctx)
     return run_pipeline(steps, ctx, command_dict)
+
+
+async def run_action_with_pipeline_async(
+    action: Any,
+    ctx: Any,
+    command_dict: Dict[str, Any],
+    default_steps_fn: Any,
+) -> ActionOutput:
+    """Async twin of run_action_with_pipeline (AsyncAction)."""
+    steps = getattr(action, "steps", None)
+    if steps is None:
+        steps = default_steps_fn(action, ctx)
+    return await run_pipeline_async(steps, ctx, command_dict)
@@ -29,3 +29,22 @@ class Action(ABC):
         Returns: {"ok": bool, "result": dict|None, "error": dict|str|None}
         """
         pass
+
+
+class AsyncAction(Action):
+    """
+    Action whose work is awaitable (async HTTP, asyncpg, ...). The execution layer awaits
+    run_async() on the worker loop instead of sending it to the thread pool. run_async() must not raise.
+    """
+
+    def run(self, command: Dict[str, Any]) -> ActionOutput:
+        return {"ok": False, "result": None, "error": {"code": "ASYNC_ACTION", "message": "use run_async"}}
+
+    async def run_core_async(self, command: Dict[str, Any]) -> ActionOutput:
+        """Awaited by the pipeline ExecuteStep. Default delegates to run_async()."""
+        return await self.run_async(command)
+
+    @abstractmethod
+    async def run_async(self, command: Dict[str, Any]) -> ActionOutput:
+        """Async counterpart of run(). Returns: {"ok": bool, "result": dict|None, "error": dict|str|None}"""
+        pass
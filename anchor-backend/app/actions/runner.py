@@ -1,8 +1,10 @@
 """
 DomainCommandRunner: pick one command → [risk lockout] → policies → pipeline(action) → mark_done / mark_failed.
+Batch mode (run_batch): claim up to N commands in one pick, run each through the same path concurrently.
 Emits append-only events at key points (PICKED, POLICY_ALLOW/POLICY_BLOCK, RISK_LOCKOUT_BLOCK, ACTION_OK/ACTION_FAIL, MARK_DONE, MARK_FAILED, EXCEPTION).
 No prints inside; returns a result dict for the worker to log.
 """
+import asyncio
 import json
 import os
 import time
@@ -10,11 +12,12 @@ from urllib.parse import urlsplit
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from app.actions.context import ActionContext
-from app.actions.pipeline import run_action_with_pipeline
+from app.actions.execution import ActionExecutor, get_action_executor
 from app.actions.steps import default_pipeline_steps
 from app.executors import simulator_order_executor
 from app.executors import testnet_order_executor as real_testnet_executor
 from app.ops.kill_switch import get_kill_switch_state
+from app.policies.cooldown_cache import last_failures
 from app.policies.runner import run_policies
 from app.policies.protocol import Policy
 
@@ -204,6 +207,13 @@ class DomainCommandRunner:
     Encapsulates: pick one domain command, resolve action, run it, persist outcome.
     Reuses existing pick_one_domain, mark_done, mark_failed (injected).
     Optional append_event_fn(command_id, event_type, attempt, payload) for audit trail.
+    Optional pick_batch_fn(limit) -> list of picked rows enables run_batch(); max_in_flight caps
+    how many picked commands of one batch run concurrently.
+    Optional finalize_fn(command_id, status, attempt, event_type, event_payload, result=, reason=, detail=)
+    writes the terminal row state and its terminal event in one transaction; without it the runner
+    falls back to mark_done / mark_failed followed by a separate append_event.
+    Actions and blocking executors run through action_executor (default: the process-wide
+    ActionExecutor), so synchronous work happens on its thread pool, not on the worker loop.
     """
 
     def __init__(
@@ -218,6 +228,11 @@ class DomainCommandRunner:
         policy_engine: Any = None,
         is_lockout_blocked_fn: Optional[Callable[[str], Awaitable[Tuple[bool, str, str]]]] = None,
         risk_guard_fn: Optional[Callable[[str, dict], Awaitable[Tuple[bool, Optional[str]]]]] = None,
+        pick_batch_fn: Optional[Callable[[int], Awaitable[List[Dict[str, Any]]]]] = None,
+        batch_size: int = 1,
+        max_in_flight: Optional[int] = None,
+        finalize_fn: Optional[Callable[..., Awaitable[int]]] = None,
+        action_executor: Optional[ActionExecutor] = None,
     ):
         self._pick_one = pick_one_fn
         self._get_action = get_action_fn
@@ -229,6 +244,11 @@ class DomainCommandRunner:
         self._policy_engine = policy_engine
         self._is_lockout_blocked = is_lockout_blocked_fn
         self._risk_guard_fn = risk_guard_fn
+        self._pick_batch = pick_batch_fn
+        self._batch_size = max(1, int(batch_size or 1))
+        self._max_in_flight = max(1, int(max_in_flight or self._batch_size))
+        self._finalize = finalize_fn
+        self._executor = action_executor or get_action_executor()
 
     async def run_one(self) -> Optional[Dict[str, Any]]:
         """
@@ -242,7 +262,83 @@ class DomainCommandRunner:
             return None
         if not item:
             return None
+        return await self._run_picked(item)
 
+    async def run_batch(self) -> List[Dict[str, Any]]:
+        """
+        Pick up to batch_size PENDING commands in one claim and run them concurrently
+        (at most max_in_flight at a time). Each command gets the same events and terminal
+        write as run_one; attempt was already incremented once per command by the pick.
+        Returns [] if nothing was picked. Falls back to run_one when no pick_batch_fn is set.
+        """
+        if self._pick_batch is None:
+            res = await self.run_one()
+            return [res] if res is not None else []
+        try:
+            items = await self._pick_batch(self._batch_size)
+        except Exception:
+            return []
+        items = [item for item in (items or []) if item]
+        if not items:
+            return []
+
+        sem = asyncio.Semaphore(self._max_in_flight)
+
+        async def _bounded(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with sem:
+                return await self._run_picked(item)
+
+        outcomes = await asyncio.gather(*(_bounded(item) for item in items), return_exceptions=True)
+        errors = [o for o in outcomes if isinstance(o, BaseException)]
+        if errors:
+            raise errors[0]
+        return [o for o in outcomes if o is not None]
+
+    async def _finish_done(
+        self,
+        cid: str,
+        attempt: int,
+        result: Any,
+        event_payload: Dict[str, Any],
+    ) -> None:
+        """DONE + MARK_DONE. Raises if the state write fails (event append failures are swallowed)."""
+        if self._finalize is not None:
+            await self._finalize(cid, "DONE", attempt, "MARK_DONE", event_payload, result=result)
+            return
+        await self._mark_done(cid, result)
+        if self._append_event:
+            try:
+                await self._append_event(cid, "MARK_DONE", attempt, event_payload)
+            except Exception:
+                pass
+
+    async def _finish_failed(
+        self,
+        cid: str,
+        attempt: int,
+        reason: str,
+        detail: Optional[Dict[str, Any]],
+        event_type: str,
+        event_payload: Dict[str, Any],
+    ) -> None:
+        """FAILED + terminal event (MARK_FAILED or a *_BLOCK). Raises if the state write fails."""
+        if self._finalize is not None:
+            await self._finalize(
+                cid, "FAILED", attempt, event_type, event_payload, reason=reason, detail=detail
+            )
+        else:
+            await self._mark_failed(cid, reason, detail)
+            if self._append_event:
+                try:
+                    await self._append_event(cid, event_type, attempt, event_payload)
+                except Exception:
+                    pass
+        if event_type == "MARK_FAILED":
+            # Feeds CooldownAfterFailPolicy (same events its old MAX(created_at) query matched).
+            await last_failures.record(str(event_payload.get("type") or ""))
+
+    async def _run_picked(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one already-picked command (status RUNNING, attempt incremented) to a terminal state."""
         cid = item.get("id") or ""
         cmd_type = (str(item.get("type") or "")).strip().upper()
         attempt = int(item.get("attempt") or 0)
@@ -260,17 +356,14 @@ class DomainCommandRunner:
                 blocked, lockout_until, lockout_reason = await self._is_lockout_blocked(cmd_type)
                 if blocked:
                     try:
-                        await self._mark_failed(cid, "RISK_LOCKOUT_ACTIVE", {"lockout_until": lockout_until, "lockout_reason": lockout_reason})
+                        await self._finish_failed(
+                            cid, attempt, "RISK_LOCKOUT_ACTIVE",
+                            {"lockout_until": lockout_until, "lockout_reason": lockout_reason},
+                            "RISK_LOCKOUT_BLOCK",
+                            {"type": cmd_type, "reason": "RISK_LOCKOUT_ACTIVE", "lockout_until": lockout_until, "lockout_reason": lockout_reason},
+                        )
                     except Exception:
                         pass
-                    if self._append_event:
-                        try:
-                            await self._append_event(
-                                cid, "RISK_LOCKOUT_BLOCK", attempt,
-                                {"type": cmd_type, "reason": "RISK_LOCKOUT_ACTIVE", "lockout_until": lockout_until, "lockout_reason": lockout_reason},
-                            )
-                        except Exception:
-                            pass
                     return {"id": cid, "type": cmd_type, "final_status": "FAILED"}
             except Exception:
                 pass
@@ -280,17 +373,12 @@ class DomainCommandRunner:
                 ok, reason = await self._risk_guard_fn(cmd_type, payload)
                 if not ok and reason:
                     try:
-                        await self._mark_failed(cid, reason, {"reason": reason})
+                        await self._finish_failed(
+                            cid, attempt, reason, {"reason": reason},
+                            "RISK_HARD_LIMITS_BLOCK", {"type": cmd_type, "reason": reason},
+                        )
                     except Exception:
                         pass
-                    if self._append_event:
-                        try:
-                            await self._append_event(
-                                cid, "RISK_HARD_LIMITS_BLOCK", attempt,
-                                {"type": cmd_type, "reason": reason},
-                            )
-                        except Exception:
-                            pass
                     return {"id": cid, "type": cmd_type, "final_status": "FAILED"}
             except Exception:
                 pass
@@ -325,14 +413,12 @@ class DomainCommandRunner:
                 try:
                     reason = decision.get("code") or "POLICY_BLOCK"
                     detail = decision.get("detail") or {"message": decision.get("message")}
-                    await self._mark_failed(cid, reason, detail)
+                    await self._finish_failed(
+                        cid, attempt, reason, detail,
+                        "MARK_FAILED", {"type": cmd_type, "attempt": attempt, "error": decision},
+                    )
                 except Exception:
                     pass
-                if self._append_event:
-                    try:
-                        await self._append_event(cid, "MARK_FAILED", attempt, {"type": cmd_type, "attempt": attempt, "error": decision})
-                    except Exception:
-                        pass
                 return {"id": cid, "type": cmd_type, "final_status": "FAILED"}
             if self._append_event and allowed:
                 try:
@@ -360,11 +446,13 @@ class DomainCommandRunner:
 
             try:
                 ex = BinanceFuturesTestnetExecutor()
-                mp = ex.get_mark_price(symbol)
+                mp = await self._executor.run_blocking(cmd_type, ex.get_mark_price, symbol)
                 qty = notional_to_qty(symbol=symbol, notional_usd=float(notional or 0), mark_price=mp)
                 px = mp * 1.005 if side == "BUY" else mp * 0.995
 
-                resp = ex.place_limit_ioc(symbol=symbol, side=side, quantity=qty, price=px)
+                resp = await self._executor.run_blocking(
+                    cmd_type, ex.place_limit_ioc, symbol=symbol, side=side, quantity=qty, price=px
+                )
                 st = (resp.get("status") or "").upper()
                 if st != "FILLED":
                     raise RuntimeError(f"BINANCE_ORDER_NOT_FILLED:{resp}")
@@ -389,12 +477,7 @@ class DomainCommandRunner:
                         await self._append_event(cid, "ACTION_OK", attempt, {"type": cmd_type, "binance": True})
                     except Exception:
                         pass
-                await self._mark_done(cid, result)
-                if self._append_event:
-                    try:
-                        await self._append_event(cid, "MARK_DONE", attempt, {"type": cmd_type})
-                    except Exception:
-                        pass
+                await self._finish_done(cid, attempt, result, {"type": cmd_type})
                 return {"id": cid, "type": cmd_type, "final_status": "DONE"}
             except Exception as e:
                 err_str = str(e)
@@ -403,12 +486,10 @@ class DomainCommandRunner:
                         await self._append_event(cid, "ACTION_FAIL", attempt, {"type": cmd_type, "error": err_str})
                     except Exception:
                         pass
-                await self._mark_failed(cid, err_str, {"error": err_str})
-                if self._append_event:
-                    try:
-                        await self._append_event(cid, "MARK_FAILED", attempt, {"type": cmd_type, "error": err_str})
-                    except Exception:
-                        pass
+                await self._finish_failed(
+                    cid, attempt, err_str, {"error": err_str},
+                    "MARK_FAILED", {"type": cmd_type, "error": err_str},
+                )
                 return {"id": cid, "type": cmd_type, "final_status": "FAILED"}
 
         action = self._get_action(cmd_type)
@@ -419,18 +500,16 @@ class DomainCommandRunner:
                 except Exception:
                     pass
             try:
-                await self._mark_failed(cid, "UNKNOWN_TYPE", {"type": cmd_type})
+                await self._finish_failed(
+                    cid, attempt, "UNKNOWN_TYPE", {"type": cmd_type},
+                    "MARK_FAILED", {"type": cmd_type, "attempt": attempt, "reason": "UNKNOWN_TYPE"},
+                )
             except Exception:
                 pass
-            if self._append_event:
-                try:
-                    await self._append_event(cid, "MARK_FAILED", attempt, {"type": cmd_type, "attempt": attempt, "reason": "UNKNOWN_TYPE"})
-                except Exception:
-                    pass
             return {"id": cid, "type": cmd_type, "final_status": "FAILED"}
 
         try:
-            out = run_action_with_pipeline(action, context, command, default_pipeline_steps)
+            out = await self._executor.run_action(action, context, command, default_pipeline_steps)
         except Exception as e:
             out = {
                 "ok": False,
@@ -474,7 +553,9 @@ class DomainCommandRunner:
                     )
                 elif executor_mode == "real":
                     out, emit_testnet_requested, emit_testnet_terminal_type, emit_testnet_terminal_payload = (
-                        real_testnet_executor.run_real_testnet_order_request(
+                        await self._executor.run_blocking(
+                            cmd_type,
+                            real_testnet_executor.run_real_testnet_order_request,
                             transport_input,
                             self._now_ts(),
                         )
@@ -571,12 +652,10 @@ class DomainCommandRunner:
                 result = out.get("result")
                 if result is not None and "ts" not in result:
                     result = {**result, "ts": self._now_ts()}
-                await self._mark_done(cid, result)
-                if self._append_event:
-                    try:
-                        await self._append_event(cid, "MARK_DONE", attempt, {"type": cmd_type, "attempt": attempt, "result_summary": _result_summary(result)})
-                    except Exception:
-                        pass
+                await self._finish_done(
+                    cid, attempt, result,
+                    {"type": cmd_type, "attempt": attempt, "result_summary": _result_summary(result)},
+                )
                 return {"id": cid, "type": cmd_type, "final_status": "DONE"}
             else:
                 err = out.get("error")
@@ -586,12 +665,10 @@ class DomainCommandRunner:
                     else str(err or "ACTION_FAILED")
                 )
                 detail = err if isinstance(err, dict) else {"error": str(err)}
-                await self._mark_failed(cid, reason, detail)
-                if self._append_event:
-                    try:
-                        await self._append_event(cid, "MARK_FAILED", attempt, {"type": cmd_type, "attempt": attempt, "error": detail})
-                    except Exception:
-                        pass
+                await self._finish_failed(
+                    cid, attempt, reason, detail,
+                    "MARK_FAILED", {"type": cmd_type, "attempt": attempt, "error": detail},
+                )
                 return {"id": cid, "type": cmd_type, "final_status": "FAILED"}
         except Exception as e:
             if self._append_event:
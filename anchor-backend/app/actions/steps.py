@@ -33,7 +33,7 @@ class ValidateStep(Step):
 
 
 class ExecuteStep(Step):
-    """Run action core logic (run_core)."""
+    """Run action core logic (run_core; run_core_async for AsyncAction)."""
 
     name = "execute"
 
@@ -52,6 +52,18 @@ class ExecuteStep(Step):
             return {"ok": False, "result": None, "error": {"code": "NO_RUN_CORE", "message": "action has no run_core"}}
         return run_core(command_dict)
 
+    async def run_async(
+        self,
+        ctx: Any,
+        command_dict: Dict[str, Any],
+        prev_output: Optional[ActionOutput] = None,
+    ) -> ActionOutput:
+        """AsyncAction: await run_core_async; plain actions fall back to run()."""
+        run_core_async = getattr(self._action, "run_core_async", None)
+        if run_core_async is None:
+            return self.run(ctx, command_dict, prev_output)
+        return await run_core_async(command_dict)
+
 
 class PostprocessStep(Step):
     """If ok=True and result is dict, add ts if missing; do not break existing result."""
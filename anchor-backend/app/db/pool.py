@@ -0,0 +1,297 @@
+"""
+Connection pool management shared by the API and the worker. One process has at most one asyncpg
+pool (get_pg_pool: API handlers, state_store) and one SQLAlchemy engine (app.db.engine: worker,
+policies, ops routers), both sized from the same env and reporting into pool_metrics.
+
+Env:
+  DB_POOL_MIN_SIZE (1) / DB_POOL_MAX_SIZE (5)   asyncpg pool bounds; SQLAlchemy pool_size = max
+  DB_POOL_MAX_OVERFLOW (10)                     SQLAlchemy extra connections beyond pool_size
+  DB_POOL_MAX_INACTIVE_SEC (300)                close idle asyncpg connections after this long
+  DB_STATEMENT_CACHE_SIZE (1024)                per-connection prepared statement cache (both)
+  DB_POOL_WARMUP (= min size)                   connections opened by warm_pools() at startup
+  DB_POOL_WARMUP_TIMEOUT_SEC (5)                warmup gives up after this long (DB down: start anyway)
+Metrics (pool_metrics_snapshot): acquire wait (asyncpg), query duration, in-use and idle connections.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int((os.getenv(name) or "").strip() or default)
+    except ValueError:
+        return default
+
+
+def pool_config() -> Dict[str, int]:
+    min_size = max(0, _env_int("DB_POOL_MIN_SIZE", 1))
+    max_size = max(1, min_size, _env_int("DB_POOL_MAX_SIZE", 5))
+    return {
+        "min_size": min_size,
+        "max_size": max_size,
+        "max_overflow": max(0, _env_int("DB_POOL_MAX_OVERFLOW", 10)),
+        "max_inactive_sec": max(0, _env_int("DB_POOL_MAX_INACTIVE_SEC", 300)),
+        "statement_cache_size": max(0, _env_int("DB_STATEMENT_CACHE_SIZE", 1024)),
+        "warmup": min(max_size, max(0, _env_int("DB_POOL_WARMUP", min_size))),
+        "warmup_timeout_sec": max(1, _env_int("DB_POOL_WARMUP_TIMEOUT_SEC", 5)),
+    }
+
+
+def normalize_asyncpg_dsn(dsn: str) -> str:
+    dsn = (dsn or "").strip()
+    if dsn.startswith("postgresql+asyncpg://"):
+        return "postgresql://" + dsn[len("postgresql+asyncpg://") :]
+    return dsn
+
+
+class _Timing:
+    """count / avg / max / last in ms."""
+
+    __slots__ = ("count", "total_ms", "max_ms", "last_ms")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def record(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+        }
+
+
+class PoolMetrics:
+    """Counters for one pool (label): acquire wait, query duration, in-use connections."""
+
+    def __init__(self) -> None:
+        self.acquire = _Timing()
+        self.query = _Timing()
+        self.in_use = 0
+        self.waiting = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "acquire_wait": self.acquire.snapshot(),
+            "query": self.query.snapshot(),
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+        }
+
+
+pool_metrics: Dict[str, PoolMetrics] = {"asyncpg": PoolMetrics(), "sqlalchemy": PoolMetrics()}
+
+
+class _TimedAcquire:
+    def __init__(self, pool: "InstrumentedPool", timeout: Optional[float]):
+        self._pool = pool
+        self._timeout = timeout
+        self._cm: Any = None
+
+    async def __aenter__(self):
+        m = self._pool.metrics
+        t0 = time.perf_counter()
+        m.waiting += 1
+        try:
+            self._cm = self._pool.raw.acquire(timeout=self._timeout)
+            conn = await self._cm.__aenter__()
+        finally:
+            m.waiting -= 1
+        m.acquire.record((time.perf_counter() - t0) * 1000.0)
+        m.in_use += 1
+        return conn
+
+    async def __aexit__(self, *exc):
+        self._pool.metrics.in_use -= 1
+        return await self._cm.__aexit__(*exc)
+
+
+class InstrumentedPool:
+    """asyncpg Pool wrapper: acquire() is timed; everything else is the underlying pool."""
+
+    def __init__(self, raw: Any, metrics: PoolMetrics):
+        self.raw = raw
+        self.metrics = metrics
+
+    def acquire(self, *, timeout: Optional[float] = None) -> _TimedAcquire:
+        return _TimedAcquire(self, timeout)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
+
+    def stats(self) -> Dict[str, Any]:
+        out = self.metrics.snapshot()
+        try:
+            out.update(
+                size=self.raw.get_size(),
+                idle=self.raw.get_idle_size(),
+                min_size=self.raw.get_min_size(),
+                max_size=self.raw.get_max_size(),
+            )
+        except Exception:
+            pass
+        return out
+
+
+def _record_query(metrics: PoolMetrics):
+    def on_query(record: Any) -> None:
+        elapsed = getattr(record, "elapsed", None)
+        if elapsed is not None:
+            metrics.query.record(float(elapsed) * 1000.0)
+    return on_query
+
+
+_pg_pool: Optional[InstrumentedPool] = None
+_pg_pool_lock: Optional[asyncio.Lock] = None
+
+
+async def get_pg_pool() -> InstrumentedPool:
+    """The process-wide asyncpg pool (created on first use). Raises RuntimeError if unavailable."""
+    global _pg_pool, _pg_pool_lock
+    if _pg_pool is not None:
+        return _pg_pool
+    if _pg_pool_lock is None:
+        _pg_pool_lock = asyncio.Lock()
+    async with _pg_pool_lock:
+        if _pg_pool is not None:
+            return _pg_pool
+        try:
+            import asyncpg
+        except ImportError:
+            raise RuntimeError("asyncpg is not installed in the backend container.")
+        dsn = normalize_asyncpg_dsn(os.getenv("DATABASE_URL", ""))
+        if not dsn:
+            raise RuntimeError("DATABASE_URL is not set.")
+        cfg = pool_config()
+        metrics = pool_metrics["asyncpg"]
+
+        async def init(conn: Any) -> None:
+            conn.add_query_logger(_record_query(metrics))
+
+        raw = await asyncpg.create_pool(
+            dsn=dsn,
+            min_size=cfg["min_size"],
+            max_size=cfg["max_size"],
+            max_inactive_connection_lifetime=cfg["max_inactive_sec"],
+            statement_cache_size=cfg["statement_cache_size"],
+            init=init,
+        )
+        _pg_pool = InstrumentedPool(raw, metrics)
+        return _pg_pool
+
+
+async def close_pg_pool() -> None:
+    global _pg_pool
+    pool, _pg_pool = _pg_pool, None
+    if pool is not None:
+        await pool.raw.close()
+
+
+def engine_options() -> Dict[str, Any]:
+    """create_async_engine kwargs with the shared sizing (asyncpg dialect)."""
+    cfg = pool_config()
+    return {
+        "pool_pre_ping": True,
+        "pool_size": cfg["max_size"],
+        "max_overflow": cfg["max_overflow"],
+        "connect_args": {"prepared_statement_cache_size": cfg["statement_cache_size"]},
+    }
+
+
+def instrument_engine(engine: Any, metrics: Optional[PoolMetrics] = None) -> None:
+    """Count checked-out connections and time every cursor execute of an (async) SQLAlchemy engine."""
+    from sqlalchemy import event
+
+    metrics = metrics or pool_metrics["sqlalchemy"]
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "checkout")
+    def _checkout(*_args: Any) -> None:
+        metrics.in_use += 1
+
+    @event.listens_for(sync_engine, "checkin")
+    def _checkin(*_args: Any) -> None:
+        metrics.in_use = max(0, metrics.in_use - 1)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn: Any, *_args: Any) -> None:
+        conn.info.setdefault("_query_t0", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn: Any, *_args: Any) -> None:
+        stack = conn.info.get("_query_t0")
+        if stack:
+            metrics.query.record((time.perf_counter() - stack.pop()) * 1000.0)
+
+
+def _engine_stats(engine: Any) -> Dict[str, Any]:
+    # SQLAlchemy has no hook before a checkout waits, so the engine reports no acquire_wait.
+    out = pool_metrics["sqlalchemy"].snapshot()
+    out.pop("acquire_wait", None)
+    out.pop("waiting", None)
+    try:
+        pool = engine.sync_engine.pool
+        out.update(size=pool.size(), idle=pool.checkedin(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    except Exception:
+        pass
+    return out
+
+
+def pool_metrics_snapshot() -> Dict[str, Any]:
+    """Config plus per-pool stats for /ops/db-pool and the worker heartbeat. Never raises."""
+    out: Dict[str, Any] = {"config": pool_config()}
+    try:
+        if _pg_pool is not None:
+            out["asyncpg"] = _pg_pool.stats()
+        from app.db import engine
+        out["sqlalchemy"] = _engine_stats(engine)
+    except Exception as e:
+        out["error"] = str(e)
+    return out
+
+
+async def warm_pools(use_asyncpg: bool = True) -> int:
+    """Open DB_POOL_WARMUP connections on each pool so the first requests do not pay connect latency."""
+    cfg = pool_config()
+    n, timeout = cfg["warmup"], cfg["warmup_timeout_sec"]
+    if n <= 0:
+        return 0
+    opened = 0
+    try:
+        from sqlalchemy import text
+        from app.db import engine
+
+        async def touch_engine() -> None:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        # Held concurrently, so n distinct connections are opened.
+        await asyncio.wait_for(asyncio.gather(*(touch_engine() for _ in range(n))), timeout)
+        opened += n
+    except Exception as e:
+        print(f"[db/pool] engine warmup failed: {e}", flush=True)
+    if use_asyncpg:
+        try:
+            pool = await asyncio.wait_for(get_pg_pool(), timeout)
+
+            async def touch_pool() -> None:
+                async with pool.acquire() as conn:
+                    await conn.fetchval("SELECT 1")
+
+            await asyncio.wait_for(asyncio.gather(*(touch_pool() for _ in range(n))), timeout)
+            opened += n
+        except Exception as e:
+            print(f"[db/pool] asyncpg warmup failed: {e}", flush=True)
+    return opened
@@ -0,0 +1,222 @@
+"""
+Named registry of the hot SQL statements (worker pick/finalize, event insert, idempotency probe,
+policy and risk reads). Each statement is built once at import as a text() clause, so callers do
+not rebuild and re-hash the SQL on every command. Server-side preparing is unchanged: the SQL
+strings were already fixed, so the asyncpg driver reused prepared statements from its per-connection
+cache before as well (DB_STATEMENT_CACHE_SIZE, app/db/pool.py, sized well above len(STATEMENTS)).
+Use: await conn.execute(stmt("pick_one"), params). Benchmark: scripts/bench_prepared_statements.py.
+"""
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+STATEMENTS: Dict[str, TextClause] = {}
+# Positional ($n) variants for raw asyncpg pool callers; asyncpg caches them per connection.
+ASYNCPG_STATEMENTS: Dict[str, str] = {}
+
+
+def register(name: str, sql: str) -> TextClause:
+    if name in STATEMENTS:
+        raise ValueError(f"statement {name!r} already registered")
+    clause = text(sql)
+    STATEMENTS[name] = clause
+    return clause
+
+
+def register_asyncpg(name: str, sql: str) -> str:
+    if name in ASYNCPG_STATEMENTS:
+        raise ValueError(f"statement {name!r} already registered")
+    ASYNCPG_STATEMENTS[name] = sql
+    return sql
+
+
+def stmt(name: str) -> TextClause:
+    """Registered text() clause by name. KeyError for an unknown name (a typo should fail loudly)."""
+    return STATEMENTS[name]
+
+
+def asyncpg_sql(name: str) -> str:
+    return ASYNCPG_STATEMENTS[name]
+
+
+_PICK_RETURNING = """
+    RETURNING id, type, payload, attempt, created_at,
+        EXISTS (
+            SELECT 1 FROM domain_command_terminals t
+            WHERE t.command_id = commands_domain.id AND t.attempt = commands_domain.attempt
+        ) AS terminal_written
+"""
+
+register(
+    "pick_one",
+    """
+    WITH cte AS (
+        SELECT id
+        FROM commands_domain
+        WHERE status='PENDING'
+        ORDER BY created_at ASC
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+    )
+    UPDATE commands_domain
+    SET status='RUNNING',
+        attempt = attempt + 1,
+        locked_by = :locked_by,
+        locked_at = NOW(),
+        updated_at = NOW()
+    WHERE id IN (SELECT id FROM cte)
+    """ + _PICK_RETURNING,
+)
+
+register(
+    "pick_batch",
+    """
+    WITH cte AS (
+        SELECT id
+        FROM commands_domain
+        WHERE status='PENDING'
+        ORDER BY created_at ASC
+        FOR UPDATE SKIP LOCKED
+        LIMIT :limit
+    )
+    UPDATE commands_domain
+    SET status='RUNNING',
+        attempt = attempt + 1,
+        locked_by = :locked_by,
+        locked_at = NOW(),
+        updated_at = NOW()
+    WHERE id IN (SELECT id FROM cte)
+    """ + _PICK_RETURNING,
+)
+
+register(
+    "mark_done",
+    """
+    UPDATE commands_domain
+    SET status='DONE',
+        result=(:result)::jsonb,
+        error=NULL,
+        updated_at=NOW()
+    WHERE id=:id AND status IN ('PENDING','RUNNING')
+    """,
+)
+
+register(
+    "mark_failed",
+    """
+    UPDATE commands_domain
+    SET status='FAILED',
+        result=(:result)::jsonb,
+        error=:reason,
+        updated_at=NOW()
+    WHERE id=:id AND status IN ('PENDING','RUNNING')
+    """,
+)
+
+register(
+    "finalize",
+    """
+    WITH upd AS (
+        UPDATE commands_domain
+        SET status=:status,
+            result=(:result)::jsonb,
+            error=:error,
+            updated_at=NOW()
+        WHERE id=:id AND status IN ('PENDING','RUNNING')
+        RETURNING id
+    ),
+    ledger AS (
+        INSERT INTO domain_command_terminals (command_id, attempt, event_type, created_at)
+        SELECT upd.id, CAST(:attempt AS int), CAST(:event_type AS text), CAST(:created_at AS timestamptz)
+        FROM upd
+        ON CONFLICT (command_id, attempt) DO NOTHING
+    )
+    INSERT INTO domain_events (command_id, event_type, attempt, payload, created_at)
+    SELECT upd.id,
+           CAST(:event_type AS text),
+           CAST(:attempt AS int),
+           (:payload)::jsonb,
+           CAST(:created_at AS timestamptz)
+    FROM upd
+    RETURNING id
+    """,
+)
+
+register(
+    "oldest_pending",
+    "SELECT id FROM commands_domain WHERE status = 'PENDING' ORDER BY created_at ASC LIMIT 1",
+)
+
+_EVENTS_INSERT_SQL = """
+    INSERT INTO domain_events (command_id, event_type, attempt, payload, created_at)
+    SELECT t.command_id, t.event_type, t.attempt, t.payload::jsonb, t.created_at
+    FROM unnest({command_ids}, {event_types}, {attempts}, {payloads}, {created_ats})
+      WITH ORDINALITY AS t(command_id, event_type, attempt, payload, created_at, ord)
+    ORDER BY t.ord
+"""
+
+register(
+    "events_insert",
+    _EVENTS_INSERT_SQL.format(
+        command_ids="CAST(:command_ids AS text[])",
+        event_types="CAST(:event_types AS text[])",
+        attempts="CAST(:attempts AS int[])",
+        payloads="CAST(:payloads AS text[])",
+        created_ats="CAST(:created_ats AS timestamptz[])",
+    ),
+)
+
+register_asyncpg(
+    "events_insert",
+    _EVENTS_INSERT_SQL.format(
+        command_ids="$1::text[]",
+        event_types="$2::text[]",
+        attempts="$3::int[]",
+        payloads="$4::text[]",
+        created_ats="$5::timestamptz[]",
+    ),
+)
+
+register(
+    "terminal_exists",
+    """
+    SELECT 1 FROM domain_command_terminals
+    WHERE command_id = :command_id AND attempt = :attempt
+    """,
+)
+
+register(
+    "last_fail_for_type",
+    """
+    SELECT MAX(created_at) AS last_fail FROM domain_events
+    WHERE event_type IN ('ACTION_FAIL', 'MARK_FAILED')
+      AND (payload->>'type') = :cmd_type
+      AND created_at > NOW() - INTERVAL '1 hour'
+    """,
+)
+
+register(
+    "ledger_exposure",
+    "SELECT exposure_usd FROM risk_exposure WHERE symbol = :symbol",
+)
+
+register(
+    "ledger_exposure_total",
+    "SELECT COALESCE(SUM(exposure_usd), 0) AS exposure_usd FROM risk_exposure",
+)
+
+register(
+    "quote_exposure_sum",
+    """
+    SELECT COALESCE(SUM(
+        COALESCE(
+            (payload->>'notional')::float,
+            (payload->>'notional_usd')::float,
+            0
+        )
+    ), 0) AS exposure
+    FROM commands_domain
+    WHERE type = 'QUOTE' AND status IN ('DONE', 'PENDING')
+    """,
+)
@@ -1,13 +1,31 @@
 """
 Append-only domain event log. Never raises; failures are logged and swallowed.
 Used by runner (SQLAlchemy engine) and retry endpoint (asyncpg pool).
+Events go through a DomainEventSink: buffered in memory and written as one multi-row INSERT
+on a size or time trigger. Barrier events (MARK_DONE / MARK_FAILED / RETRY) flush the buffer
+before append returns, so everything emitted before a terminal event is durable with it.
+DOMAIN_EVENTS_BUFFER=0 writes every event in its own INSERT (previous behaviour).
 """
+import asyncio
 import json
-from typing import Any, Dict, Optional
+import os
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.db.statements import asyncpg_sql, stmt
 
 # Max payload size to store (bytes, approximate)
 PAYLOAD_MAX_BYTES = 8000
 
+BARRIER_EVENT_TYPES = frozenset({"MARK_DONE", "MARK_FAILED", "RETRY"})
+EVENTS_BUFFER_ENABLED = (os.getenv("DOMAIN_EVENTS_BUFFER") or "1").strip() == "1"
+EVENTS_FLUSH_INTERVAL_SEC = float(os.getenv("DOMAIN_EVENTS_FLUSH_INTERVAL_MS", "200")) / 1000.0
+EVENTS_FLUSH_MAX_BATCH = int(os.getenv("DOMAIN_EVENTS_FLUSH_MAX_BATCH", "200"))
+EVENTS_BUFFER_MAX_PENDING = int(os.getenv("DOMAIN_EVENTS_BUFFER_MAX_PENDING", "10000"))
+
+# (command_id, event_type, attempt, payload_json, created_at)
+EventRow = Tuple[str, str, int, str, datetime]
+
 
 def _trim_payload(payload: Dict[str, Any], max_bytes: int = PAYLOAD_MAX_BYTES) -> Dict[str, Any]:
     """Keep only small fields (code, message, type, attempt, ts, etc.) and truncate if needed."""
@@ -60,6 +78,172 @@ def _trim_payload(payload: Dict[str, Any], max_bytes: int = PAYLOAD_MAX_BYTES) -
     return out
 
 
+def _event_row(command_id: str, event_type: str, attempt: int, payload: Optional[Dict[str, Any]]) -> EventRow:
+    pl_json = json.dumps(_trim_payload(payload or {}), ensure_ascii=False)
+    return (command_id, event_type, int(attempt), pl_json, datetime.now(timezone.utc))
+
+
+def _columns(rows: List[EventRow]) -> Tuple[list, list, list, list, list]:
+    return (
+        [r[0] for r in rows],
+        [r[1] for r in rows],
+        [r[2] for r in rows],
+        [r[3] for r in rows],
+        [r[4] for r in rows],
+    )
+
+
+async def _write_rows_engine(rows: List[EventRow]) -> None:
+    from app.workers import command_worker as cw
+    command_ids, event_types, attempts, payloads, created_ats = _columns(rows)
+    async with cw.engine.begin() as conn:
+        await conn.execute(
+            stmt("events_insert"),
+            {
+                "command_ids": command_ids,
+                "event_types": event_types,
+                "attempts": attempts,
+                "payloads": payloads,
+                "created_ats": created_ats,
+            },
+        )
+
+
+def _pool_writer(pool: Any) -> Callable[[List[EventRow]], Awaitable[None]]:
+    async def _write_rows_pool(rows: List[EventRow]) -> None:
+        async with pool.acquire() as conn:
+            await conn.execute(asyncpg_sql("events_insert"), *_columns(rows))
+
+    return _write_rows_pool
+
+
+class DomainEventSink:
+    """
+    In-memory event buffer with a background flusher bound to the running event loop.
+    append() never waits on the database; flush() is the barrier: it returns once every
+    event appended before the call has been written (or dropped after a logged failure).
+    Rows are written in append order, one multi-row INSERT per flush. A batch that fails is
+    retried one row at a time, once; only the rows that fail again are dropped.
+    """
+
+    def __init__(
+        self,
+        write_rows: Callable[[List[EventRow]], Awaitable[None]],
+        flush_interval_sec: float = EVENTS_FLUSH_INTERVAL_SEC,
+        max_batch: int = EVENTS_FLUSH_MAX_BATCH,
+        max_pending: int = EVENTS_BUFFER_MAX_PENDING,
+    ):
+        self._write_rows = write_rows
+        self._flush_interval_sec = max(0.001, flush_interval_sec)
+        self._max_batch = max(1, max_batch)
+        self._max_pending = max(self._max_batch, max_pending)
+        self._buffer: List[EventRow] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.written = 0
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._flush_interval_sec)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def append(self, row: EventRow) -> None:
+        """Buffer one event. Never raises, never waits."""
+        try:
+            self._ensure_started()
+        except RuntimeError:
+            # no running loop: nothing could flush, drop rather than hold forever
+            self.dropped += 1
+            return
+        if len(self._buffer) >= self._max_pending:
+            self.dropped += 1
+            print(f"[domain_events] buffer full ({self._max_pending}); dropped {row[1]} for {row[0]}", flush=True)
+            return
+        self._buffer.append(row)
+        if len(self._buffer) >= self._max_batch:
+            self._wake.set()
+
+    async def flush(self) -> None:
+        """Write everything buffered so far. Never raises."""
+        if self._lock is None:
+            return
+        async with self._lock:
+            while self._buffer:
+                rows = self._buffer[: self._max_batch]
+                del self._buffer[: self._max_batch]
+                try:
+                    await self._write_rows(rows)
+                    self.written += len(rows)
+                except Exception as e:
+                    print(f"[domain_events] flush of {len(rows)} events failed: {e}", flush=True)
+                    await self._write_one_by_one(rows)
+
+    async def _write_one_by_one(self, rows: List[EventRow]) -> None:
+        """Retry a failed batch row by row, once, so one bad row (or a blip) does not lose the batch."""
+        if len(rows) == 1:
+            self.dropped += 1
+            return
+        failed = 0
+        for row in rows:
+            try:
+                await self._write_rows([row])
+                self.written += 1
+            except Exception as e:
+                failed += 1
+                print(f"[domain_events] dropped {row[1]} for {row[0]}: {e}", flush=True)
+        self.dropped += failed
+        if failed < len(rows):
+            print(f"[domain_events] row retry wrote {len(rows) - failed}/{len(rows)} events", flush=True)
+
+
+_engine_sink: Optional[DomainEventSink] = None
+_pool_sinks: Dict[int, DomainEventSink] = {}
+
+
+def get_engine_event_sink() -> DomainEventSink:
+    global _engine_sink
+    if _engine_sink is None:
+        _engine_sink = DomainEventSink(_write_rows_engine)
+    return _engine_sink
+
+
+def get_pool_event_sink(pool: Any) -> DomainEventSink:
+    sink = _pool_sinks.get(id(pool))
+    if sink is None:
+        sink = DomainEventSink(_pool_writer(pool))
+        _pool_sinks[id(pool)] = sink
+    return sink
+
+
+async def flush_domain_events() -> None:
+    """Flush every sink (shutdown / tests). Never raises."""
+    sinks = ([_engine_sink] if _engine_sink is not None else []) + list(_pool_sinks.values())
+    for sink in sinks:
+        await sink.flush()
+
+
+async def _append_via_sink(sink: DomainEventSink, row: EventRow) -> None:
+    sink.append(row)
+    if row[1] in BARRIER_EVENT_TYPES:
+        await sink.flush()
+
+
 async def append_domain_event(
     command_id: str,
     event_type: str,
@@ -68,22 +252,14 @@ async def append_domain_event(
 ) -> None:
     """
     Append one event using SQLAlchemy engine (worker/runner). Never raises.
+    Buffered unless DOMAIN_EVENTS_BUFFER=0; barrier events return only after the flush.
     """
     try:
-        from sqlalchemy import text
-        from app.workers import command_worker as cw
-        pl = _trim_payload(payload or {})
-        pl_json = json.dumps(pl, ensure_ascii=False)
-        async with cw.engine.begin() as conn:
-            await conn.execute(
-                text(
-                    """
-                    INSERT INTO domain_events (command_id, event_type, attempt, payload)
-                    VALUES (:command_id, :event_type, :attempt, (:payload)::jsonb)
-                    """
-                ),
-                {"command_id": command_id, "event_type": event_type, "attempt": attempt, "payload": pl_json},
-            )
+        row = _event_row(command_id, event_type, attempt, payload)
+        if EVENTS_BUFFER_ENABLED:
+            await _append_via_sink(get_engine_event_sink(), row)
+        else:
+            await _write_rows_engine([row])
     except Exception as e:
         print(f"[domain_events] append failed: {e}", flush=True)
     _maybe_notify_telegram(command_id, event_type, payload or {})
@@ -92,7 +268,7 @@ async def append_domain_event(
 def _maybe_notify_telegram(
     command_id: str, event_type: str, payload: Dict[str, Any]
 ) -> None:
-    """Notify critical events to Telegram (throttled). Never raises."""
+    """Queue critical events for Telegram (coalesced per key, sent off-thread). Never raises."""
     if event_type not in {"EXCEPTION", "POLICY_BLOCK", "KILL_SWITCH_ON"}:
         return
     try:
@@ -116,20 +292,13 @@ async def append_domain_event_pool(
 ) -> None:
     """
     Append one event using asyncpg pool (API/main). Never raises.
+    Same sink semantics as append_domain_event, one sink per pool.
     """
     try:
-        pl = _trim_payload(payload or {})
-        pl_json = json.dumps(pl, ensure_ascii=False)
-        async with pool.acquire() as conn:
-            await conn.execute(
-                """
-                INSERT INTO domain_events (command_id, event_type, attempt, payload)
-                VALUES ($1, $2, $3, $4::jsonb)
-                """,
-                command_id,
-                event_type,
-                attempt,
-                pl_json,
-            )
+        row = _event_row(command_id, event_type, attempt, payload)
+        if EVENTS_BUFFER_ENABLED:
+            await _append_via_sink(get_pool_event_sink(pool), row)
+        else:
+            await _pool_writer(pool)([row])
     except Exception as e:
         print(f"[domain_events] append_pool failed: {e}", flush=True)
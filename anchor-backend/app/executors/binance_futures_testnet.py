@@ -8,6 +8,8 @@ from typing import Any, Dict, Optional
 import urllib.request
 import urllib.error
 
+from app.executors.http_transport import exchange_urlopen
+
 DEFAULT_BASE = "https://demo-fapi.binance.com"
 
 
@@ -44,7 +46,7 @@ class BinanceFuturesTestnetExecutor:
         req.add_header("X-MBX-APIKEY", self.api_key)
 
         try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
+            with exchange_urlopen(req, timeout=10) as resp:
                 raw = resp.read().decode("utf-8")
                 return json.loads(raw) if raw else {}
         except urllib.error.HTTPError as e:
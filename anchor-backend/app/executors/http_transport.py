@@ -0,0 +1,348 @@
+"""
+Shared HTTP transport for exchange executors: keep-alive connections pooled per (scheme, host, port),
+a per-host connection limit, cached DNS, and per-request timing (connect, TLS, TTFB, total).
+
+exchange_urlopen(request, timeout=...) is a drop-in for urllib.request.urlopen: it takes a
+urllib.request.Request, returns a response usable as a context manager (read(), status, headers,
+getcode()), and raises the same errors (urllib.error.HTTPError for 4xx/5xx, URLError for DNS,
+connect, TLS and send failures including their timeouts, socket.timeout / TimeoutError only for a
+timeout while waiting for or reading the response), so executor error handling is unchanged.
+Safe to call from several threads (the worker runs executors on a thread pool).
+
+A pooled connection is only reused if it has been idle for less than EXCHANGE_HTTP_IDLE_SEC and the
+server has not closed it. A request that fails on a reused connection is retried once on a fresh one
+only for idempotent methods (GET/HEAD/OPTIONS): an order POST is never sent twice.
+
+Env:
+  EXCHANGE_HTTP_MAX_PER_HOST (4)     concurrent connections per host; more requests wait
+  EXCHANGE_HTTP_IDLE_SEC (30)        idle connections older than this are closed, not reused
+  EXCHANGE_HTTP_DNS_TTL_SEC (60)     resolved addresses are reused this long
+  EXCHANGE_HTTP_POOL_DISABLE (0)     1 = plain urllib.request.urlopen (no pooling)
+"""
+import http.client
+import io
+import os
+import select
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+_DEFAULT_TIMEOUT_SEC = 10.0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float((os.getenv(name) or "").strip() or default)
+    except ValueError:
+        return default
+
+
+class DnsCache:
+    """getaddrinfo results per (host, port), reused for ttl_sec. Thread-safe."""
+
+    def __init__(self, ttl_sec: float, resolve: Optional[Callable[..., List[Any]]] = None):
+        self.ttl_sec = ttl_sec
+        self._resolve = resolve or socket.getaddrinfo
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[Any]]] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+
+    def resolve(self, host: str, port: int) -> List[Any]:
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and now - hit[0] < self.ttl_sec:
+                return hit[1]
+        infos = self._resolve(host, port, 0, socket.SOCK_STREAM)
+        with self._lock:
+            self.lookups += 1
+            self._entries[key] = (now, infos)
+        return infos
+
+    def forget(self, host: str, port: int) -> None:
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+
+class _PooledConnection(http.client.HTTPConnection):
+    """HTTP/1.1 connection that connects through the DNS cache and times TCP connect and TLS."""
+
+    def __init__(self, host: str, port: int, timeout: float, dns: DnsCache, tls: Optional[ssl.SSLContext]):
+        super().__init__(host, port, timeout=timeout)
+        self._dns = dns
+        self._tls = tls
+        self.connect_ms = 0.0
+        self.tls_ms = 0.0
+        self.idle_since = 0.0
+
+    def connect(self) -> None:
+        last_err: Optional[BaseException] = None
+        t0 = time.perf_counter()
+        for family, socktype, proto, _, addr in self._dns.resolve(self.host, self.port):
+            sock = socket.socket(family, socktype, proto)
+            try:
+                sock.settimeout(self.timeout)
+                sock.connect(addr)
+            except OSError as e:
+                sock.close()
+                last_err = e
+                continue
+            break
+        else:
+            self._dns.forget(self.host, self.port)
+            raise last_err or OSError(f"no address for {self.host}")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        t1 = time.perf_counter()
+        self.connect_ms = (t1 - t0) * 1000.0
+        if self._tls is not None:
+            sock = self._tls.wrap_socket(sock, server_hostname=self.host)
+            self.tls_ms = (time.perf_counter() - t1) * 1000.0
+        self.sock = sock
+
+    def dropped(self) -> bool:
+        """True when the server closed the idle connection (readable with nothing pending = EOF)."""
+        if self.sock is None:
+            return True
+        try:
+            return bool(select.select([self.sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+
+class _Timing:
+    __slots__ = ("count", "reused", "errors", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.reused = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+
+class TransportResponse:
+    """urlopen-style response; body is read eagerly so the connection goes back to the pool."""
+
+    def __init__(self, url: str, status: int, reason: str, headers: Any, body: bytes, timing: Dict[str, Any]):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._body = body
+        self.timing = timing
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        if amt is None:
+            body, self._body = self._body, b""
+            return body
+        body, self._body = self._body[:amt], self._body[amt:]
+        return body
+
+    def getcode(self) -> int:
+        return self.status
+
+    def geturl(self) -> str:
+        return self.url
+
+    def close(self) -> None:
+        self._body = b""
+
+    def __enter__(self) -> "TransportResponse":
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        self.close()
+        return False
+
+
+class _HostPool:
+    def __init__(self, limit: int) -> None:
+        self.slots = threading.BoundedSemaphore(limit)
+        self.idle: List[_PooledConnection] = []
+        self.lock = threading.Lock()
+        self.timing = _Timing()
+
+
+class ExchangeHttpTransport:
+    """Connection pools per host plus request timing; urlopen() mirrors urllib.request.urlopen."""
+
+    def __init__(
+        self,
+        max_per_host: Optional[int] = None,
+        idle_sec: Optional[float] = None,
+        dns_ttl_sec: Optional[float] = None,
+        tls_context: Optional[ssl.SSLContext] = None,
+        dns: Optional[DnsCache] = None,
+    ):
+        self.max_per_host = max(1, int(max_per_host or _env_float("EXCHANGE_HTTP_MAX_PER_HOST", 4)))
+        self.idle_sec = idle_sec if idle_sec is not None else _env_float("EXCHANGE_HTTP_IDLE_SEC", 30.0)
+        self.dns = dns or DnsCache(dns_ttl_sec if dns_ttl_sec is not None else _env_float("EXCHANGE_HTTP_DNS_TTL_SEC", 60.0))
+        self._tls = tls_context
+        self._hosts: Dict[Tuple[str, str, int], _HostPool] = {}
+        self._lock = threading.Lock()
+        self.last_timing: Dict[str, Any] = {}
+
+    def _tls_context(self) -> ssl.SSLContext:
+        if self._tls is None:
+            self._tls = ssl.create_default_context()
+        return self._tls
+
+    def _host(self, key: Tuple[str, str, int]) -> _HostPool:
+        with self._lock:
+            pool = self._hosts.get(key)
+            if pool is None:
+                pool = self._hosts[key] = _HostPool(self.max_per_host)
+            return pool
+
+    def _checkout(self, pool: _HostPool, key: Tuple[str, str, int], timeout: float) -> Tuple[_PooledConnection, bool]:
+        now = time.monotonic()
+        with pool.lock:
+            while pool.idle:
+                conn = pool.idle.pop()
+                if now - conn.idle_since < self.idle_sec and not conn.dropped():
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        scheme, host, port = key
+        tls = self._tls_context() if scheme == "https" else None
+        return _PooledConnection(host, port, timeout, self.dns, tls), False
+
+    def _checkin(self, pool: _HostPool, conn: _PooledConnection, reusable: bool) -> None:
+        if not reusable:
+            conn.close()
+            return
+        conn.idle_since = time.monotonic()
+        with pool.lock:
+            pool.idle.append(conn)
+
+    def urlopen(self, request: Any, timeout: Optional[float] = None) -> TransportResponse:
+        if isinstance(request, str):
+            request = urllib.request.Request(request)
+        url = request.full_url
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise urllib.error.URLError(f"unsupported url: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        method = request.get_method()
+        timeout = float(timeout if timeout is not None else _DEFAULT_TIMEOUT_SEC)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        headers = {k: v for k, v in request.header_items()}
+        headers.setdefault("Connection", "keep-alive")
+        headers.setdefault("User-Agent", "anchor-exchange-transport")
+
+        pool = self._host(key)
+        t0 = time.perf_counter()
+        if not pool.slots.acquire(timeout=timeout):
+            raise urllib.error.URLError(f"EXCHANGE_HTTP_POOL_TIMEOUT:{parts.hostname}")
+        try:
+            for try_no in range(2):
+                conn, reused = self._checkout(pool, key, timeout)
+                sent = False
+                try:
+                    conn.connect_ms = conn.tls_ms = 0.0
+                    conn.request(method, path, body=request.data, headers=headers)
+                    sent = True
+                    t_sent = time.perf_counter()
+                    resp = conn.getresponse()
+                    t_first = time.perf_counter()
+                    body = resp.read()
+                except (socket.timeout, TimeoutError) as e:
+                    conn.close()
+                    pool.timing.errors += 1
+                    # Like urllib: a DNS/connect/TLS/send timeout is a URLError; only a timeout
+                    # waiting for or reading the response is raised as is.
+                    if not sent:
+                        raise urllib.error.URLError(e)
+                    raise
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                    conn.close()
+                    if reused and try_no == 0 and method in _IDEMPOTENT_METHODS:
+                        continue
+                    pool.timing.errors += 1
+                    raise urllib.error.URLError(e)
+                except (OSError, http.client.HTTPException) as e:
+                    conn.close()
+                    pool.timing.errors += 1
+                    raise urllib.error.URLError(e)
+                t_end = time.perf_counter()
+                self._checkin(pool, conn, not resp.will_close)
+                break
+        finally:
+            pool.slots.release()
+
+        timing = {
+            "host": parts.hostname,
+            "reused": reused,
+            "connect_ms": round(conn.connect_ms, 3),
+            "tls_ms": round(conn.tls_ms, 3),
+            "ttfb_ms": round((t_first - t_sent) * 1000.0, 3),
+            "total_ms": round((t_end - t0) * 1000.0, 3),
+        }
+        self.last_timing = timing
+        with pool.lock:
+            t = pool.timing
+            t.count += 1
+            t.reused += int(reused)
+            t.total_ms += timing["total_ms"]
+            t.max_ms = max(t.max_ms, timing["total_ms"])
+
+        if resp.status >= 400:
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(body))
+        return TransportResponse(url, resp.status, resp.reason, resp.headers, body, timing)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = dict(self._hosts)
+        out: Dict[str, Any] = {"max_per_host": self.max_per_host, "dns_lookups": self.dns.lookups, "hosts": {}}
+        for (scheme, host, port), pool in sorted(hosts.items()):
+            t = pool.timing
+            out["hosts"][f"{scheme}://{host}:{port}"] = {
+                "requests": t.count,
+                "reused": t.reused,
+                "errors": t.errors,
+                "idle": len(pool.idle),
+                "avg_ms": round(t.total_ms / t.count, 3) if t.count else 0.0,
+                "max_ms": round(t.max_ms, 3),
+            }
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            hosts, self._hosts = self._hosts, {}
+        for pool in hosts.values():
+            with pool.lock:
+                for conn in pool.idle:
+                    conn.close()
+                pool.idle.clear()
+
+
+_transport: Optional[ExchangeHttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_exchange_transport() -> ExchangeHttpTransport:
+    """The process-wide transport (created on first use, sized from env)."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = ExchangeHttpTransport()
+        return _transport
+
+
+def exchange_urlopen(request: Any, timeout: Optional[float] = None) -> Any:
+    """urllib.request.urlopen replacement for exchange calls (see module docstring)."""
+    if (os.getenv("EXCHANGE_HTTP_POOL_DISABLE") or "").strip() == "1":
+        return urllib.request.urlopen(request, timeout=timeout if timeout is not None else _DEFAULT_TIMEOUT_SEC)
+    return get_exchange_transport().urlopen(request, timeout=timeout)
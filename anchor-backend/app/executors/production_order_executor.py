@@ -7,6 +7,8 @@ import urllib.request
 from datetime import datetime
 from typing import Any, Callable, Dict, Optional, Tuple
 
+from app.executors.http_transport import exchange_urlopen
+from app.executors.server_time import exchange_timestamp_ms
 from app.trade_gate_production import (
     next_manual_low_frequency_production_order_send_decision_response,
     next_manual_low_frequency_production_request_send_gate_decision,
@@ -16,6 +18,7 @@ from app.trade_gate_production import (
 
 
 DEFAULT_PRODUCTION_ORDER_PATH = "/api/v3/order"
+DEFAULT_PRODUCTION_TIME_PATH = "/api/v3/time"
 DEFAULT_RECV_WINDOW_MS = 5000
 SUPPORTED_MARKET = "binance_spot"
 ALLOWED_PRODUCTION_ORIGINS = {"https://api.binance.com"}
@@ -169,7 +172,7 @@ def send_signed_order_request(
         method=str(request["method"]),
         headers=dict(request.get("headers") or {}),
     )
-    open_call = opener or urllib.request.urlopen
+    open_call = opener or exchange_urlopen
 
     try:
         with open_call(http_request, timeout=timeout_seconds) as response:
@@ -240,6 +243,20 @@ def send_signed_order_request(
     return outcome, requested_payload, "PRODUCTION_HTTP_RESPONSE", outcome["result"]
 
 
+def signing_timestamp_ms(
+    credentials: Dict[str, str],
+    now_ts: int,
+    *,
+    transport_enabled: bool,
+    opener: Optional[Callable[..., Any]],
+) -> int:
+    """Exchange-clock timestamp for a real send (shared offset tracker); now_ts otherwise."""
+    base_url = str(credentials.get("base_url") or "").rstrip("/")
+    if not transport_enabled or opener is not None or base_url not in ALLOWED_PRODUCTION_ORIGINS:
+        return now_ts
+    return exchange_timestamp_ms(f"{base_url}{DEFAULT_PRODUCTION_TIME_PATH}", now_ts)
+
+
 def run_production_order_request(
     transport_input: Dict[str, Any],
     credentials: Dict[str, str] | None,
@@ -261,7 +278,13 @@ def run_production_order_request(
         )
 
     try:
-        request = build_signed_order_request(transport_input, credentials, now_ts)
+        timestamp_ms = signing_timestamp_ms(
+            credentials,
+            now_ts,
+            transport_enabled=transport_enabled,
+            opener=opener,
+        )
+        request = build_signed_order_request(transport_input, credentials, timestamp_ms)
     except ValueError as exc:
         return _boundary_failure(str(exc), ts=now_ts)
 
@@ -0,0 +1,255 @@
+"""
+Exchange clock-offset tracker for signed requests. The exchange rejects a signed request whose
+timestamp is outside recvWindow of its own clock, so executors sign with exchange time; fetching
+/time before every order put an extra round trip on the send path. The tracker keeps RTT-corrected
+samples per time endpoint and answers timestamp_ms() locally.
+
+A sample brackets serverTime between the local send and receive instants: the exchange clock read
+serverTime at the midpoint, give or take rtt/2. Samples are kept on the monotonic clock, so a local
+wall-clock step does not move the estimate. The estimate extrapolates from the sample with the
+smallest error bound (rtt/2 plus age times the residual drift allowance) and, once the window spans
+SERVER_TIME_DRIFT_MIN_SPAN_SEC, corrects for drift with a least-squares slope over the window.
+
+timestamp_ms() does not touch the network while the estimate is fresh. With no sample, or the
+newest one older than SERVER_TIME_MAX_AGE_SEC, it samples synchronously and signs with serverTime
+as returned (the previous behaviour); if that fails it returns the caller's local fallback. The
+worker loop calls refresh_due() (on the action thread pool) so the estimate stays fresh between
+orders.
+
+Env:
+  SERVER_TIME_REFRESH_SEC (30)         background re-sample interval per endpoint; 0 = no refresh
+  SERVER_TIME_MAX_AGE_SEC (120)        an older estimate is stale: sample before signing
+  SERVER_TIME_MAX_RTT_MS (1000)        samples with a slower round trip are not kept
+  SERVER_TIME_WINDOW (16)              samples kept per endpoint
+  SERVER_TIME_DRIFT_MIN_SPAN_SEC (60)  window span needed before drift is estimated
+"""
+import json
+import os
+import threading
+import time
+import urllib.request
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from app.executors.http_transport import exchange_urlopen
+
+# Drift (ms of offset per second) beyond this is treated as a bad fit, not a clock: 1000 ppm.
+_MAX_DRIFT_MS_PER_SEC = 1.0
+# Residual drift allowance used to age a sample's error bound: 100 ppm.
+_AGE_ERROR_MS_PER_SEC = 0.1
+_FETCH_TIMEOUT_SEC = 5
+
+Fetch = Callable[[str], Optional[int]]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float((os.getenv(name) or "").strip() or default)
+    except ValueError:
+        return default
+
+
+def fetch_server_time_ms(time_url: str) -> Optional[int]:
+    """GET time_url and return its serverTime (ms). None on any failure. Never raises."""
+    request = urllib.request.Request(url=time_url, method="GET")
+    try:
+        with exchange_urlopen(request, timeout=_FETCH_TIMEOUT_SEC) as response:
+            raw = response.read().decode("utf-8")
+            payload = json.loads(raw) if raw else {}
+    except Exception:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    try:
+        return int(payload.get("serverTime"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Sample:
+    __slots__ = ("mono", "server_ms", "rtt_ms")
+
+    def __init__(self, mono: float, server_ms: int, rtt_ms: float) -> None:
+        self.mono = mono
+        self.server_ms = server_ms
+        self.rtt_ms = rtt_ms
+
+    def offset_ms(self) -> float:
+        return self.server_ms - self.mono * 1000.0
+
+
+class _Endpoint:
+    __slots__ = ("samples", "drift", "last_attempt", "hits", "syncs", "fallbacks", "rejected", "failures")
+
+    def __init__(self, window: int) -> None:
+        self.samples: Deque[_Sample] = deque(maxlen=window)
+        self.drift = 0.0
+        self.last_attempt = 0.0
+        self.hits = 0
+        self.syncs = 0
+        self.fallbacks = 0
+        self.rejected = 0
+        self.failures = 0
+
+
+def _fit_drift(samples: Deque[_Sample], min_span_sec: float) -> float:
+    """Least-squares slope of offset over monotonic time (ms/s); 0 until the window is wide enough."""
+    if len(samples) < 3 or samples[-1].mono - samples[0].mono < min_span_sec:
+        return 0.0
+    n = len(samples)
+    mean_t = sum(s.mono for s in samples) / n
+    mean_o = sum(s.offset_ms() for s in samples) / n
+    var = sum((s.mono - mean_t) ** 2 for s in samples)
+    if var <= 0:
+        return 0.0
+    slope = sum((s.mono - mean_t) * (s.offset_ms() - mean_o) for s in samples) / var
+    return max(-_MAX_DRIFT_MS_PER_SEC, min(_MAX_DRIFT_MS_PER_SEC, slope))
+
+
+class ServerTimeTracker:
+    """Offset/drift estimate per exchange time URL. Thread-safe; fetches run outside the lock."""
+
+    def __init__(
+        self,
+        refresh_sec: Optional[float] = None,
+        max_age_sec: Optional[float] = None,
+        max_rtt_ms: Optional[float] = None,
+        window: Optional[int] = None,
+        drift_min_span_sec: Optional[float] = None,
+        fetch: Optional[Fetch] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.refresh_sec = refresh_sec if refresh_sec is not None else _env_float("SERVER_TIME_REFRESH_SEC", 30.0)
+        self.max_age_sec = max_age_sec if max_age_sec is not None else _env_float("SERVER_TIME_MAX_AGE_SEC", 120.0)
+        self.max_rtt_ms = max_rtt_ms if max_rtt_ms is not None else _env_float("SERVER_TIME_MAX_RTT_MS", 1000.0)
+        self.window = max(1, int(window if window is not None else _env_float("SERVER_TIME_WINDOW", 16)))
+        self.drift_min_span_sec = (
+            drift_min_span_sec if drift_min_span_sec is not None else _env_float("SERVER_TIME_DRIFT_MIN_SPAN_SEC", 60.0)
+        )
+        self._fetch = fetch or fetch_server_time_ms
+        self._clock = clock
+        self._endpoints: Dict[str, _Endpoint] = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, time_url: str) -> _Endpoint:
+        ep = self._endpoints.get(time_url)
+        if ep is None:
+            ep = self._endpoints[time_url] = _Endpoint(self.window)
+        return ep
+
+    def sample(self, time_url: str, fetch: Optional[Fetch] = None) -> Optional[int]:
+        """Take one RTT-timed sample; returns serverTime as fetched (None on failure). Never raises."""
+        with self._lock:
+            self._endpoint(time_url).last_attempt = self._clock()
+        t0 = self._clock()
+        try:
+            server_ms = (fetch or self._fetch)(time_url)
+        except Exception:
+            server_ms = None
+        t1 = self._clock()
+        rtt_ms = (t1 - t0) * 1000.0
+        with self._lock:
+            ep = self._endpoint(time_url)
+            if server_ms is None:
+                ep.failures += 1
+            elif rtt_ms > self.max_rtt_ms:
+                ep.rejected += 1
+            else:
+                ep.samples.append(_Sample((t0 + t1) / 2.0, int(server_ms), rtt_ms))
+                ep.drift = _fit_drift(ep.samples, self.drift_min_span_sec)
+        return server_ms
+
+    def _estimate_locked(self, ep: _Endpoint, now: float) -> Optional[float]:
+        if not ep.samples or now - ep.samples[-1].mono > self.max_age_sec:
+            return None
+        best = min(ep.samples, key=lambda s: s.rtt_ms / 2.0 + (now - s.mono) * _AGE_ERROR_MS_PER_SEC)
+        elapsed = now - best.mono
+        return best.server_ms + elapsed * 1000.0 + elapsed * ep.drift
+
+    def estimate_ms(self, time_url: str) -> Optional[int]:
+        """Current exchange time from the samples alone; None when there is no fresh estimate."""
+        with self._lock:
+            ep = self._endpoints.get(time_url)
+            est = self._estimate_locked(ep, self._clock()) if ep is not None else None
+        return int(est) if est is not None else None
+
+    def timestamp_ms(self, time_url: str, fallback_ms: int, fetch: Optional[Fetch] = None) -> int:
+        """Signing timestamp: local estimate if fresh, else a synchronous sample, else fallback_ms. Never raises."""
+        with self._lock:
+            ep = self._endpoint(time_url)
+            est = self._estimate_locked(ep, self._clock())
+            if est is not None:
+                ep.hits += 1
+                return int(est)
+        server_ms = self.sample(time_url, fetch)
+        with self._lock:
+            ep = self._endpoint(time_url)
+            if server_ms is not None:
+                ep.syncs += 1
+                return server_ms
+            ep.fallbacks += 1
+        return int(fallback_ms)
+
+    def due(self) -> bool:
+        """True when some known endpoint is due a background sample (cheap; called every loop tick)."""
+        if self.refresh_sec <= 0:
+            return False
+        now = self._clock()
+        with self._lock:
+            return any(now - ep.last_attempt >= self.refresh_sec for ep in self._endpoints.values())
+
+    def refresh_due(self) -> int:
+        """Sample every endpoint whose last attempt is older than refresh_sec; returns how many. Blocking."""
+        if self.refresh_sec <= 0:
+            return 0
+        now = self._clock()
+        with self._lock:
+            urls = [url for url, ep in self._endpoints.items() if now - ep.last_attempt >= self.refresh_sec]
+        for url in urls:
+            self.sample(url)
+        return len(urls)
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        wall_ms = time.time() * 1000.0
+        out: Dict[str, Any] = {}
+        with self._lock:
+            for url, ep in sorted(self._endpoints.items()):
+                est = self._estimate_locked(ep, now)
+                out[url] = {
+                    "samples": len(ep.samples),
+                    "fresh": est is not None,
+                    "offset_ms": round(est - wall_ms, 1) if est is not None else None,
+                    "drift_ppm": round(ep.drift * 1000.0, 1),
+                    "min_rtt_ms": round(min(s.rtt_ms for s in ep.samples), 1) if ep.samples else None,
+                    "age_sec": round(now - ep.samples[-1].mono, 1) if ep.samples else None,
+                    "hits": ep.hits,
+                    "syncs": ep.syncs,
+                    "fallbacks": ep.fallbacks,
+                    "rejected": ep.rejected,
+                    "failures": ep.failures,
+                }
+        return {"refresh_sec": self.refresh_sec, "max_age_sec": self.max_age_sec, "endpoints": out}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+_tracker: Optional[ServerTimeTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_server_time_tracker() -> ServerTimeTracker:
+    """The process-wide tracker shared by the testnet and production executors."""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = ServerTimeTracker()
+    return _tracker
+
+
+def exchange_timestamp_ms(time_url: str, fallback_ms: int, fetch: Optional[Fetch] = None) -> int:
+    """Signing timestamp for a request to the exchange behind time_url. Never raises."""
+    return get_server_time_tracker().timestamp_ms(time_url, fallback_ms, fetch)
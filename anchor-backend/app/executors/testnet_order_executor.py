@@ -8,6 +8,9 @@ import urllib.parse
 import urllib.request
 from typing import Any, Dict, Optional, Tuple
 
+from app.executors.http_transport import exchange_urlopen
+from app.executors.server_time import exchange_timestamp_ms
+
 DEFAULT_RECV_WINDOW_MS = 5000
 DEFAULT_TESTNET_ORDER_PATH = "/fapi/v1/order"
 DEFAULT_TESTNET_TIME_PATH = "/fapi/v1/time"
@@ -95,12 +98,15 @@ def _extract_exchange_error_details(body: str) -> Dict[str, Any]:
     return details
 
 
-def _fetch_exchange_server_time_ms(configured_origin: str) -> Optional[int]:
+def _exchange_time_url(configured_origin: str) -> str:
     time_path = str(os.getenv("TESTNET_EXCHANGE_TIME_PATH") or DEFAULT_TESTNET_TIME_PATH).strip()
-    url = f"{configured_origin.rstrip('/')}{time_path}"
-    request = urllib.request.Request(url=url, method="GET")
+    return f"{configured_origin.rstrip('/')}{time_path}"
+
+
+def _fetch_exchange_server_time_ms(time_url: str) -> Optional[int]:
+    request = urllib.request.Request(url=time_url, method="GET")
     try:
-        with urllib.request.urlopen(request, timeout=5) as response:
+        with exchange_urlopen(request, timeout=5) as response:
             raw = response.read().decode("utf-8")
             payload = json.loads(raw) if raw else {}
     except Exception:
@@ -190,7 +196,11 @@ def run_real_testnet_order_request(
         )
 
     recv_window = int(os.getenv("TESTNET_EXCHANGE_RECV_WINDOW") or DEFAULT_RECV_WINDOW_MS)
-    timestamp_ms = _fetch_exchange_server_time_ms(configured_origin) or int(now_ts)
+    timestamp_ms = exchange_timestamp_ms(
+        _exchange_time_url(configured_origin),
+        int(now_ts),
+        fetch=_fetch_exchange_server_time_ms,
+    )
     order_path = str(os.getenv("TESTNET_EXCHANGE_ORDER_PATH") or DEFAULT_TESTNET_ORDER_PATH).strip()
     params = {
         "symbol": str(transport_input.get("symbol") or ""),
@@ -218,7 +228,7 @@ def run_real_testnet_order_request(
     request.add_header("X-MBX-APIKEY", api_key)
 
     try:
-        with urllib.request.urlopen(request, timeout=10) as response:
+        with exchange_urlopen(request, timeout=10) as response:
             raw = response.read().decode("utf-8")
             payload = json.loads(raw) if raw else {}
     except urllib.error.HTTPError as exc:
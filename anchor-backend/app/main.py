@@ -5,11 +5,21 @@ import re
 import uuid
 from datetime import datetime
 
-from fastapi import Body, FastAPI, HTTPException, Query, Request
+from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from app.api.routes import router
 from app.api.ops import router as ops_router
 from app.api.routes_domain_command_validation_dev import router as domain_command_validation_dev_router
-from app.domain_events import append_domain_event_pool
+from app.domain_events import append_domain_event_pool, flush_domain_events
+from app.ops.notify import close_telegram_dispatcher
+from app.ops.pg_stream import RowStream, StreamCapacityError, decode_cursor, encode_cursor, open_row_stream
+from app.core.domain_command_prepare_and_validate import prepare_and_validate_domain_command_payload
+from app.db.pool import close_pg_pool, get_pg_pool, pool_metrics_snapshot, warm_pools
+from app.ops.event_hub import DomainEventHub
+from app.ops.response_cache import cached_json_response, response_cache
+from app.risk.state_cache import RiskStateListener, risk_state_cache
+from app.workers.domain_command_wakeup import COMMANDS_DOMAIN_CHANNEL
 from app.trade_gate_production import (
     PRODUCTION_COMMAND_CREATED_STATUS,
     is_worker_executable_command_status,
@@ -107,11 +117,8 @@ async def _get_domain_pg_pool():
     if asyncpg is None:
         raise RuntimeError("asyncpg is not installed in the backend container.")
 
-    dsn = _normalize_asyncpg_dsn(os.getenv("DATABASE_URL", ""))
-    if not dsn:
-        raise RuntimeError("DATABASE_URL is not set.")
-
-    pool = await asyncpg.create_pool(dsn=dsn, min_size=1, max_size=5)
+    # Process-wide instrumented pool, sized by DB_POOL_* (app/db/pool.py).
+    pool = await get_pg_pool()
     app.state.domain_pg_pool = pool
     return pool
 
@@ -123,13 +130,28 @@ async def _startup():
         await _get_domain_pg_pool()
     except Exception:
         pass
+    await warm_pools()
+    listener = RiskStateListener(_normalize_asyncpg_dsn(os.getenv("DATABASE_URL", "")), risk_state_cache)
+    app.state.risk_state_listener = listener
+    app.state.risk_state_listen_task = asyncio.create_task(listener.run())
 
 
 @app.on_event("shutdown")
 async def _shutdown():
-    pool = getattr(app.state, "domain_pg_pool", None)
-    if pool is not None:
-        await pool.close()
+    await flush_domain_events()
+    hub = getattr(app.state, "domain_event_hub", None)
+    if hub is not None:
+        await hub.close()
+    task = getattr(app.state, "risk_state_listen_task", None)
+    if task is not None:
+        task.cancel()
+    listener = getattr(app.state, "risk_state_listener", None)
+    if listener is not None:
+        await listener.close()
+    app.state.domain_pg_pool = None
+    await close_pg_pool()
+    # Queued alerts and pending digests go out before the process exits (blocking close, off the loop).
+    await asyncio.to_thread(close_telegram_dispatcher)
 
 
 @app.get("/health")
@@ -145,6 +167,10 @@ async def get_kill_switch():
     return {"enabled": enabled, "source": source}
 
 
+# Cached responses that show the kill switch; dropped by every kill-switch / panic-guard write.
+_KILL_SWITCH_VIEWS = ("ops_state", "ops_worker")
+
+
 @app.post("/ops/kill-switch")
 async def post_kill_switch(request: Request, body: dict = Body(default_factory=dict)):
     """Set kill switch via Redis. OPS_TOKEN required if set. Writes KILL_SWITCH_SET audit event."""
@@ -180,12 +206,17 @@ async def post_kill_switch(request: Request, body: dict = Body(default_factory=d
             )
         except Exception as e:
             print(f"[ops/kill-switch] state_store upsert failed: {e}", flush=True)
+    response_cache.invalidate(*_KILL_SWITCH_VIEWS)
     return {"enabled": enabled_out, "source": source_out}
 
 
 @app.get("/ops/state")
-async def get_ops_state():
+async def get_ops_state(request: Request):
     """Aggregated ops state: kill_switch, worker_heartbeat, worker_panic, recent_ops_events. Never raises."""
+    return await cached_json_response(request, "ops_state", _ops_state)
+
+
+async def _ops_state():
     from datetime import datetime
     from app.ops.kill_switch import get_kill_switch_state
 
@@ -354,6 +385,7 @@ async def post_panic_guard_trigger(request: Request):
         )
     except Exception as e:
         print(f"[ops/panic_guard/trigger] failed: {e}", flush=True)
+    response_cache.invalidate(*_KILL_SWITCH_VIEWS)
     enabled_out, source_out = get_kill_switch_state()
     return {
         "ok": ok,
@@ -408,6 +440,7 @@ async def post_panic_guard_reset(request: Request):
         )
     except Exception as e:
         print(f"[ops/panic_guard/reset] failed: {e}", flush=True)
+    response_cache.invalidate(*_KILL_SWITCH_VIEWS)
     enabled_out, source_out = get_kill_switch_state()
     return {"ok": ok, "kill_switch": {"enabled": enabled_out, "source": source_out}}
 
@@ -435,9 +468,19 @@ async def get_ops_state_history(limit: int = Query(50, ge=1, le=200)):
         return []
 
 
+@app.get("/ops/db-pool")
+async def get_ops_db_pool():
+    """This API process's connection pools: config, acquire wait, query duration, in-use/idle. Never raises."""
+    return pool_metrics_snapshot()
+
+
 @app.get("/ops/worker")
-async def get_ops_worker():
+async def get_ops_worker(request: Request):
     """Read-only: kill switch, telegram enabled, last worker heartbeat. Never raises."""
+    return await cached_json_response(request, "ops_worker", _ops_worker)
+
+
+async def _ops_worker():
     from app.ops.kill_switch import get_kill_switch_state
     kill_enabled, kill_source = get_kill_switch_state()
     telegram_enabled = (os.getenv("TELEGRAM_NOTIFY_ENABLED") or "").strip() == "1"
@@ -558,12 +601,19 @@ async def post_risk_lockout_clear():
     """Clear risk lockout for LOCKOUT_CLEAR_TTL_SEC. No auth in v1.2."""
     from app.risk.lockout import clear_lockout_redis
     ok = clear_lockout_redis()
+    risk_state_cache.invalidate()
+    response_cache.invalidate("risk_state")
     return {"cleared": ok, "ttl_sec": 3600}
 
 
 @app.get("/risk/state")
-async def get_risk_state():
+async def get_risk_state(request: Request):
     """Risk control state: budget, today PnL, consecutive_losses, exposure, lockout. Never raises."""
+    return await cached_json_response(request, "risk_state", lambda: risk_state_cache.get(_compute_risk_state))
+
+
+async def _compute_risk_state():
+    """Uncached /risk/state snapshot (see app/risk/state_cache.py). Never raises."""
     from datetime import datetime, timedelta
     try:
         cfg = _risk_config()
@@ -585,8 +635,9 @@ async def get_risk_state():
                 failed_row = await conn.fetchrow(
                     """
                     SELECT COUNT(*) AS cnt FROM domain_events
-                    WHERE created_at::date = CURRENT_DATE
-                      AND event_type = 'MARK_FAILED'
+                    WHERE event_type = 'MARK_FAILED'
+                      AND created_at >= date_trunc('day', NOW())
+                      AND created_at < date_trunc('day', NOW()) + interval '1 day'
                     """
                 )
                 if failed_row and failed_row.get("cnt"):
@@ -606,6 +657,15 @@ async def get_risk_state():
                 )
                 if exp_row is not None and exp_row.get("current_exposure_usd") is not None:
                     net_exposure_usd = float(exp_row["current_exposure_usd"])
+                try:
+                    # Sharded reservations (migration 0009); risk_state only holds a snapshot.
+                    shard_row = await conn.fetchrow(
+                        "SELECT COUNT(*) AS cnt, COALESCE(SUM(reserved_usd), 0) AS total FROM risk_exposure_shards"
+                    )
+                    if shard_row is not None and int(shard_row["cnt"] or 0) > 0:
+                        net_exposure_usd = float(shard_row["total"])
+                except Exception:
+                    pass
         except Exception as e:
             print(f"[risk/state] query failed: {e}", flush=True)
             status = "UNKNOWN"
@@ -698,60 +758,80 @@ async def get_risk_state():
         return _risk_state_fallback("ERROR")
 
 
-@app.get("/ops/summary")
-async def get_ops_summary(
-    minutes: int = Query(30, ge=1, le=1440),
-    limit: int = Query(10, ge=1, le=200),
-):
-    """Return counts (FAILED, POLICY_BLOCK, EXCEPTION, KILL_SWITCH_ON) and recent events in time window."""
-    pool = await _get_domain_pg_pool()
-    counts = {"FAILED": 0, "POLICY_BLOCK": 0, "EXCEPTION": 0, "KILL_SWITCH_ON": 0}
+# Only these types are rolled up (migration 0010 trigger filter); keep the two lists in sync.
+_OPS_SUMMARY_EVENT_TYPES = ("POLICY_BLOCK", "EXCEPTION", "KILL_SWITCH_ON")
 
-    async with pool.acquire() as conn:
-        # window_start = now - interval 'X minutes'
-        failed_row = await conn.fetchrow(
-            """
-            SELECT COUNT(*) AS cnt FROM commands_domain
-            WHERE updated_at >= NOW() - ($1::int * interval '1 minute')
-              AND status = 'FAILED'
-            """,
-            minutes,
-        )
-        if failed_row:
-            counts["FAILED"] = failed_row["cnt"] or 0
 
-        policy_row = await conn.fetchrow(
+async def _ops_summary_counts_legacy(conn, minutes: int) -> dict:
+    """Pre-0010 path: COUNT(*) per type over domain_events (used only if the rollup table is missing)."""
+    counts = {}
+    for event_type in _OPS_SUMMARY_EVENT_TYPES:
+        row = await conn.fetchrow(
             """
             SELECT COUNT(*) AS cnt FROM domain_events
             WHERE created_at >= NOW() - ($1::int * interval '1 minute')
-              AND event_type = 'POLICY_BLOCK'
+              AND event_type = $2
             """,
             minutes,
+            event_type,
         )
-        if policy_row:
-            counts["POLICY_BLOCK"] = policy_row["cnt"] or 0
+        counts[event_type] = (row["cnt"] or 0) if row else 0
+    return counts
 
-        exc_row = await conn.fetchrow(
-            """
-            SELECT COUNT(*) AS cnt FROM domain_events
-            WHERE created_at >= NOW() - ($1::int * interval '1 minute')
-              AND event_type = 'EXCEPTION'
-            """,
-            minutes,
-        )
-        if exc_row:
-            counts["EXCEPTION"] = exc_row["cnt"] or 0
 
-        kill_row = await conn.fetchrow(
-            """
-            SELECT COUNT(*) AS cnt FROM domain_events
-            WHERE created_at >= NOW() - ($1::int * interval '1 minute')
-              AND event_type = 'KILL_SWITCH_ON'
-            """,
-            minutes,
-        )
-        if kill_row:
-            counts["KILL_SWITCH_ON"] = kill_row["cnt"] or 0
+@app.get("/ops/summary")
+async def get_ops_summary(
+    request: Request,
+    minutes: int = Query(30, ge=1, le=1440),
+    limit: int = Query(10, ge=1, le=200),
+):
+    """Return counts (FAILED, POLICY_BLOCK, EXCEPTION, KILL_SWITCH_ON) and recent events in time window."""
+    return await cached_json_response(
+        request, "ops_summary", lambda: _ops_summary(minutes, limit), key=f"{minutes}:{limit}"
+    )
+
+
+async def _ops_summary(minutes: int, limit: int):
+    pool = await _get_domain_pg_pool()
+    counts = {"FAILED": 0, "POLICY_BLOCK": 0, "EXCEPTION": 0, "KILL_SWITCH_ON": 0}
+
+    async with pool.acquire() as conn:
+        # Event counts: sum of per-minute rollup buckets and their slots (migration 0010); window start
+        # is rounded down to the minute. FAILED is the (status, updated_at) index range on commands_domain.
+        try:
+            row = await conn.fetchrow(
+                """
+                SELECT
+                  (SELECT COUNT(*) FROM commands_domain
+                   WHERE status = 'FAILED'
+                     AND updated_at >= NOW() - ($1::int * interval '1 minute')) AS failed,
+                  COALESCE(SUM(cnt) FILTER (WHERE event_type = 'POLICY_BLOCK'), 0) AS policy_block,
+                  COALESCE(SUM(cnt) FILTER (WHERE event_type = 'EXCEPTION'), 0) AS exception,
+                  COALESCE(SUM(cnt) FILTER (WHERE event_type = 'KILL_SWITCH_ON'), 0) AS kill_switch_on
+                FROM domain_event_rollups
+                WHERE bucket >= date_trunc('minute', NOW() - ($1::int * interval '1 minute'))
+                  AND event_type = ANY($2::text[])
+                """,
+                minutes,
+                list(_OPS_SUMMARY_EVENT_TYPES),
+            )
+            if row:
+                counts["FAILED"] = int(row["failed"] or 0)
+                counts["POLICY_BLOCK"] = int(row["policy_block"] or 0)
+                counts["EXCEPTION"] = int(row["exception"] or 0)
+                counts["KILL_SWITCH_ON"] = int(row["kill_switch_on"] or 0)
+        except asyncpg.exceptions.UndefinedTableError:
+            failed_row = await conn.fetchrow(
+                """
+                SELECT COUNT(*) AS cnt FROM commands_domain
+                WHERE updated_at >= NOW() - ($1::int * interval '1 minute')
+                  AND status = 'FAILED'
+                """,
+                minutes,
+            )
+            if failed_row:
+                counts["FAILED"] = failed_row["cnt"] or 0
+            counts.update(await _ops_summary_counts_legacy(conn, minutes))
 
         # recent events
         recent_rows = await conn.fetch(
@@ -1007,16 +1087,21 @@ async def _create_domain_command(cmd_id_prefix: str, cmd_type: str, payload: dic
         cmd_id = f"{cmd_id_prefix}-{uuid.uuid4()}"
     now = datetime.utcnow()
     payload_json = _json_dumps(payload if payload else {})
+    # NOTIFY is delivered on commit, so a LISTENing worker wakes only once the row is visible.
     sql = """
-    INSERT INTO commands_domain
-      (id, type, status, payload, attempt, created_at, updated_at)
-    VALUES
-      ($1, $2, 'PENDING', $3::jsonb, 0, $4, $4)
-    RETURNING id, type, status, created_at, updated_at;
+    WITH ins AS (
+      INSERT INTO commands_domain
+        (id, type, status, payload, attempt, created_at, updated_at)
+      VALUES
+        ($1, $2, 'PENDING', $3::jsonb, 0, $4, $4)
+      RETURNING id, type, status, created_at, updated_at
+    )
+    SELECT ins.id, ins.type, ins.status, ins.created_at, ins.updated_at, pg_notify($5, ins.id) AS notified
+    FROM ins;
     """
     try:
         async with pool.acquire() as conn:
-            row = await conn.fetchrow(sql, cmd_id, cmd_type, payload_json, now)
+            row = await conn.fetchrow(sql, cmd_id, cmd_type, payload_json, now, COMMANDS_DOMAIN_CHANNEL)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB insert failed: {e}")
     if row is None:
@@ -1172,6 +1257,10 @@ async def create_domain_flaky():
 @app.post("/domain-commands/quote")
 async def create_domain_quote(body: dict = Body(default_factory=dict)):
     """Create QUOTE: payload defaults symbol=BTCUSDT, side=BUY, notional=100; optional price."""
+    return await _create_domain_command("quote", "QUOTE", _quote_payload(body))
+
+
+def _quote_payload(body: dict | None) -> dict:
     payload = dict(body) if body else {}
     if payload.get("notional_usd") is not None and payload.get("notional") is None:
         payload["notional"] = payload["notional_usd"]
@@ -1181,7 +1270,120 @@ async def create_domain_quote(body: dict = Body(default_factory=dict)):
             payload[k] = v
     if "price" in payload and payload["price"] is None:
         del payload["price"]
-    return await _create_domain_command("quote", "QUOTE", payload)
+    return payload
+
+
+DOMAIN_COMMANDS_BULK_MAX = int(os.getenv("DOMAIN_COMMANDS_BULK_MAX", "5000"))
+_BULK_ORDER_GATES = {
+    "dry-run": (_validate_trade_gate_dry_run_request, _build_trade_gate_dry_run_payload),
+    "testnet": (_validate_trade_gate_testnet_order_request, _build_trade_gate_testnet_order_payload),
+}
+
+
+def _prepare_bulk_item(item) -> tuple[str | None, str | None, dict | None, str | None]:
+    """
+    Shape one bulk item exactly like its single-command endpoint.
+    Returns (cmd_id, cmd_type, payload, error); error is set when the item is rejected.
+    """
+    if not isinstance(item, dict):
+        return None, None, None, "ITEM_NOT_OBJECT"
+    cmd_type = str(item.get("type") or "").strip().upper()
+    body = item.get("payload") if isinstance(item.get("payload"), dict) else {}
+    cmd_id = item.get("id")
+    if cmd_id is not None and (not isinstance(cmd_id, str) or not cmd_id.strip() or len(cmd_id) > 128):
+        return None, cmd_type, None, "ID_INVALID"
+    if cmd_type in ("NOOP", "FAIL", "FLAKY"):
+        payload = dict(body) if cmd_type == "NOOP" else {}
+    elif cmd_type == "QUOTE":
+        payload = _quote_payload(body)
+    elif cmd_type == "ORDER":
+        gate = _BULK_ORDER_GATES.get(str(item.get("gate") or ""))
+        if gate is None:
+            return cmd_id, cmd_type, None, "ORDER_GATE_INVALID"
+        is_valid, reject_reason = gate[0](dict(body))
+        if not is_valid:
+            return cmd_id, cmd_type, None, reject_reason
+        payload = gate[1](dict(body))
+    else:
+        return cmd_id, cmd_type, None, "TYPE_NOT_SUPPORTED"
+    prefix = "order" if cmd_type == "ORDER" else cmd_type.lower()
+    return cmd_id or f"{prefix}-{uuid.uuid4()}", cmd_type, payload, None
+
+
+@app.post("/domain-commands/bulk")
+async def create_domain_commands_bulk(body: dict = Body(default_factory=dict)):
+    """
+    Create many commands in one INSERT. Body: {"commands": [{"type", "payload", "id"?, "gate"?}, ...]}.
+    type: NOOP | FAIL | FLAKY | QUOTE | ORDER (gate: dry-run | testnet, payload = the trade-gate
+    request body). Each item is shaped and checked like its single endpoint and also run through
+    prepare_and_validate_domain_command_payload (reported as "validation"). Optional client ids make
+    replays idempotent: an id that already exists is reported as duplicate. Per-item results
+    (result: created | duplicate | rejected) are returned in request order; the whole batch is one
+    transaction and one worker wakeup.
+    """
+    items = body.get("commands") if isinstance(body, dict) else None
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="commands must be a non-empty array")
+    if len(items) > DOMAIN_COMMANDS_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"at most {DOMAIN_COMMANDS_BULK_MAX} commands per request")
+
+    results: list[dict] = []
+    ids: list[str] = []
+    types: list[str] = []
+    payloads: list[str] = []
+    index_by_id: dict[str, int] = {}
+    for i, item in enumerate(items):
+        cmd_id, cmd_type, payload, error = _prepare_bulk_item(item)
+        result: dict = {"index": i, "id": cmd_id, "type": cmd_type}
+        if payload is not None:
+            summary = prepare_and_validate_domain_command_payload(cmd_type.lower(), payload)["summary"]
+            result["validation"] = {"is_valid": summary["is_valid"], "error_codes": list(summary["error_codes"])}
+        if error is not None:
+            result.update(result="rejected", error=error)
+        elif cmd_id in index_by_id:
+            result.update(result="duplicate")
+        else:
+            # Until the INSERT reports the row; ids it skips (ON CONFLICT) stay duplicate.
+            index_by_id[cmd_id] = i
+            ids.append(cmd_id)
+            types.append(cmd_type)
+            payloads.append(_json_dumps(payload))
+            result.update(result="duplicate")
+        results.append(result)
+
+    if ids:
+        pool = await _get_domain_pg_pool()
+        now = datetime.utcnow()
+        sql = """
+        INSERT INTO commands_domain
+          (id, type, status, payload, attempt, created_at, updated_at)
+        SELECT t.id, t.type, 'PENDING', t.payload, 0, $4, $4
+        FROM unnest($1::text[], $2::text[], $3::jsonb[]) AS t(id, type, payload)
+        ON CONFLICT (id) DO NOTHING
+        RETURNING id, status, created_at, updated_at;
+        """
+        try:
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    rows = await conn.fetch(sql, ids, types, payloads, now)
+                    if rows:
+                        # One wakeup for the batch; delivered on commit like the single-insert notify.
+                        await conn.execute("SELECT pg_notify($1, $2)", COMMANDS_DOMAIN_CHANNEL, rows[0]["id"])
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"DB insert failed: {e}")
+        for row in rows:
+            result = results[index_by_id[row["id"]]]
+            result.update(
+                result="created",
+                status=row["status"],
+                created_at=row["created_at"].isoformat(),
+                updated_at=row["updated_at"].isoformat(),
+            )
+
+    counts = {"created": 0, "duplicate": 0, "rejected": 0}
+    for result in results:
+        counts[result["result"]] += 1
+    return {**counts, "results": results}
 
 
 @app.post("/trade-gate/dry-run-intents")
@@ -1296,6 +1498,8 @@ async def retry_domain_command(domain_id: str):
     """
     async with pool.acquire() as conn:
         updated = await conn.fetchrow(sql_update, domain_id)
+        if updated is not None:
+            await conn.execute("SELECT pg_notify($1, $2)", COMMANDS_DOMAIN_CHANNEL, domain_id)
     if updated is None:
         raise HTTPException(status_code=409, detail="Command not retryable or already retried")
     await append_domain_event_pool(pool, domain_id, "RETRY", int(updated["attempt"]), {"type": updated["type"], "attempt": int(updated["attempt"])})
@@ -1315,88 +1519,280 @@ async def retry_domain_command(domain_id: str):
     }
 
 
+def _iso(v):
+    return v.isoformat() if v is not None else None
+
+
+def _domain_event_item(r) -> dict:
+    return {
+        "id": r["id"],
+        "command_id": r["command_id"],
+        "event_type": r["event_type"],
+        "attempt": r["attempt"],
+        "payload": _ensure_json_result(r["payload"]),
+        "created_at": _iso(r["created_at"]),
+    }
+
+
+def _domain_command_item(r) -> dict:
+    return {
+        "id": r["id"],
+        "type": r["type"],
+        "status": r["status"],
+        "attempt": r["attempt"],
+        "locked_by": r["locked_by"],
+        "locked_at": _iso(r["locked_at"]),
+        "result": _ensure_json_result(r["result"]),
+        "error": r["error"],
+        "payload": _ensure_json_result(r["payload"]),
+        "created_at": _iso(r["created_at"]),
+        "updated_at": _iso(r["updated_at"]),
+    }
+
+
+def _ndjson_line(item: dict) -> str:
+    import json
+    return json.dumps(item, ensure_ascii=False, default=str) + "\n"
+
+
+def _decode_cursor_or_400(cursor: str | None):
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _open_row_stream(sql: str, args: list, render, header: str = "") -> RowStream:
+    """Open the export cursor before the response starts, so a DB failure is a 500, not a cut-off 200."""
+    dsn = _normalize_asyncpg_dsn(os.getenv("DATABASE_URL", ""))
+    try:
+        return await open_row_stream(dsn, sql, args, render, header=header)
+    except StreamCapacityError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB query failed: {e}")
+
+
+def _row_stream_response(rows: RowStream, body=None, **kwargs) -> StreamingResponse:
+    # The background close covers a response that is never iterated (client gone before the body).
+    return StreamingResponse(rows if body is None else body, background=BackgroundTask(rows.aclose), **kwargs)
+
+
+async def _stream_ndjson(sql: str, args: list, item_fn) -> StreamingResponse:
+    rows = await _open_row_stream(sql, args, lambda r: _ndjson_line(item_fn(r)))
+    return _row_stream_response(rows, media_type="application/x-ndjson")
+
+
 @app.get("/domain-commands/{domain_id}/events")
-async def get_domain_command_events(domain_id: str, limit: int = 200):
-    """List append-only events for a domain command, ordered by created_at ASC."""
+async def get_domain_command_events(
+    domain_id: str,
+    response: Response,
+    limit: int = 200,
+    after: str | None = None,
+    fmt: str = Query(default="json", alias="format"),
+):
+    """
+    List append-only events for a domain command, ordered by (created_at, id) ASC.
+    Keyset paging: pass the X-Next-Cursor response header back as ?after=. format=ndjson streams
+    every event (from ?after= if given) without the 500-row cap.
+    """
     pool = await _get_domain_pg_pool()
     if limit < 1:
         limit = 1
     if limit > 500:
         limit = 500
+    position = _decode_cursor_or_400(after)
     async with pool.acquire() as conn:
         # ops-worker, ops-kill-switch are system command_ids; events may exist without commands_domain row
         if domain_id not in ("ops-worker", "ops-kill-switch"):
             exists = await conn.fetchval("SELECT 1 FROM commands_domain WHERE id = $1", domain_id)
             if not exists:
                 raise HTTPException(status_code=404, detail="Not Found")
-        rows = await conn.fetch(
-            """
+        sql = """
             SELECT id, command_id, event_type, attempt, payload, created_at
             FROM domain_events
             WHERE command_id = $1
-            ORDER BY created_at ASC
-            LIMIT $2
-            """,
-            domain_id,
-            limit,
-        )
-    def iso(v):
-        return v.isoformat() if v is not None else None
+        """
+        args: list = [domain_id]
+        if position is not None:
+            sql += " AND (created_at, id) > ($2::timestamptz, $3::bigint)"
+            args += [position[0], int(position[1])]
+        sql += " ORDER BY created_at ASC, id ASC"
+        if fmt == "ndjson":
+            return await _stream_ndjson(sql, args, _domain_event_item)
+        sql += f" LIMIT ${len(args) + 1}"
+        rows = await conn.fetch(sql, *args, limit)
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return [_domain_event_item(r) for r in rows]
+
+
+# Terminal events written by the worker finalize path; ?close_on_terminal=1 ends the stream after one.
+_SSE_TERMINAL_EVENT_TYPES = frozenset({"MARK_DONE", "MARK_FAILED", "RISK_LOCKOUT_BLOCK", "RISK_HARD_LIMITS_BLOCK"})
+_SSE_KEEPALIVE_SEC = float(os.getenv("DOMAIN_EVENTS_SSE_KEEPALIVE_SEC", "15"))
+# Resume re-reads events appended this long before the Last-Event-ID row: ids are assigned at insert,
+# so a smaller id can commit after a larger one the client has already seen.
+_SSE_RESUME_OVERLAP_SEC = float(os.getenv("DOMAIN_EVENTS_SSE_RESUME_OVERLAP_SEC", "5"))
+
+
+def _domain_event_hub() -> DomainEventHub:
+    hub = getattr(app.state, "domain_event_hub", None)
+    if hub is None:
+        hub = DomainEventHub(_normalize_asyncpg_dsn(os.getenv("DATABASE_URL", "")), _get_domain_pg_pool)
+        app.state.domain_event_hub = hub
+    return hub
+
+
+def _sse_event(r) -> str:
+    return f"id: {r['id']}\nevent: domain_event\ndata: {_ndjson_line(_domain_event_item(r))}\n"
+
+
+def _sse_after_id(request: Request, after_id: int | None) -> int | None:
+    if after_id is not None:
+        return after_id
+    raw = (request.headers.get("last-event-id") or "").strip()
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid Last-Event-ID")
 
-    return [
-        {
-            "id": r["id"],
-            "command_id": r["command_id"],
-            "event_type": r["event_type"],
-            "attempt": r["attempt"],
-            "payload": _ensure_json_result(r["payload"]),
-            "created_at": iso(r["created_at"]),
-        }
-        for r in rows
-    ]
+
+async def _sse_domain_events(command_id: str | None, after_id: int | None, close_on_terminal: bool):
+    """
+    Subscribe first, then send the backlog (the command's events, or those after after_id plus an
+    overlap of _SSE_RESUME_OVERLAP_SEC before it), then live rows from the hub, skipping ids already
+    sent. Ends when the hub closes the subscription; the client's EventSource reconnects with
+    Last-Event-ID. Delivery on resume is at-least-once: clients dedupe by id.
+    """
+    from app.ops.event_hub import SUBSCRIBER_MAX_PENDING
+
+    hub = _domain_event_hub()
+    sub = await hub.subscribe(command_id)
+    try:
+        yield "retry: 3000\n\n"
+        sent = set()
+        if command_id is not None or after_id is not None:
+            sql = "SELECT id, command_id, event_type, attempt, payload, created_at FROM domain_events WHERE TRUE"
+            args: list = []
+            if command_id is not None:
+                args.append(command_id)
+                sql += f" AND command_id = ${len(args)}"
+            if after_id is not None:
+                args += [after_id, _SSE_RESUME_OVERLAP_SEC]
+                n = len(args) - 1
+                sql += (
+                    f" AND id <> ${n}::bigint AND (id > ${n}::bigint OR created_at >= "
+                    f"(SELECT created_at FROM domain_events WHERE id = ${n}::bigint)"
+                    f" - ${n + 1}::float8 * interval '1 second')"
+                )
+            sql += f" ORDER BY id LIMIT {SUBSCRIBER_MAX_PENDING}"
+            try:
+                pool = await _get_domain_pg_pool()
+                async with pool.acquire() as conn:
+                    backlog = await conn.fetch(sql, *args)
+            except Exception as e:
+                print(f"[domain/stream] backlog query failed: {e}", flush=True)
+                return
+            if backlog:
+                sent.update(r["id"] for r in backlog)
+                yield "".join(_sse_event(r) for r in backlog)
+            if close_on_terminal and any(r["event_type"] in _SSE_TERMINAL_EVENT_TYPES for r in backlog):
+                return
+            if len(backlog) >= SUBSCRIBER_MAX_PENDING:
+                return
+        while True:
+            rows = [r for r in await sub.next_batch(_SSE_KEEPALIVE_SEC) if r["id"] not in sent]
+            if rows:
+                yield "".join(_sse_event(r) for r in rows)
+                if close_on_terminal and any(r["event_type"] in _SSE_TERMINAL_EVENT_TYPES for r in rows):
+                    return
+            elif sub.closed:
+                return
+            else:
+                yield ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(sub)
+
+
+def _sse_response(gen) -> StreamingResponse:
+    return StreamingResponse(
+        gen,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/domain-commands/{domain_id}/events/stream")
+async def stream_domain_command_events(
+    domain_id: str,
+    request: Request,
+    after_id: int | None = None,
+    close_on_terminal: bool = False,
+):
+    """
+    Server-sent events for one command: every existing event (or those after ?after_id= /
+    Last-Event-ID), then new events as they are written. close_on_terminal=1 ends the stream after
+    MARK_DONE / MARK_FAILED / RISK_*_BLOCK.
+    """
+    if domain_id not in ("ops-worker", "ops-kill-switch"):
+        pool = await _get_domain_pg_pool()
+        async with pool.acquire() as conn:
+            exists = await conn.fetchval("SELECT 1 FROM commands_domain WHERE id = $1", domain_id)
+        if not exists:
+            raise HTTPException(status_code=404, detail="Not Found")
+    return _sse_response(_sse_domain_events(domain_id, _sse_after_id(request, after_id), close_on_terminal))
+
+
+@app.get("/domain-events/stream")
+async def stream_domain_events(request: Request, after_id: int | None = None):
+    """Server-sent events for every command: new events as they are written (after ?after_id= / Last-Event-ID)."""
+    return _sse_response(_sse_domain_events(None, _sse_after_id(request, after_id), False))
 
 
 @app.get("/domain-commands")
-async def list_domain_commands(limit: int = 50):
+async def list_domain_commands(
+    response: Response,
+    limit: int = 50,
+    before: str | None = None,
+    fmt: str = Query(default="json", alias="format"),
+):
+    """
+    List domain commands, newest first by (created_at, id).
+    Keyset paging: pass the X-Next-Cursor response header back as ?before=. format=ndjson streams
+    every command (older than ?before= if given) without the 200-row cap.
+    """
     pool = await _get_domain_pg_pool()
 
     if limit < 1:
         limit = 1
     if limit > 200:
         limit = 200
+    position = _decode_cursor_or_400(before)
 
     sql = """
     SELECT id, type, status, attempt, locked_by, locked_at, result, error, payload, created_at, updated_at
     FROM commands_domain
-    ORDER BY created_at DESC
-    LIMIT $1;
     """
+    args: list = []
+    if position is not None:
+        sql += " WHERE (created_at, id) < ($1::timestamptz, $2::text)"
+        args += [position[0], str(position[1])]
+    sql += " ORDER BY created_at DESC, id DESC"
+    if fmt == "ndjson":
+        return await _stream_ndjson(sql, args, _domain_command_item)
+    sql += f" LIMIT ${len(args) + 1}"
 
     try:
         async with pool.acquire() as conn:
-            rows = await conn.fetch(sql, limit)
+            rows = await conn.fetch(sql, *args, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB query failed: {e}")
 
-    def iso(v):
-        return v.isoformat() if v is not None else None
-
-    return [
-        {
-            "id": r["id"],
-            "type": r["type"],
-            "status": r["status"],
-            "attempt": r["attempt"],
-            "locked_by": r["locked_by"],
-            "locked_at": iso(r["locked_at"]),
-            "result": _ensure_json_result(r["result"]),
-            "error": r["error"],
-            "payload": _ensure_json_result(r["payload"]),
-            "created_at": iso(r["created_at"]),
-            "updated_at": iso(r["updated_at"]),
-        }
-        for r in rows
-    ]
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return [_domain_command_item(r) for r in rows]
 
 
 @app.get("/domain-commands/{domain_id}")
@@ -1457,103 +1853,95 @@ def _is_prod_exec_mode() -> bool:
     except Exception:
         return False
 
+def _history_export_range(from_ts: str | None, to_ts: str | None):
+    now = datetime.now(timezone.utc)
+    if not from_ts:
+        from_dt = now - timedelta(days=7)
+    else:
+        from_dt = datetime.fromisoformat(from_ts.replace("Z", "+00:00"))
+    to_dt = datetime.fromisoformat(to_ts.replace("Z", "+00:00")) if to_ts else now
+    return from_dt, to_dt
+
+
+def _history_export_item(r) -> dict:
+    from app.ops.state_store import state_history_export_row
+    row = state_history_export_row(r)
+    row["payload_json"] = _json.dumps(row.get("payload_json") or {}, ensure_ascii=False)
+    return row
+
+
+def _history_export_csv_line(r) -> str:
+    item = _history_export_item(r)
+    buf = _io.StringIO()
+    _csv.writer(buf).writerow([
+        item["ts"], item["event_type"], item["exec_mode"], item["actor"], item["source"], item["payload_json"],
+    ])
+    return buf.getvalue()
+
+
+async def _json_array_stream(lines):
+    """Wrap a stream of JSON objects (one per chunk line) into one JSON array, incrementally."""
+    first = True
+    yield "["
+    async for chunk in lines:
+        for line in chunk.split("\n"):
+            if not line:
+                continue
+            yield ("" if first else ",") + line
+            first = False
+    yield "]"
+
+
 @app.get("/ops/state/history/export")
 async def ops_state_history_export(
     from_ts: str | None = Query(default=None),
     to_ts: str | None = Query(default=None),
-    limit: int = Query(default=1000, ge=1, le=10000),
+    limit: int = Query(default=1000, ge=0),
     event_type: str | None = Query(default=None),
     actor: str | None = Query(default=None),
     source: str | None = Query(default=None),
+    fmt: str = Query(default="json", alias="format"),
 ):
+    """
+    Streamed from a server-side cursor (constant memory). limit=0 exports the whole range.
+    format=json (default) is one JSON array; format=jsonl is one object per line.
+    """
     if _is_prod_exec_mode():
         from fastapi import HTTPException
         raise HTTPException(status_code=403, detail="export disabled in prod")
-    now = datetime.now(timezone.utc)
-    if not from_ts:
-        from_dt = now - timedelta(days=7)
-    else:
-        from_dt = datetime.fromisoformat(from_ts.replace("Z", "+00:00"))
-    to_dt = datetime.fromisoformat(to_ts.replace("Z", "+00:00")) if to_ts else now
+    from_dt, to_dt = _history_export_range(from_ts, to_ts)
 
-    pool = await _get_domain_pg_pool()
-    from app.ops.state_store import get_state_history_export_rows
-    rows = await get_state_history_export_rows(
-        pool,
-        from_dt=from_dt,
-        to_dt=to_dt,
-        limit=limit,
-        event_type=event_type,
-        actor=actor,
-        source=source,
+    from app.ops.state_store import build_state_history_export_query
+    sql, params = build_state_history_export_query(
+        from_dt, to_dt, limit or None, event_type=event_type, actor=actor, source=source
     )
-    out = []
-    for r in rows:
-        ts_str = r.get("ts", "")
-        if hasattr(ts_str, "isoformat"):
-            ts_str = ts_str.isoformat()
-        else:
-            ts_str = str(ts_str) if ts_str else ""
-        out.append({
-            "ts": ts_str,
-            "event_type": r.get("event_type", ""),
-            "exec_mode": r.get("exec_mode", ""),
-            "actor": r.get("actor", ""),
-            "source": r.get("source", ""),
-            "payload_json": _json.dumps(r.get("payload_json") or {}, ensure_ascii=False),
-        })
-    return out
+    lines = await _open_row_stream(sql, params, lambda r: _ndjson_line(_history_export_item(r)))
+    if fmt == "jsonl":
+        return _row_stream_response(lines, media_type="application/x-ndjson")
+    return _row_stream_response(lines, _json_array_stream(lines), media_type="application/json")
 
 @app.get("/ops/state/history/export.csv")
 async def ops_state_history_export_csv(
     from_ts: str | None = Query(default=None),
     to_ts: str | None = Query(default=None),
-    limit: int = Query(default=1000, ge=1, le=10000),
+    limit: int = Query(default=1000, ge=0),
     event_type: str | None = Query(default=None),
     actor: str | None = Query(default=None),
     source: str | None = Query(default=None),
 ):
+    """Streamed CSV from a server-side cursor (constant memory). limit=0 exports the whole range."""
     if _is_prod_exec_mode():
         from fastapi import HTTPException
         raise HTTPException(status_code=403, detail="export disabled in prod")
-    now = datetime.now(timezone.utc)
-    if not from_ts:
-        from_dt = now - timedelta(days=7)
-    else:
-        from_dt = datetime.fromisoformat(from_ts.replace("Z", "+00:00"))
-    to_dt = datetime.fromisoformat(to_ts.replace("Z", "+00:00")) if to_ts else now
+    from_dt, to_dt = _history_export_range(from_ts, to_ts)
 
-    pool = await _get_domain_pg_pool()
-    from app.ops.state_store import get_state_history_export_rows
-    rows = await get_state_history_export_rows(
-        pool,
-        from_dt=from_dt,
-        to_dt=to_dt,
-        limit=limit,
-        event_type=event_type,
-        actor=actor,
-        source=source,
+    from app.ops.state_store import build_state_history_export_query
+    sql, params = build_state_history_export_query(
+        from_dt, to_dt, limit or None, event_type=event_type, actor=actor, source=source
     )
-
-    buf = _io.StringIO()
-    w = _csv.writer(buf)
-    w.writerow(["ts","event_type","exec_mode","actor","source","payload_json"])
-    for r in rows:
-        ts_str = r.get("ts", "")
-        if hasattr(ts_str, "isoformat"):
-            ts_str = ts_str.isoformat()
-        else:
-            ts_str = str(ts_str) if ts_str else ""
-        w.writerow([
-            ts_str,
-            r.get("event_type", ""),
-            r.get("exec_mode", ""),
-            r.get("actor", ""),
-            r.get("source", ""),
-            _json.dumps(r.get("payload_json") or {}, ensure_ascii=False),
-        ])
-    data = buf.getvalue().encode("utf-8")
+    header = "ts,event_type,exec_mode,actor,source,payload_json\r\n"
     headers = {
         "Content-Disposition": "attachment; filename=ops_state_history_export.csv"
     }
-    return Response(content=data, media_type="text/csv; charset=utf-8", headers=headers)
+    rows = await _open_row_stream(sql, params, _history_export_csv_line, header=header)
+    return _row_stream_response(rows, media_type="text/csv; charset=utf-8", headers=headers)
@@ -0,0 +1,184 @@
+"""
+Fan-out of new domain_events rows to server-sent-event subscribers in this API process.
+Migration 0013 emits pg_notify(DOMAIN_EVENTS_CHANNEL, '<id>,<id>,...') per inserted batch. One
+LISTEN connection per process collects the ids; one query per burst (on the API pool) loads the rows,
+and every subscriber whose command_id matches (or that subscribed to all commands) gets them.
+Nothing is fetched while nobody is subscribed. If the listener drops, or a subscriber falls more
+than SUBSCRIBER_MAX_PENDING rows behind, its stream is closed so the client reconnects with
+Last-Event-ID and catches up from the table. Never raises.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+DOMAIN_EVENTS_CHANNEL = "anchor_domain_events"
+LISTEN_RECONNECT_SEC = 10.0
+SUBSCRIBER_MAX_PENDING = 1000
+
+# The created_at bound lets the partitioned table (0014) prune to today's partitions: notified ids
+# were inserted moments ago.
+_FETCH_SQL = """
+    SELECT id, command_id, event_type, attempt, payload, created_at
+    FROM domain_events
+    WHERE id = ANY($1::bigint[])
+      AND created_at >= NOW() - interval '1 day'
+    ORDER BY id
+"""
+
+
+class Subscription:
+    """Rows for one SSE client; closed when the hub can no longer guarantee a gap-free stream."""
+
+    def __init__(self, command_id: Optional[str]):
+        self.command_id = command_id
+        self.rows: List[Any] = []
+        self.closed = False
+        self._event = asyncio.Event()
+
+    def push(self, row: Any) -> None:
+        if self.closed:
+            return
+        if len(self.rows) >= SUBSCRIBER_MAX_PENDING:
+            self.close()
+            return
+        self.rows.append(row)
+        self._event.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._event.set()
+
+    async def next_batch(self, timeout: float) -> List[Any]:
+        """Wait up to timeout for rows. Returns [] on timeout or when closed."""
+        if not self.rows and not self.closed:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout=max(0.0, timeout))
+            except asyncio.TimeoutError:
+                pass
+        self._event.clear()
+        rows, self.rows = self.rows, []
+        return rows
+
+
+class DomainEventHub:
+    """One LISTEN connection and one fetch loop shared by every Subscription."""
+
+    def __init__(self, dsn: str, pool_getter: Callable[[], Awaitable[Any]], channel: str = DOMAIN_EVENTS_CHANNEL):
+        self._dsn = dsn
+        self._pool_getter = pool_getter
+        self._channel = channel
+        self._conn: Optional[Any] = None
+        self._last_connect_attempt = 0.0
+        self._subs: Set[Subscription] = set()
+        self._pending_ids: Set[int] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.fetches = 0
+
+    @property
+    def listening(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subs)
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        if not self._subs:
+            return
+        for part in (payload or "").split(","):
+            try:
+                self._pending_ids.add(int(part))
+            except ValueError:
+                continue
+        self._wake.set()
+
+    def _on_terminate(self, *_args: Any) -> None:
+        self._conn = None
+        # Notifies sent while disconnected are lost: make every client resync from the table.
+        for sub in list(self._subs):
+            sub.close()
+        self._subs.clear()
+
+    async def start(self) -> bool:
+        """Open the listener if not already open. Returns True when listening."""
+        if self.listening:
+            return True
+        if not self._dsn:
+            return False
+        now = time.monotonic()
+        if self._last_connect_attempt and now - self._last_connect_attempt < LISTEN_RECONNECT_SEC:
+            return False
+        self._last_connect_attempt = now
+        try:
+            import asyncpg
+            conn = await asyncpg.connect(dsn=self._dsn)
+            await conn.add_listener(self._channel, self._on_notify)
+            conn.add_termination_listener(self._on_terminate)
+            self._conn = conn
+            return True
+        except Exception as e:
+            print(f"[domain/stream] LISTEN {self._channel} failed: {e}", flush=True)
+            self._conn = None
+            return False
+
+    async def subscribe(self, command_id: Optional[str] = None) -> Subscription:
+        """Register a subscriber (command_id=None: every command). Listen before reading any backlog."""
+        await self.start()
+        sub = Subscription(command_id)
+        if not self.listening:
+            sub.close()
+            return sub
+        self._subs.add(sub)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._fetch_loop())
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subs.discard(sub)
+        sub.close()
+
+    def dispatch(self, rows: List[Any]) -> None:
+        for row in rows:
+            for sub in list(self._subs):
+                if sub.command_id is None or sub.command_id == row["command_id"]:
+                    sub.push(row)
+                    if sub.closed:
+                        self._subs.discard(sub)
+
+    async def _fetch_loop(self) -> None:
+        while self._subs:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=LISTEN_RECONNECT_SEC)
+            except asyncio.TimeoutError:
+                continue
+            self._wake.clear()
+            ids, self._pending_ids = sorted(self._pending_ids), set()
+            if not ids or not self._subs:
+                continue
+            try:
+                pool = await self._pool_getter()
+                async with pool.acquire() as conn:
+                    rows = await conn.fetch(_FETCH_SQL, ids)
+                self.fetches += 1
+            except Exception as e:
+                print(f"[domain/stream] fetch failed: {e}", flush=True)
+                for sub in list(self._subs):
+                    sub.close()
+                self._subs.clear()
+                continue
+            self.dispatch(rows)
+
+    async def close(self) -> None:
+        for sub in list(self._subs):
+            sub.close()
+        self._subs.clear()
+        if self._task is not None:
+            self._task.cancel()
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            await conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,169 @@
+"""
+Partition maintenance for domain_events (migration 0014: one partition per UTC day). Creates the
+next days' partitions ahead of time and retires partitions whose days are past the retention window,
+either by DETACH (the day stays as a standalone table to archive with pg_dump, then drop) or DROP.
+Rows that landed in domain_events_default and domain_event_rollups buckets older than the window
+are deleted. The worker runs it every DOMAIN_EVENTS_MAINTENANCE_SEC as a background task, off the
+pick loop; an advisory lock keeps concurrent workers from doing it twice.
+
+Env:
+  DOMAIN_EVENTS_RETENTION_DAYS (30)     days kept; 0 = keep everything (partitions are still created)
+  DOMAIN_EVENTS_RETENTION_MODE (detach) detach | drop
+  DOMAIN_EVENTS_PARTITIONS_AHEAD (7)    future days kept ready
+  DOMAIN_EVENTS_MAINTENANCE_SEC (3600)  worker interval; 0 = never (CLI only)
+CLI:
+    python -m app.ops.event_retention [--dry-run]
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+RETENTION_MODES = ("detach", "drop")
+# Only names the migration and domain_events_create_partition() produce are ever interpolated.
+_PARTITION_NAME_RE = re.compile(r"^domain_events_(p\d{8}|legacy)$")
+_UPPER_BOUND_RE = re.compile(r"TO \('([^']+)'\)")
+
+_LIST_PARTITIONS_SQL = """
+    SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'domain_events'::regclass
+    ORDER BY c.relname
+"""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int((os.getenv(name) or "").strip() or default)
+    except ValueError:
+        return default
+
+
+def retention_config() -> Dict[str, Any]:
+    mode = (os.getenv("DOMAIN_EVENTS_RETENTION_MODE") or "detach").strip().lower()
+    return {
+        "retention_days": max(0, _env_int("DOMAIN_EVENTS_RETENTION_DAYS", 30)),
+        "mode": mode if mode in RETENTION_MODES else "detach",
+        "partitions_ahead": max(1, _env_int("DOMAIN_EVENTS_PARTITIONS_AHEAD", 7)),
+        "interval_sec": max(0, _env_int("DOMAIN_EVENTS_MAINTENANCE_SEC", 3600)),
+    }
+
+
+def partition_upper_bound(bound: str) -> Optional[datetime]:
+    """Upper bound of a range partition from pg_get_expr(relpartbound); None for DEFAULT / MAXVALUE."""
+    m = _UPPER_BOUND_RE.search(bound or "")
+    if not m:
+        return None
+    try:
+        return datetime.fromisoformat(m.group(1))
+    except ValueError:
+        return None
+
+
+def retention_cutoff(today: date, retention_days: int) -> datetime:
+    """Start (UTC midnight) of the oldest day kept."""
+    return datetime.combine(today - timedelta(days=retention_days), time(0), tzinfo=timezone.utc)
+
+
+def partitions_to_retire(partitions: List[Tuple[str, str]], cutoff: datetime) -> List[str]:
+    """Names of (name, bound) partitions that only hold rows older than cutoff."""
+    out = []
+    for name, bound in partitions:
+        upper = partition_upper_bound(bound)
+        if upper is not None and upper <= cutoff and _PARTITION_NAME_RE.match(name):
+            out.append(name)
+    return out
+
+
+async def run_event_maintenance(
+    engine: Any, dry_run: bool = False, today: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    One maintenance pass. Returns {"ok", "created", "retired", ...}; "skipped" when another process
+    holds the lock or domain_events is not partitioned yet. Never raises ("error" set on failure).
+    Each partition create, detach/drop and purge commits in its own short transaction, so the
+    ACCESS EXCLUSIVE locks DDL takes on domain_events are held for one statement, not the whole
+    pass. A session advisory lock on the same connection spans the steps. A failed step stops the
+    pass; the steps before it stay committed.
+    """
+    cfg = retention_config()
+    today = today or datetime.now(timezone.utc).date()
+    out: Dict[str, Any] = {"ok": True, "mode": cfg["mode"], "dry_run": dry_run, "created": [], "retired": []}
+    try:
+        async with engine.connect() as conn:
+            async with conn.begin():
+                r = await conn.execute(text("SELECT pg_try_advisory_lock(hashtext('domain_events_maintenance'))"))
+                locked = bool(r.scalar())
+            if not locked:
+                out["skipped"] = "locked"
+                return out
+            try:
+                await _maintain(conn, cfg, today, dry_run, out)
+            finally:
+                async with conn.begin():
+                    await conn.execute(text("SELECT pg_advisory_unlock(hashtext('domain_events_maintenance'))"))
+        return out
+    except Exception as e:
+        out.update(ok=False, error=str(e))
+        return out
+
+
+async def _step(conn: Any, sql: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    """Run one statement in its own transaction, giving up on table locks after 5s."""
+    async with conn.begin():
+        await conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+        return await conn.execute(text(sql), params or {})
+
+
+async def _maintain(conn: Any, cfg: Dict[str, Any], today: date, dry_run: bool, out: Dict[str, Any]) -> None:
+    r = await _step(conn, "SELECT relkind FROM pg_class WHERE relname = 'domain_events'")
+    if r.scalar() != "p":
+        out["skipped"] = "not_partitioned"
+        return
+
+    if not dry_run:
+        for i in range(cfg["partitions_ahead"]):
+            r = await _step(
+                conn, "SELECT domain_events_create_partition(CAST(:day AS date))", {"day": today + timedelta(days=i)}
+            )
+            name = r.scalar()
+            if name:
+                out["created"].append(name)
+
+    if cfg["retention_days"] <= 0:
+        return
+    cutoff = retention_cutoff(today, cfg["retention_days"])
+    out["cutoff"] = cutoff.isoformat()
+    r = await _step(conn, _LIST_PARTITIONS_SQL)
+    retire = partitions_to_retire([(row["name"], row["bound"]) for row in r.mappings().all()], cutoff)
+    out["retired"] = retire
+    if dry_run:
+        return
+    for name in retire:
+        if cfg["mode"] == "drop":
+            await _step(conn, f"DROP TABLE {name}")
+        else:
+            await _step(conn, f"ALTER TABLE domain_events DETACH PARTITION {name}")
+    # Row deletes take no table lock beyond ROW EXCLUSIVE; each is its own transaction after the DDL.
+    r = await _step(conn, "DELETE FROM domain_events_default WHERE created_at < :cutoff", {"cutoff": cutoff})
+    out["purged_default"] = r.rowcount
+    r = await _step(conn, "DELETE FROM domain_event_rollups WHERE bucket < :cutoff", {"cutoff": cutoff})
+    out["purged_rollups"] = r.rowcount
+
+
+async def _main(argv: list) -> int:
+    from app.db import engine
+
+    result = await run_event_maintenance(engine, dry_run="--dry-run" in argv)
+    print(json.dumps(result, ensure_ascii=False, indent=2), flush=True)
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
@@ -1,11 +1,45 @@
 """
 Kill switch: env (priority) or Redis. Never raises; failures return (False, "none").
+
+The Redis value is served from memory. KillSwitchCache holds it, and a listener thread keeps it
+current:
+- It subscribes to REDIS_CHANNEL, which set_kill_switch_redis publishes to in the same MULTI as the SET.
+- It also subscribes to keyspace events for REDIS_KEY, which fire only if the server has
+  notify-keyspace-events enabled, so a raw `redis-cli SET` is picked up.
+- It re-reads the key every KILL_SWITCH_RESYNC_SEC.
+
+A cached value is trusted only while something arrived on the subscription within
+KILL_SWITCH_MAX_STALENESS_SEC: a message, a keyspace event, or the reply to the PING the listener
+sends on the pub/sub connection every half interval. A silent timeout proves nothing (a half-open
+connection after a NAT idle drop or failover looks the same), so it never refreshes the value.
+Past the bound (subscription dropped or half-open, Redis down, or the listener not yet primed),
+get_kill_switch_state does the direct GET it always did. If that GET fails while the last known
+value was ON, the answer stays ON: an outage never switches trading back on.
+
+Env:
+  KILL_SWITCH_MAX_STALENESS_SEC (5)   cached value older than this falls back to a direct GET
+  KILL_SWITCH_RESYNC_SEC (30)         listener re-reads the key this often (missed messages)
+  KILL_SWITCH_CACHE_DISABLE (0)       1 = direct GET on every call (previous behaviour)
 """
 import os
-from typing import Optional, Tuple
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 
 REDIS_KEY = "anchor:kill_switch"
+REDIS_CHANNEL = "anchor:kill_switch:changed"
+KEYSPACE_PATTERN = f"__keyspace@*__:{REDIS_KEY}"
+_PING_TOKEN = "anchor-kill-switch"
 _redis_client: Optional[object] = None
+_cache: Optional["KillSwitchCache"] = None
+_cache_lock = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float((os.getenv(name) or "").strip() or default)
+    except ValueError:
+        return default
 
 
 def _get_redis_client():
@@ -23,27 +57,191 @@ def _get_redis_client():
         return None
 
 
+class KillSwitchCache:
+    """Last known Redis value plus the listener thread that keeps it current. Thread-safe."""
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_staleness_sec: Optional[float] = None,
+        resync_sec: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._connect = connect
+        self.max_staleness_sec = (
+            max_staleness_sec if max_staleness_sec is not None else _env_float("KILL_SWITCH_MAX_STALENESS_SEC", 5.0)
+        )
+        self.resync_sec = resync_sec if resync_sec is not None else _env_float("KILL_SWITCH_RESYNC_SEC", 30.0)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._value: Optional[bool] = None
+        self._confirmed_at = 0.0
+        self._live = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+        self.reconnects = 0
+
+    def confirm(self, enabled: bool) -> None:
+        """Record a value just read from (or written to) Redis."""
+        with self._lock:
+            if self._value != enabled:
+                self.updates += 1
+            self._value = enabled
+            self._confirmed_at = self._clock()
+
+    def _alive(self) -> None:
+        with self._lock:
+            if self._value is not None:
+                self._confirmed_at = self._clock()
+
+    def cached(self) -> Optional[bool]:
+        """The value if confirmed within max_staleness_sec, else None (caller reads Redis directly)."""
+        with self._lock:
+            if self._value is not None and self._clock() - self._confirmed_at <= self.max_staleness_sec:
+                self.hits += 1
+                return self._value
+            self.misses += 1
+            return None
+
+    def last_known(self) -> Optional[bool]:
+        with self._lock:
+            return self._value
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="kill-switch-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                self._session(self._connect())
+                backoff = 0.5
+            except Exception as e:
+                if self._live:
+                    print(f"[kill_switch] subscription dropped: {e}", flush=True)
+                self._live = False
+                with self._lock:
+                    self.reconnects += 1
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _session(self, client: Any) -> None:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(REDIS_CHANNEL)
+            pubsub.psubscribe(KEYSPACE_PATTERN)
+            # Read after subscribing so a change published in between is not lost.
+            self.confirm(client.get(REDIS_KEY) == "1")
+            last_sync = last_ping = self._clock()
+            ping_every = self.max_staleness_sec / 2
+            pubsub.ping(_PING_TOKEN)
+            self._live = True
+            while not self._stop.is_set():
+                msg = pubsub.get_message(timeout=min(1.0, ping_every))
+                if msg and msg.get("type") == "pong":
+                    self._alive()
+                elif msg and msg.get("channel") == REDIS_CHANNEL:
+                    self.confirm(msg.get("data") == "1")
+                elif msg:
+                    # Keyspace event: the payload is the command name, so read the key.
+                    self.confirm(client.get(REDIS_KEY) == "1")
+                now = self._clock()
+                if now - last_sync >= self.resync_sec:
+                    self.confirm(client.get(REDIS_KEY) == "1")
+                    last_sync = now
+                if now - last_ping >= ping_every:
+                    pubsub.ping(_PING_TOKEN)
+                    last_ping = now
+        finally:
+            self._live = False
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "live": self._live,
+                "value": self._value,
+                "age_sec": round(self._clock() - self._confirmed_at, 1) if self._value is not None else None,
+                "max_staleness_sec": self.max_staleness_sec,
+                "hits": self.hits,
+                "misses": self.misses,
+                "updates": self.updates,
+                "reconnects": self.reconnects,
+            }
+
+
+def _subscriber_client():
+    import redis
+    url = os.getenv("REDIS_URL", "redis://redis:6379/0")
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+def get_kill_switch_cache() -> Optional[KillSwitchCache]:
+    """Process-wide cache; the listener starts on first use. None when disabled or redis is unavailable."""
+    global _cache
+    if (os.getenv("KILL_SWITCH_CACHE_DISABLE") or "").strip() == "1":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    import redis  # noqa: F401
+                except Exception:
+                    return None
+                cache = KillSwitchCache(_subscriber_client)
+                cache.start()
+                _cache = cache
+    return _cache
+
+
 def get_kill_switch_state() -> Tuple[bool, str]:
     """Returns (enabled, source). Priority: env > redis > none."""
     if (os.getenv("ANCHOR_KILL_SWITCH") or "").strip() == "1":
         return (True, "env")
+    cache = get_kill_switch_cache()
+    if cache is not None:
+        cached = cache.cached()
+        if cached is not None:
+            return (True, "redis") if cached else (False, "none")
     try:
         r = _get_redis_client()
         if r is not None:
             val = r.get(REDIS_KEY)
+            if cache is not None:
+                cache.confirm(val == "1")
             if val == "1":
                 return (True, "redis")
     except Exception as e:
         print(f"[kill_switch] redis get failed: {e}", flush=True)
+        if cache is not None and cache.last_known():
+            return (True, "redis")
     return (False, "none")
 
 
 def set_kill_switch_redis(enabled: bool) -> bool:
-    """Set redis key. Returns True on success, False on failure. Never raises."""
+    """Set redis key and publish the change. Returns True on success, False on failure. Never raises."""
+    value = "1" if enabled else "0"
     try:
         r = _get_redis_client()
         if r is not None:
-            r.set(REDIS_KEY, "1" if enabled else "0")
+            pipe = r.pipeline(transaction=True)
+            pipe.set(REDIS_KEY, value)
+            pipe.publish(REDIS_CHANNEL, value)
+            pipe.execute()
+            cache = get_kill_switch_cache()
+            if cache is not None:
+                cache.confirm(enabled)
             return True
     except Exception as e:
         print(f"[kill_switch] redis set failed: {e}", flush=True)
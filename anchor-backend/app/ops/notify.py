@@ -1,34 +1,291 @@
 """
 Telegram notify with throttling. Never raises; failures are logged.
 TELEGRAM_NOTIFY_ENABLED=1 to enable; otherwise no-op.
+
+send_telegram only enqueues, so an event write or the panic guard never waits on the Telegram API.
+TelegramDispatcher delivers from one background thread:
+- The first alert for a throttle_key goes out at once.
+- Alerts for the same key submitted within TELEGRAM_THROTTLE_SECONDS of the end of the last send
+  are coalesced (including those queued behind a slow send or retry). When the window ends,
+  they go out as one digest message with a count and the first few texts.
+- Network errors, 5xx and 429 (honouring retry_after) are retried with exponential backoff.
+- Other 4xx (bad token or chat) are not retried.
+- When the queue is full, the alert is dropped and counted.
+
+Env:
+  TELEGRAM_THROTTLE_SECONDS (60)     digest window per throttle_key
+  TELEGRAM_QUEUE_MAX (256)           queued alerts; more are dropped
+  TELEGRAM_MAX_RETRIES (3)           retries per message after the first attempt
+  TELEGRAM_RETRY_BACKOFF_SEC (1)     first retry delay, doubled per retry (max 30)
+  TELEGRAM_DIGEST_SAMPLES (5)        alert texts quoted in a digest
+  TELEGRAM_API_BASE (https://api.telegram.org)
 """
 import os
+import queue
+import threading
 import time
-from typing import Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-_telegram_throttle: Dict[str, float] = {}
 TELEGRAM_THROTTLE_SECONDS = float(os.getenv("TELEGRAM_THROTTLE_SECONDS", "60"))
+_MAX_TEXT = 4000
+_MAX_BACKOFF_SEC = 30.0
 
+# send(text) -> (delivered, retryable, retry_after_sec)
+Sender = Callable[[str], Tuple[bool, bool, Optional[float]]]
 
-def send_telegram(text: str, throttle_key: str = "default") -> None:
-    """Send text to Telegram. Throttled by throttle_key. Never raises."""
-    if (os.getenv("TELEGRAM_NOTIFY_ENABLED") or "").strip() != "1":
-        return
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float((os.getenv(name) or "").strip() or default)
+    except ValueError:
+        return default
+
+
+def _enabled() -> bool:
+    return (
+        (os.getenv("TELEGRAM_NOTIFY_ENABLED") or "").strip() == "1"
+        and bool((os.getenv("TELEGRAM_BOT_TOKEN") or "").strip())
+        and bool((os.getenv("TELEGRAM_CHAT_ID") or "").strip())
+    )
+
+
+class _Digest:
+    __slots__ = ("count", "first_ts", "samples")
+
+    def __init__(self, now: float) -> None:
+        self.count = 0
+        self.first_ts = now
+        self.samples: List[str] = []
+
+
+class TelegramDispatcher:
+    """Bounded queue plus one delivery thread. submit() never blocks; stats() goes in the worker heartbeat."""
+
+    def __init__(
+        self,
+        send: Optional[Sender] = None,
+        maxsize: Optional[int] = None,
+        throttle_sec: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_sec: Optional[float] = None,
+        digest_samples: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._send = send or _post_telegram
+        self.throttle_sec = throttle_sec if throttle_sec is not None else TELEGRAM_THROTTLE_SECONDS
+        self.max_retries = max(0, int(max_retries if max_retries is not None else _env_float("TELEGRAM_MAX_RETRIES", 3)))
+        self.backoff_sec = backoff_sec if backoff_sec is not None else _env_float("TELEGRAM_RETRY_BACKOFF_SEC", 1.0)
+        self.digest_samples = max(1, int(digest_samples if digest_samples is not None else _env_float("TELEGRAM_DIGEST_SAMPLES", 5)))
+        self._clock = clock
+        self._queue: "queue.Queue[Optional[Tuple[str, str, float]]]" = queue.Queue(
+            max(1, int(maxsize if maxsize is not None else _env_float("TELEGRAM_QUEUE_MAX", 256)))
+        )
+        self._pending: Dict[str, _Digest] = {}
+        self._last_sent: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.digests = 0
+        self.retries = 0
+        self.failed = 0
+
+    def submit(self, text: str, throttle_key: str = "default") -> bool:
+        """Queue one alert. False (and counted) when the queue is full. Never blocks, never raises."""
+        self.start()
+        try:
+            self._queue.put_nowait((text[:_MAX_TEXT], throttle_key, self._clock()))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                print(f"[telegram] queue full, dropped={self.dropped}", flush=True)
+            return False
+        self.enqueued += 1
+        return True
+
+    def start(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="telegram-notify", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=self._wait_sec())
+            except queue.Empty:
+                pass
+            else:
+                try:
+                    if item is not None:
+                        self._accept(*item)
+                finally:
+                    self._queue.task_done()
+            self._flush_due()
+
+    def _wait_sec(self) -> float:
+        if not self._pending:
+            return 1.0
+        now = self._clock()
+        due = min(self._last_sent.get(key, now) + self.throttle_sec for key in self._pending)
+        return min(1.0, max(0.01, due - now))
+
+    def _accept(self, text: str, key: str, submitted: float) -> None:
+        # Judged by submit time: alerts that queued up behind a slow send or a retry backoff still
+        # fall inside the window and are coalesced.
+        last = self._last_sent.get(key)
+        if key not in self._pending and (last is None or submitted - last >= self.throttle_sec):
+            self._deliver(text, key)
+            return
+        digest = self._pending.get(key)
+        if digest is None:
+            digest = self._pending[key] = _Digest(submitted)
+        digest.count += 1
+        self.coalesced += 1
+        if len(digest.samples) < self.digest_samples:
+            digest.samples.append(text[:500])
+
+    def _flush_due(self, force: bool = False) -> None:
+        now = self._clock()
+        for key in list(self._pending):
+            if force or now - self._last_sent.get(key, now) >= self.throttle_sec:
+                digest = self._pending.pop(key)
+                self.digests += 1
+                self._deliver(self._render(key, digest, now), key)
+
+    def _render(self, key: str, digest: _Digest, now: float) -> str:
+        lines = [f"[digest {key}] {digest.count} alerts in {int(now - digest.first_ts)}s"]
+        lines.extend(digest.samples)
+        if digest.count > len(digest.samples):
+            lines.append(f"(+{digest.count - len(digest.samples)} more)")
+        return "\n".join(lines)[:_MAX_TEXT]
+
+    def _deliver(self, text: str, key: str) -> bool:
+        try:
+            return self._attempt(text)
+        finally:
+            # The window restarts when the attempt ends, delivered or not, so a down API is not hammered
+            # per alert and alerts submitted while it was blocked are coalesced.
+            self._last_sent[key] = self._clock()
+
+    def _attempt(self, text: str) -> bool:
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+            try:
+                ok, retryable, retry_after = self._send(text)
+            except Exception as e:
+                print(f"[telegram] send error: {e}", flush=True)
+                ok, retryable, retry_after = False, True, None
+            if ok:
+                self.sent += 1
+                return True
+            if not retryable or attempt == self.max_retries or self._stop.is_set():
+                break
+            delay = retry_after if retry_after is not None else self.backoff_sec * (2 ** attempt)
+            self._stop.wait(min(_MAX_BACKOFF_SEC, max(0.0, delay)))
+        self.failed += 1
+        return False
+
+    def drain(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued alert has been handled (digests still held back by the window stay pending)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Deliver what is queued, send pending digests now, stop the thread."""
+        if self._thread is not None:
+            self.drain(timeout)
+        self._stop.set()
+        if self._thread is not None:
+            try:
+                self._queue.put_nowait(None)  # wake the thread
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return
+        # Thread is gone: this caller owns the digests; clear stop so their retries still run.
+        self._stop.clear()
+        self._flush_due(force=True)
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "pending_digests": len(self._pending),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "digests": self.digests,
+            "retries": self.retries,
+            "failed": self.failed,
+        }
+
+
+_session: Any = None
+
+
+def _post_telegram(text: str) -> Tuple[bool, bool, Optional[float]]:
+    """One sendMessage call (keep-alive session). Returns (delivered, retryable, retry_after_sec)."""
+    global _session
+    import requests
+
+    if _session is None:
+        _session = requests.Session()
     token = (os.getenv("TELEGRAM_BOT_TOKEN") or "").strip()
     chat_id = (os.getenv("TELEGRAM_CHAT_ID") or "").strip()
-    if not token or not chat_id:
+    base = (os.getenv("TELEGRAM_API_BASE") or "https://api.telegram.org").rstrip("/")
+    r = _session.post(f"{base}/bot{token}/sendMessage", json={"chat_id": chat_id, "text": text}, timeout=10)
+    if r.status_code == 200:
+        return (True, False, None)
+    print(f"[telegram] send failed status={r.status_code} body={r.text[:200]}", flush=True)
+    retry_after = None
+    if r.status_code == 429:
+        try:
+            retry_after = float(r.json()["parameters"]["retry_after"])
+        except Exception:
+            retry_after = None
+    return (False, r.status_code == 429 or r.status_code >= 500, retry_after)
+
+
+_dispatcher: Optional[TelegramDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_telegram_dispatcher() -> TelegramDispatcher:
+    """The process-wide dispatcher (thread starts on first alert)."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = TelegramDispatcher()
+    return _dispatcher
+
+
+def close_telegram_dispatcher(timeout: float = 2.0) -> None:
+    """Flush and stop the process-wide dispatcher, if one was created (shutdown). Blocks up to ~2*timeout. Never raises."""
+    dispatcher = _dispatcher
+    if dispatcher is None:
         return
-    now = time.time()
-    last = _telegram_throttle.get(throttle_key, 0.0)
-    if now - last < TELEGRAM_THROTTLE_SECONDS:
+    try:
+        dispatcher.close(timeout)
+    except Exception as e:
+        print(f"[telegram] close error: {e}", flush=True)
+
+
+def send_telegram(text: str, throttle_key: str = "default") -> None:
+    """Queue text for Telegram, coalesced per throttle_key. Never blocks, never raises."""
+    if not _enabled():
         return
     try:
-        import requests
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
-        r = requests.post(url, json={"chat_id": chat_id, "text": text[:4000]}, timeout=10)
-        if r.status_code == 200:
-            _telegram_throttle[throttle_key] = now
-        else:
-            print(f"[telegram] send failed status={r.status_code} body={r.text[:200]}", flush=True)
+        get_telegram_dispatcher().submit(text, throttle_key)
     except Exception as e:
-        print(f"[telegram] send error: {e}", flush=True)
+        print(f"[telegram] enqueue error: {e}", flush=True)
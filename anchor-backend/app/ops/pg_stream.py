@@ -0,0 +1,140 @@
+"""
+Keyset cursors and constant-memory row streaming for list/export endpoints.
+Cursors are opaque url-safe tokens for a (created_at, id) position. open_row_stream() opens an
+asyncpg server-side cursor on a dedicated connection (not the API pool, so a long export cannot
+starve request handlers) and returns a RowStream of rendered chunks for a StreamingResponse.
+At most EXPORT_STREAM_MAX_CONNECTIONS (4) such connections are open per process; a request that
+cannot get a slot within EXPORT_STREAM_ACQUIRE_TIMEOUT_SEC (5) fails with StreamCapacityError.
+"""
+import asyncio
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence, Tuple
+
+STREAM_PREFETCH_ROWS = 500
+STREAM_CHUNK_ROWS = 200
+EXPORT_STREAM_MAX_CONNECTIONS = max(1, int(os.getenv("EXPORT_STREAM_MAX_CONNECTIONS", "4")))
+EXPORT_STREAM_ACQUIRE_TIMEOUT_SEC = float(os.getenv("EXPORT_STREAM_ACQUIRE_TIMEOUT_SEC", "5"))
+
+# One semaphore per event loop (asyncio primitives are loop-bound).
+_slots: Dict[int, asyncio.Semaphore] = {}
+
+
+class StreamCapacityError(Exception):
+    """Every export connection slot stayed busy for EXPORT_STREAM_ACQUIRE_TIMEOUT_SEC."""
+
+
+def _stream_slots() -> asyncio.Semaphore:
+    key = id(asyncio.get_running_loop())
+    sem = _slots.get(key)
+    if sem is None:
+        sem = _slots[key] = asyncio.Semaphore(EXPORT_STREAM_MAX_CONNECTIONS)
+    return sem
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, Any]:
+    """Inverse of encode_cursor. Raises ValueError on a malformed token."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.fromisoformat(created_at), row_id
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {e}") from e
+
+
+class RowStream:
+    """
+    An open export: connection, read-only transaction and server-side cursor, plus the first rows.
+    Iterate it (once) for the rendered chunks; the connection is closed when iteration ends or the
+    client goes away. aclose() is idempotent, for a response that is never iterated.
+    """
+
+    def __init__(
+        self,
+        conn: Any,
+        cursor: Any,
+        first: list,
+        render: Callable[[Any], str],
+        header: str,
+        prefetch: int,
+        slot: Optional[asyncio.Semaphore] = None,
+    ):
+        self._conn = conn
+        self._cursor = cursor
+        self._first = first
+        self._render = render
+        self._header = header
+        self._prefetch = prefetch
+        self._slot = slot
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            if self._header:
+                yield self._header
+            rows, self._first = self._first, []
+            while rows:
+                for i in range(0, len(rows), STREAM_CHUNK_ROWS):
+                    yield "".join(self._render(r) for r in rows[i : i + STREAM_CHUNK_ROWS])
+                if len(rows) < self._prefetch:
+                    break
+                rows = await self._cursor.fetch(self._prefetch)
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._conn.close()
+        finally:
+            if self._slot is not None:
+                self._slot.release()
+
+
+async def open_row_stream(
+    dsn: str,
+    sql: str,
+    args: Sequence[Any],
+    render: Callable[[Any], str],
+    header: str = "",
+    prefetch: int = STREAM_PREFETCH_ROWS,
+) -> RowStream:
+    """
+    Take an export slot, connect, open the cursor and fetch the first rows before anything is sent,
+    so a capacity, connect or query failure raises here (the endpoint maps it to an HTTP error)
+    instead of cutting off a 200 response. The returned RowStream yields header, then render(row) for every row of sql, grouped into chunks
+    of up to STREAM_CHUNK_ROWS rows.
+    """
+    import asyncpg
+
+    slot = _stream_slots()
+    try:
+        await asyncio.wait_for(slot.acquire(), timeout=EXPORT_STREAM_ACQUIRE_TIMEOUT_SEC)
+    except asyncio.TimeoutError:
+        raise StreamCapacityError(
+            f"all {EXPORT_STREAM_MAX_CONNECTIONS} export connections busy; retry later"
+        ) from None
+    conn = None
+    try:
+        conn = await asyncpg.connect(dsn=dsn)
+        tr = conn.transaction(readonly=True)
+        await tr.start()
+        cursor = await conn.cursor(sql, *args)
+        first = await cursor.fetch(prefetch)
+    except BaseException:
+        try:
+            if conn is not None:
+                await conn.close()
+        finally:
+            slot.release()
+        raise
+    return RowStream(conn, cursor, first, render, header, prefetch, slot=slot)
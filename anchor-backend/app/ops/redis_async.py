@@ -0,0 +1,50 @@
+"""
+Shared asyncio Redis client for hot-path state (rate limits, cooldowns, caches). Never raises.
+One client per event loop (redis.asyncio connections are loop-bound). After a failure the client
+is marked unavailable for REDIS_ASYNC_RETRY_SEC so callers fall back to in-memory state instead of
+paying a connect timeout on every call.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Optional
+
+REDIS_ASYNC_RETRY_SEC = float(os.getenv("REDIS_ASYNC_RETRY_SEC", "30"))
+REDIS_ASYNC_TIMEOUT_SEC = float(os.getenv("REDIS_ASYNC_TIMEOUT_SEC", "0.5"))
+
+_clients: dict = {}
+_down_until: list = [0.0]
+
+
+def get_async_redis() -> Optional[Any]:
+    """Lazy redis.asyncio client for the running loop, or None while Redis is marked down."""
+    if time.monotonic() < _down_until[0]:
+        return None
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    client = _clients.get(id(loop))
+    if client is not None:
+        return client
+    try:
+        import redis.asyncio as redis_asyncio
+        url = os.getenv("REDIS_URL", "redis://redis:6379/0")
+        client = redis_asyncio.Redis.from_url(
+            url,
+            decode_responses=True,
+            socket_connect_timeout=REDIS_ASYNC_TIMEOUT_SEC,
+            socket_timeout=REDIS_ASYNC_TIMEOUT_SEC,
+        )
+        _clients.clear()
+        _clients[id(loop)] = client
+        return client
+    except Exception as e:
+        print(f"[redis_async] init failed: {e}", flush=True)
+        mark_redis_down()
+        return None
+
+
+def mark_redis_down() -> None:
+    """Call after a Redis command fails; skips Redis for REDIS_ASYNC_RETRY_SEC."""
+    _down_until[0] = time.monotonic() + REDIS_ASYNC_RETRY_SEC
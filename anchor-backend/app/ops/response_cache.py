@@ -0,0 +1,145 @@
+"""
+Response cache for console-polled read endpoints (/ops/state, /ops/worker, /risk/state,
+/ops/summary). Per key: the rendered JSON body is kept for the endpoint's TTL, and
+concurrent misses share one computation (TTL 0 still coalesces). Responses carry a weak ETag over
+the body without volatile fields (generated_at), so a poll whose If-None-Match still matches gets
+304 with no body even after a recompute. Writes call invalidate(name). Never raises beyond compute().
+
+TTL per endpoint: RESPONSE_CACHE_TTL_<NAME> (seconds), e.g. RESPONSE_CACHE_TTL_OPS_SUMMARY=5.
+RESPONSE_CACHE_DISABLE=1 computes every request (ETag/304 still apply).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+# /risk/state has its own invalidated snapshot (app/risk/state_cache.py): coalesce + ETag only.
+DEFAULT_TTL_SEC = {
+    "ops_state": 1.0,
+    "ops_worker": 2.0,
+    "risk_state": 0.0,
+    "ops_summary": 5.0,
+}
+VOLATILE_KEYS = frozenset({"generated_at"})
+
+
+def response_cache_ttl(name: str) -> float:
+    if (os.getenv("RESPONSE_CACHE_DISABLE") or "").strip() == "1":
+        return 0.0
+    default = DEFAULT_TTL_SEC.get(name, 0.0)
+    raw = (os.getenv(f"RESPONSE_CACHE_TTL_{name.upper()}") or "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return default
+
+
+def render_body(content: Any) -> bytes:
+    """Same encoding as FastAPI's default JSONResponse."""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def compute_etag(content: Any) -> str:
+    if isinstance(content, dict):
+        content = {k: v for k, v in content.items() if k not in VOLATILE_KEYS}
+    digest = hashlib.sha1(render_body(content)).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison against a comma-separated If-None-Match list."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        c = candidate.strip()
+        if c == "*":
+            return True
+        if (c[2:] if c.startswith("W/") else c) == opaque:
+            return True
+    return False
+
+
+class _Entry:
+    __slots__ = ("body", "etag", "stored_at")
+
+    def __init__(self, body: bytes, etag: str, stored_at: float):
+        self.body = body
+        self.etag = etag
+        self.stored_at = stored_at
+
+
+class ResponseCache:
+    """Keyed rendered responses with TTL, single-flight fill and generation-based invalidation."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._entries: Dict[str, _Entry] = {}
+        self._inflight: Dict[str, "asyncio.Future[_Entry]"] = {}
+        self._generation: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return key.split(":", 1)[0]
+
+    def invalidate(self, *names: str) -> None:
+        """Drop every entry of the given endpoint names (all entries if none given)."""
+        targets = set(names) or {self._name(k) for k in self._entries} | set(self._generation)
+        for name in targets:
+            self._generation[name] = self._generation.get(name, 0) + 1
+        for key in [k for k in self._entries if self._name(k) in targets]:
+            del self._entries[key]
+
+    async def _fill(self, key: str, ttl: float, compute: Callable[[], Awaitable[Any]]) -> _Entry:
+        name = self._name(key)
+        generation = self._generation.get(name, 0)
+        try:
+            content = await compute()
+            entry = _Entry(render_body(content), compute_etag(content), self._clock())
+            # An invalidation that lands mid-compute may postdate what we read: do not store.
+            if ttl > 0 and generation == self._generation.get(name, 0):
+                self._entries[key] = entry
+            return entry
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get(self, key: str, ttl: float, compute: Callable[[], Awaitable[Any]]) -> Tuple[bytes, str]:
+        """Return (body, etag) for key, from cache or from one shared compute()."""
+        entry = self._entries.get(key)
+        if entry is not None and self._clock() - entry.stored_at < ttl:
+            self.hits += 1
+            return entry.body, entry.etag
+        fut = self._inflight.get(key)
+        if fut is None:
+            self.misses += 1
+            # A task, so a client that disconnects does not cancel the fill for the others.
+            fut = self._inflight[key] = asyncio.ensure_future(self._fill(key, ttl, compute))
+        else:
+            self.hits += 1
+        entry = await asyncio.shield(fut)
+        return entry.body, entry.etag
+
+
+response_cache = ResponseCache()
+
+
+async def cached_json_response(
+    request: Optional[Request], name: str, compute: Callable[[], Awaitable[Any]], key: str = ""
+) -> Response:
+    """200 with the (cached) JSON body and ETag, or 304 when the client's If-None-Match matches."""
+    body, etag = await response_cache.get(f"{name}:{key}", response_cache_ttl(name), compute)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -3,17 +3,21 @@ Built-in policies: idempotency, rate limit, cooldown. Defaults set so e2e does n
 """
 import os
 import time
-from typing import Any, Dict
-
-from sqlalchemy import text
+from typing import Any, Dict, Optional
 
+from app.db.statements import stmt
+from app.policies.cooldown_cache import last_failures
 from app.policies.protocol import Policy, PolicyDecision
+from app.policies.rate_limiter import rate_limiter
+from app.policies.terminal_ledger import recent_terminals
 
 
 class IdempotencyPolicy(Policy):
     """
     Same (command_id, attempt) may only receive MARK_* once.
-    Query domain_events for existing MARK_DONE or MARK_FAILED for this command_id + attempt.
+    Lookup order: in-worker LRU of recently finalized pairs, then the pick's own
+    terminal_written flag (ledger probe done inside the pick statement), then a primary-key
+    probe on domain_command_terminals. The common path makes no extra database call.
     """
 
     name = "idempotency"
@@ -28,27 +32,28 @@ class IdempotencyPolicy(Policy):
         attempt = int(command_dict.get("attempt", 0) or getattr(ctx, "attempt", 0) or 0)
         if not command_id:
             return {"allowed": True, "code": "OK", "message": "no command_id", "detail": None}
+        blocked = {
+            "allowed": False,
+            "code": "IDEMPOTENT_BLOCK",
+            "message": "terminal state already written for this attempt",
+            "detail": {"command_id": command_id, "attempt": attempt},
+        }
+        if recent_terminals.contains(command_id, attempt):
+            return blocked
+        if "terminal_written" in command_dict:
+            if command_dict.get("terminal_written"):
+                return blocked
+            return {"allowed": True, "code": "OK", "message": "ok", "detail": None}
         try:
             async with engine.begin() as conn:
                 r = await conn.execute(
-                    text(
-                        """
-                        SELECT 1 FROM domain_events
-                        WHERE command_id = :command_id AND attempt = :attempt
-                          AND event_type IN ('MARK_DONE', 'MARK_FAILED')
-                        LIMIT 1
-                        """
-                    ),
+                    stmt("terminal_exists"),
                     {"command_id": command_id, "attempt": attempt},
                 )
                 row = r.first()
             if row:
-                return {
-                    "allowed": False,
-                    "code": "IDEMPOTENT_BLOCK",
-                    "message": "terminal state already written for this attempt",
-                    "detail": {"command_id": command_id, "attempt": attempt},
-                }
+                recent_terminals.add(command_id, attempt)
+                return blocked
             return {"allowed": True, "code": "OK", "message": "ok", "detail": None}
         except Exception as e:
             return {"allowed": True, "code": "OK", "message": f"check error (allow): {e}", "detail": None}
@@ -60,7 +65,8 @@ def _rate_limit_key(cmd_type: str) -> str:
 
 class RateLimitPolicy(Policy):
     """
-    Per-type rate limit: max N PICKED per minute (from domain_events).
+    Per-type rate limit: max N picks per minute, sliding-window counter (app.policies.rate_limiter).
+    Every check counts as one pick; state lives in Redis (shared across workers) or in memory.
     Default 100000 so e2e does not trigger.
     """
 
@@ -79,27 +85,14 @@ class RateLimitPolicy(Policy):
         if limit <= 0:
             return {"allowed": True, "code": "OK", "message": "ok", "detail": None}
         try:
-            async with engine.begin() as conn:
-                r = await conn.execute(
-                    text(
-                        """
-                        SELECT COUNT(*) AS cnt FROM domain_events
-                        WHERE event_type = 'PICKED'
-                          AND (payload->>'type') IS NOT NULL
-                          AND (payload->>'type') = :cmd_type
-                          AND created_at > NOW() - INTERVAL '60 seconds'
-                        """
-                    ),
-                    {"cmd_type": cmd_type},
-                )
-                row = r.mappings().first()
-            cnt = int(row["cnt"]) if row else 0
-            if cnt >= limit:
+            estimate, backend = await rate_limiter.hit(cmd_type)
+            cnt = int(estimate)
+            if estimate > limit:
                 return {
                     "allowed": False,
                     "code": "RATE_LIMIT",
-                    "message": f"type {cmd_type} over limit ({cnt} >= {limit}/min)",
-                    "detail": {"type": cmd_type, "count": cnt, "limit": limit},
+                    "message": f"type {cmd_type} over limit ({cnt} > {limit}/min)",
+                    "detail": {"type": cmd_type, "count": cnt, "limit": limit, "backend": backend},
                 }
             return {"allowed": True, "code": "OK", "message": "ok", "detail": None}
         except Exception as e:
@@ -109,11 +102,24 @@ class RateLimitPolicy(Policy):
 class CooldownAfterFailPolicy(Policy):
     """
     After a fail for this type, do not pick same type for X seconds.
+    Reads the cached last-failure timestamp (app.policies.cooldown_cache, written by the runner on
+    MARK_FAILED); only queries domain_events when neither Redis nor this process has a value.
     Default POLICY_FAIL_COOLDOWN_SECONDS=0 so e2e does not trigger.
     """
 
     name = "cooldown_after_fail"
 
+    async def _last_fail_from_events(self, cmd_type: str, engine: Any) -> Optional[float]:
+        async with engine.begin() as conn:
+            r = await conn.execute(
+                stmt("last_fail_for_type"),
+                {"cmd_type": cmd_type},
+            )
+            row = r.mappings().first()
+        if not row or row["last_fail"] is None:
+            return None
+        return row["last_fail"].timestamp()
+
     async def check(
         self,
         ctx: Any,
@@ -127,28 +133,12 @@ class CooldownAfterFailPolicy(Policy):
         if not cmd_type:
             return {"allowed": True, "code": "OK", "message": "ok", "detail": None}
         try:
-            async with engine.begin() as conn:
-                r = await conn.execute(
-                    text(
-                        """
-                        SELECT MAX(created_at) AS last_fail FROM domain_events
-                        WHERE event_type IN ('ACTION_FAIL', 'MARK_FAILED')
-                          AND (payload->>'type') = :cmd_type
-                          AND created_at > NOW() - INTERVAL '1 hour'
-                        """
-                    ),
-                    {"cmd_type": cmd_type},
-                )
-                row = r.mappings().first()
-            if not row or row["last_fail"] is None:
-                return {"allowed": True, "code": "OK", "message": "ok", "detail": None}
-            last_fail = row["last_fail"]
-            now_ts = time.time()
-            try:
-                last_ts = last_fail.timestamp()
-            except Exception:
+            last_ts, source = await last_failures.get(cmd_type)
+            if source == "miss":
+                last_ts = await self._last_fail_from_events(cmd_type, engine)
+            if last_ts is None:
                 return {"allowed": True, "code": "OK", "message": "ok", "detail": None}
-            if (now_ts - last_ts) < cooldown_sec:
+            if (time.time() - last_ts) < cooldown_sec:
                 return {
                     "allowed": False,
                     "code": "COOLDOWN_AFTER_FAIL",
@@ -0,0 +1,70 @@
+"""
+Per-command-type "last failure" timestamps for CooldownAfterFailPolicy.
+Written by the runner when it writes MARK_FAILED (every ACTION_FAIL is followed by one); read by
+the policy as a single value instead of MAX(created_at) over domain_events.
+Backend: Redis key per type (shared across workers, expires after COOLDOWN_CACHE_TTL_SEC) plus an
+in-process copy used while Redis is unavailable. POLICY_COOLDOWN_BACKEND=memory skips Redis.
+"""
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from app.ops.redis_async import get_async_redis, mark_redis_down
+
+REDIS_COOLDOWN_KEY_PREFIX = "anchor:cooldown:last_fail"
+# Same horizon as the event-log query it replaces (failures older than 1 hour are ignored).
+COOLDOWN_CACHE_TTL_SEC = 3600
+
+
+class LastFailureCache:
+    """Never raises. get() returns (timestamp or None, source: 'redis' | 'memory' | 'miss')."""
+
+    def __init__(self, ttl_sec: int = COOLDOWN_CACHE_TTL_SEC):
+        self._ttl_sec = int(ttl_sec)
+        self._local: Dict[str, float] = {}
+
+    def _use_redis(self) -> bool:
+        return (os.getenv("POLICY_COOLDOWN_BACKEND") or "redis").strip().lower() == "redis"
+
+    def _key(self, cmd_type: str) -> str:
+        return f"{REDIS_COOLDOWN_KEY_PREFIX}:{cmd_type}"
+
+    async def record(self, cmd_type: str, ts: Optional[float] = None) -> None:
+        cmd_type = (cmd_type or "").strip().upper()
+        if not cmd_type:
+            return
+        ts = time.time() if ts is None else float(ts)
+        if ts > self._local.get(cmd_type, 0.0):
+            self._local[cmd_type] = ts
+        if not self._use_redis():
+            return
+        client = get_async_redis()
+        if client is None:
+            return
+        try:
+            await client.set(self._key(cmd_type), repr(ts), ex=self._ttl_sec)
+        except Exception as e:
+            print(f"[cooldown_cache] redis set failed: {e}", flush=True)
+            mark_redis_down()
+
+    async def get(self, cmd_type: str) -> Tuple[Optional[float], str]:
+        cmd_type = (cmd_type or "").strip().upper()
+        local = self._local.get(cmd_type)
+        if local is not None and time.time() - local > self._ttl_sec:
+            self._local.pop(cmd_type, None)
+            local = None
+        if self._use_redis():
+            client = get_async_redis()
+            if client is not None:
+                try:
+                    raw = await client.get(self._key(cmd_type))
+                    return (float(raw) if raw else None), "redis"
+                except Exception as e:
+                    print(f"[cooldown_cache] redis get failed: {e}", flush=True)
+                    mark_redis_down()
+        if local is not None:
+            return local, "memory"
+        return None, "miss"
+
+
+last_failures = LastFailureCache()
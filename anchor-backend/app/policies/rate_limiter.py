@@ -0,0 +1,83 @@
+"""
+Sliding-window rate counters for RateLimitPolicy. O(1) per check, independent of domain_events size.
+Estimate = previous window count * (1 - elapsed fraction) + current window count.
+Backend: Redis (shared by every worker process, window clock = Redis TIME) with an in-memory
+fallback per process while Redis is unavailable. POLICY_RATE_LIMIT_BACKEND=memory skips Redis.
+"""
+import os
+import time
+from typing import Callable, Dict, List, Tuple
+
+from app.ops.redis_async import get_async_redis, mark_redis_down
+
+RATE_LIMIT_WINDOW_SEC = 60
+REDIS_RATE_KEY_PREFIX = "anchor:rate_limit"
+
+# KEYS[1] = key prefix, ARGV[1] = window ms. Returns {current, previous, elapsed_ms}.
+_SLIDING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now_ms = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local w = tonumber(ARGV[1])
+local idx = math.floor(now_ms / w)
+local ck = KEYS[1] .. ':' .. idx
+local curr = redis.call('INCR', ck)
+if curr == 1 then redis.call('PEXPIRE', ck, w * 2) end
+local prev = tonumber(redis.call('GET', KEYS[1] .. ':' .. (idx - 1)) or '0')
+return {curr, prev, now_ms - idx * w}
+"""
+
+
+def _estimate(current: int, previous: int, elapsed_ms: float, window_ms: float) -> float:
+    weight = max(0.0, 1.0 - (elapsed_ms / window_ms))
+    return previous * weight + current
+
+
+class MemorySlidingWindow:
+    """Per-process sliding-window counters keyed by name."""
+
+    def __init__(self, window_sec: float = RATE_LIMIT_WINDOW_SEC, clock: Callable[[], float] = time.time):
+        self._window_ms = float(window_sec) * 1000.0
+        self._clock = clock
+        # key -> [window index, current count, previous count]
+        self._windows: Dict[str, List[int]] = {}
+
+    def hit(self, key: str) -> float:
+        now_ms = self._clock() * 1000.0
+        idx = int(now_ms // self._window_ms)
+        state = self._windows.get(key)
+        if state is None or state[0] < idx - 1:
+            state = [idx, 0, 0]
+        elif state[0] == idx - 1:
+            state = [idx, 0, state[1]]
+        state[1] += 1
+        self._windows[key] = state
+        return _estimate(state[1], state[2], now_ms - idx * self._window_ms, self._window_ms)
+
+
+class SlidingWindowRateLimiter:
+    """Counts one hit per call and returns the sliding-window estimate including it. Never raises."""
+
+    def __init__(self, window_sec: float = RATE_LIMIT_WINDOW_SEC):
+        self._window_ms = int(window_sec * 1000)
+        self._memory = MemorySlidingWindow(window_sec)
+
+    def _use_redis(self) -> bool:
+        return (os.getenv("POLICY_RATE_LIMIT_BACKEND") or "redis").strip().lower() == "redis"
+
+    async def hit(self, key: str) -> Tuple[float, str]:
+        """Returns (estimated hits in the last window, backend used: 'redis' | 'memory')."""
+        if self._use_redis():
+            client = get_async_redis()
+            if client is not None:
+                try:
+                    curr, prev, elapsed = await client.eval(
+                        _SLIDING_WINDOW_LUA, 1, f"{REDIS_RATE_KEY_PREFIX}:{key}", self._window_ms
+                    )
+                    return _estimate(int(curr), int(prev), float(elapsed), float(self._window_ms)), "redis"
+                except Exception as e:
+                    print(f"[rate_limiter] redis failed, using memory: {e}", flush=True)
+                    mark_redis_down()
+        return self._memory.hit(key), "memory"
+
+
+rate_limiter = SlidingWindowRateLimiter()
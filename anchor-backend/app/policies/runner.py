@@ -1,26 +1,97 @@
 """
 Run policy pipeline; first block wins. Exceptions => allow (do not kill command).
+POLICY_EVAL_MODE=sequential (default) awaits policies one by one; concurrent runs every check at
+once and then walks the results in declared order, so the outcome is the same as sequential
+(an exception before the first block still means allow). Per-policy latency is kept in policy_latency.
 """
+import asyncio
+import os
+import time
 from typing import Any, Dict, List, Optional, Tuple
 
 from app.policies.protocol import Policy, PolicyDecision
 
+POLICY_EVAL_MODES = ("sequential", "concurrent")
+
+
+class PolicyLatency:
+    """Per-policy check latency (count / avg / max / last, ms) for this process."""
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, elapsed_ms: float) -> None:
+        s = self._stats.get(name)
+        if s is None:
+            s = self._stats[name] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+        s["count"] += 1
+        s["total_ms"] += elapsed_ms
+        s["last_ms"] = elapsed_ms
+        if elapsed_ms > s["max_ms"]:
+            s["max_ms"] = elapsed_ms
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for name, s in self._stats.items():
+            count = int(s["count"])
+            out[name] = {
+                "count": count,
+                "avg_ms": round(s["total_ms"] / count, 3) if count else 0.0,
+                "max_ms": round(s["max_ms"], 3),
+                "last_ms": round(s["last_ms"], 3),
+            }
+        return out
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+policy_latency = PolicyLatency()
+
+
+def policy_eval_mode() -> str:
+    mode = (os.getenv("POLICY_EVAL_MODE") or "sequential").strip().lower()
+    return mode if mode in POLICY_EVAL_MODES else "sequential"
+
+
+async def _timed_check(
+    policy: Policy, ctx: Any, command_dict: Dict[str, Any], engine: Any
+) -> PolicyDecision:
+    t0 = time.perf_counter()
+    try:
+        return await policy.check(ctx, command_dict, engine)
+    finally:
+        policy_latency.record(getattr(policy, "name", "") or type(policy).__name__, (time.perf_counter() - t0) * 1000.0)
+
 
 async def run_policies(
     policies: List[Policy],
     ctx: Any,
     command_dict: Dict[str, Any],
     engine: Any,
+    mode: Optional[str] = None,
 ) -> Tuple[bool, Optional[PolicyDecision]]:
     """
     Run each policy in order. First allowed=False returns (False, decision).
     Any exception in policy.check => treat as allow (True, None).
+    mode: 'sequential' | 'concurrent'; default from POLICY_EVAL_MODE.
     """
     if not policies or engine is None:
         return True, None
+    if (mode or policy_eval_mode()) == "concurrent" and len(policies) > 1:
+        results = await asyncio.gather(
+            *(_timed_check(p, ctx, command_dict, engine) for p in policies),
+            return_exceptions=True,
+        )
+        for decision in results:
+            if isinstance(decision, BaseException):
+                return True, None
+            if not decision.get("allowed", True):
+                return False, decision
+        return True, None
     for policy in policies:
         try:
-            decision = await policy.check(ctx, command_dict, engine)
+            decision = await _timed_check(policy, ctx, command_dict, engine)
         except Exception:
             return True, None
         if not decision.get("allowed", True):
@@ -0,0 +1,40 @@
+"""
+In-worker LRU of recently finalized (command_id, attempt) pairs.
+Filled by the worker's finalize write; read by IdempotencyPolicy before it touches the database.
+POLICY_IDEMPOTENCY_LRU_SIZE=0 disables the cache.
+"""
+import os
+from collections import OrderedDict
+from typing import Tuple
+
+TERMINAL_LRU_SIZE = int(os.getenv("POLICY_IDEMPOTENCY_LRU_SIZE", "10000"))
+
+
+class TerminalLRU:
+    """Bounded set of (command_id, attempt); oldest entries are evicted first."""
+
+    def __init__(self, max_size: int = TERMINAL_LRU_SIZE):
+        self._max_size = max(0, int(max_size))
+        self._items: "OrderedDict[Tuple[str, int], None]" = OrderedDict()
+
+    def add(self, command_id: str, attempt: int) -> None:
+        if self._max_size <= 0 or not command_id:
+            return
+        key = (command_id, int(attempt))
+        self._items[key] = None
+        self._items.move_to_end(key)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def contains(self, command_id: str, attempt: int) -> bool:
+        key = (command_id, int(attempt))
+        if key not in self._items:
+            return False
+        self._items.move_to_end(key)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+recent_terminals = TerminalLRU()
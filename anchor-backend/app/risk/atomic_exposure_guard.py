@@ -1,27 +1,34 @@
 """
-Atomic exposure guard: lock risk_state row, check limit, increment in one transaction.
-Uses risk_state table (single-row ledger). On allow: reserves exposure. Never raises except RiskError.
+Atomic exposure guard: check limit and reserve exposure in one transaction. Never raises except RiskError.
+Sharded (default, migration 0009): reservations live in risk_exposure_shards, one row per symbol.
+A reservation that fits its shard's allotment only locks that row, so orders on different symbols
+do not contend. When a shard runs short it takes the risk_state row lock, locks every shard, checks
+the global limit exactly (SUM(reserved) + notional <= max) and grants itself more allotment,
+reclaiming unused allotment from other shards if needed. SUM(allotted) <= max always holds, so the
+global limit is never exceeded. Each shard records the max its allotment was granted under (max_usd);
+the fast path only matches while that equals the current max, so after the limit changes the first
+reservation takes the locked path, which reclaims every unused allotment and re-stamps the max.
+RISK_EXPOSURE_SHARDED=0 uses the single risk_state row.
 """
+import os
 from decimal import Decimal
 
 from sqlalchemy import text
 
+# Extra allotment granted on refill, as % of max exposure (fewer refills vs. more stranded budget).
+RISK_EXPOSURE_SHARD_CHUNK_PCT = float(os.getenv("RISK_EXPOSURE_SHARD_CHUNK_PCT", "10"))
+
 
 class RiskError(Exception):
     """Raised when exposure limit exceeded."""
     pass
 
 
-async def atomic_exposure_guard(conn, notional: float, max_exposure_usd: float) -> float:
-    """
-    Atomically: lock risk_state, check current+notional <= max, then increment.
-    If over limit, raises RiskError. Caller must NOT commit on error.
-    Returns new exposure (current + notional) on success, for leverage/drawdown checks.
-    conn: async SQLAlchemy connection (from engine.begin() or similar).
-    """
-    notional_dec = Decimal(str(notional))
-    max_dec = Decimal(str(max_exposure_usd))
+def _sharded_enabled() -> bool:
+    return (os.getenv("RISK_EXPOSURE_SHARDED") or "1").strip() == "1"
+
 
+async def _single_row_guard(conn, notional_dec: Decimal, max_dec: Decimal) -> Decimal:
     r = await conn.execute(
         text("SELECT current_exposure_usd FROM risk_state WHERE id=1 FOR UPDATE")
     )
@@ -41,6 +48,118 @@ async def atomic_exposure_guard(conn, notional: float, max_exposure_usd: float)
                 updated_at = NOW()
             WHERE id = 1
         """),
-        {"notional": float(notional)},
+        {"notional": notional_dec},
+    )
+    return total
+
+
+async def _sharded_guard(conn, symbol: str, notional_dec: Decimal, max_dec: Decimal) -> Decimal:
+    # Fast path: reserve within this shard's allotment. A non-matching UPDATE takes no row lock.
+    r = await conn.execute(
+        text("""
+            UPDATE risk_exposure_shards
+            SET reserved_usd = reserved_usd + :notional,
+                updated_at = NOW()
+            WHERE symbol = :symbol AND reserved_usd + :notional <= allotted_usd AND max_usd = :max
+            RETURNING reserved_usd
+        """),
+        {"symbol": symbol, "notional": notional_dec, "max": max_dec},
+    )
+    if r.first() is not None:
+        r = await conn.execute(
+            text("SELECT COALESCE(SUM(reserved_usd), 0) AS total FROM risk_exposure_shards")
+        )
+        total = Decimal(str(r.mappings().first()["total"]))
+        if total > max_dec:
+            raise RiskError("NET_EXPOSURE_EXCEEDED")
+        return total
+
+    # Slow path: global lock first, then every shard in symbol order (fast paths never wait).
+    r = await conn.execute(
+        text("SELECT current_exposure_usd FROM risk_state WHERE id=1 FOR UPDATE")
     )
-    return float(current + notional_dec)
+    if not r.mappings().first():
+        raise RiskError("risk_state row missing")
+    await conn.execute(
+        text("""
+            INSERT INTO risk_exposure_shards (symbol, max_usd) VALUES (:symbol, :max)
+            ON CONFLICT (symbol) DO NOTHING
+        """),
+        {"symbol": symbol, "max": max_dec},
+    )
+    r = await conn.execute(
+        text("""
+            SELECT symbol, reserved_usd, allotted_usd, max_usd FROM risk_exposure_shards
+            ORDER BY symbol
+            FOR UPDATE
+        """)
+    )
+    rows = r.mappings().all()
+    shards = {
+        row["symbol"]: (Decimal(str(row["reserved_usd"])), Decimal(str(row["allotted_usd"])))
+        for row in rows
+    }
+    if any(row["max_usd"] is None or Decimal(str(row["max_usd"])) != max_dec for row in rows):
+        # Limit changed since the allotments were granted: take back every unused allotment.
+        await conn.execute(
+            text("""
+                UPDATE risk_exposure_shards
+                SET allotted_usd = LEAST(allotted_usd, reserved_usd), max_usd = :max, updated_at = NOW()
+            """),
+            {"max": max_dec},
+        )
+        shards = {sym: (res, min(al, res)) for sym, (res, al) in shards.items()}
+    total_reserved = sum((res for res, _ in shards.values()), Decimal(0))
+    total = total_reserved + notional_dec
+    if total > max_dec:
+        raise RiskError("NET_EXPOSURE_EXCEEDED")
+
+    reserved, allotted = shards[symbol]
+    need = reserved + notional_dec
+    if need > allotted:
+        unallotted = max_dec - sum((al for _, al in shards.values()), Decimal(0))
+        if need - allotted > unallotted:
+            await conn.execute(
+                text("""
+                    UPDATE risk_exposure_shards
+                    SET allotted_usd = reserved_usd, updated_at = NOW()
+                    WHERE allotted_usd > reserved_usd
+                """)
+            )
+            allotted = reserved
+            unallotted = max_dec - total_reserved
+        chunk = max(Decimal(0), max_dec * Decimal(str(RISK_EXPOSURE_SHARD_CHUNK_PCT)) / Decimal(100))
+        allotted = need + max(Decimal(0), min(chunk, unallotted - (need - allotted)))
+
+    await conn.execute(
+        text("""
+            UPDATE risk_exposure_shards
+            SET reserved_usd = :reserved, allotted_usd = :allotted, updated_at = NOW()
+            WHERE symbol = :symbol
+        """),
+        {"symbol": symbol, "reserved": need, "allotted": allotted},
+    )
+    # Snapshot of the total for /risk/state readers on older code; fast paths do not refresh it.
+    await conn.execute(
+        text("UPDATE risk_state SET current_exposure_usd = :total, updated_at = NOW() WHERE id = 1"),
+        {"total": total},
+    )
+    return total
+
+
+async def atomic_exposure_guard(
+    conn, notional: float, max_exposure_usd: float, symbol: str = "UNKNOWN"
+) -> float:
+    """
+    Atomically: check total reserved + notional <= max, then reserve notional (on symbol's shard).
+    If over limit, raises RiskError. Caller must NOT commit on error.
+    Returns new exposure (current + notional) on success, for leverage/drawdown checks.
+    conn: async SQLAlchemy connection (from engine.begin() or similar).
+    """
+    notional_dec = Decimal(str(notional))
+    max_dec = Decimal(str(max_exposure_usd))
+    if _sharded_enabled():
+        total = await _sharded_guard(conn, symbol, notional_dec, max_dec)
+    else:
+        total = await _single_row_guard(conn, notional_dec, max_dec)
+    return float(total)
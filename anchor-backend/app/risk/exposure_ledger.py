@@ -0,0 +1,112 @@
+"""
+Exposure ledger (migration 0008): risk_exposure holds DONE/PENDING QUOTE notional per symbol, kept
+current by statement triggers on commands_domain. risk_guard reads SUM over the ledger rows (one per
+symbol); there is no total row, since every writer would lock it until commit.
+Reconciliation recomputes the ledger from commands_domain and reports (optionally fixes) drift:
+    python -m app.risk.exposure_ledger [--fix]
+"""
+import asyncio
+import json
+import sys
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from app.db.statements import stmt
+
+LEDGER_TOTAL_SYMBOL = "*"
+# Drift below this (USD) is float noise, not a ledger bug.
+DRIFT_TOLERANCE_USD = 1e-6
+
+_RECOMPUTE_SQL = """
+    SELECT risk_exposure_symbol(payload) AS symbol, SUM(risk_exposure_notional(payload)) AS exposure
+    FROM commands_domain
+    WHERE type = 'QUOTE' AND status IN ('DONE', 'PENDING')
+    GROUP BY 1
+"""
+
+
+def ledger_symbol(payload: Any) -> str:
+    """Python twin of SQL risk_exposure_symbol(): upper-cased symbol, 'UNKNOWN' when missing."""
+    raw = payload.get("symbol") if isinstance(payload, dict) else None
+    symbol = str(raw).strip().upper() if raw is not None else ""
+    if symbol in ("", LEDGER_TOTAL_SYMBOL):
+        return "UNKNOWN"
+    return symbol
+
+
+async def read_ledger_exposure(conn: Any, symbol: str = LEDGER_TOTAL_SYMBOL) -> Optional[float]:
+    """Ledger exposure for symbol ('*' = total over all symbols); None when the row is missing. Raises on SQL error."""
+    if symbol == LEDGER_TOTAL_SYMBOL:
+        r = await conn.execute(stmt("ledger_exposure_total"))
+    else:
+        r = await conn.execute(
+            stmt("ledger_exposure"),
+            {"symbol": symbol},
+        )
+    row = r.mappings().first()
+    if not row or row["exposure_usd"] is None:
+        return None
+    return float(row["exposure_usd"])
+
+
+def compute_drift(ledger: Dict[str, float], recomputed: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    """Per-symbol {ledger, recomputed, drift} for every symbol whose values differ (derived '*' total included)."""
+    ledger = dict(ledger)
+    ledger[LEDGER_TOTAL_SYMBOL] = sum(v for k, v in ledger.items() if k != LEDGER_TOTAL_SYMBOL)
+    recomputed = dict(recomputed)
+    recomputed[LEDGER_TOTAL_SYMBOL] = sum(v for k, v in recomputed.items() if k != LEDGER_TOTAL_SYMBOL)
+    out: Dict[str, Dict[str, float]] = {}
+    for symbol in sorted(set(ledger) | set(recomputed)):
+        have = float(ledger.get(symbol, 0.0))
+        want = float(recomputed.get(symbol, 0.0))
+        if abs(have - want) > DRIFT_TOLERANCE_USD:
+            out[symbol] = {"ledger": have, "recomputed": want, "drift": have - want}
+    return out
+
+
+async def reconcile_exposure_ledger(engine: Any, fix: bool = False) -> Dict[str, Any]:
+    """
+    Recompute exposure from commands_domain and compare with risk_exposure.
+    Holds an EXCLUSIVE lock on risk_exposure while reading, so trigger updates from concurrent
+    commands wait and the comparison is consistent. fix=True rewrites the drifted rows.
+    Returns {"ok", "drift", "fixed"}; never raises ("error" set on failure).
+    """
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("LOCK TABLE risk_exposure IN EXCLUSIVE MODE"))
+            r = await conn.execute(text("SELECT symbol, exposure_usd FROM risk_exposure"))
+            ledger = {row["symbol"]: float(row["exposure_usd"] or 0) for row in r.mappings().all()}
+            r = await conn.execute(text(_RECOMPUTE_SQL))
+            recomputed = {row["symbol"]: float(row["exposure"] or 0) for row in r.mappings().all()}
+            drift = compute_drift(ledger, recomputed)
+            if fix and drift:
+                for symbol, d in drift.items():
+                    if symbol == LEDGER_TOTAL_SYMBOL:
+                        continue
+                    await conn.execute(
+                        text(
+                            """
+                            INSERT INTO risk_exposure (symbol, exposure_usd, updated_at)
+                            VALUES (:symbol, :exposure, NOW())
+                            ON CONFLICT (symbol) DO UPDATE
+                              SET exposure_usd = EXCLUDED.exposure_usd, updated_at = NOW()
+                            """
+                        ),
+                        {"symbol": symbol, "exposure": d["recomputed"]},
+                    )
+        return {"ok": not drift, "drift": drift, "fixed": bool(fix and drift)}
+    except Exception as e:
+        return {"ok": False, "drift": {}, "fixed": False, "error": str(e)}
+
+
+async def _main(argv: list) -> int:
+    from app.workers.command_worker import engine
+
+    result = await reconcile_exposure_ledger(engine, fix="--fix" in argv)
+    print(json.dumps(result, ensure_ascii=False, indent=2), flush=True)
+    return 0 if result["ok"] or result["fixed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
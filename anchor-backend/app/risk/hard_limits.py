@@ -6,7 +6,8 @@ Used by worker to reject risk commands that exceed limits.
 import os
 from typing import Any, Optional, Tuple
 
-from sqlalchemy import text
+from app.db.statements import stmt
+from app.risk.exposure_ledger import ledger_symbol, read_ledger_exposure
 
 RISK_HARD_LIMITS_BLOCK_REASON_PREFIX = "RISK_HARD_LIMITS_"
 TRADE_CMD_TYPES = frozenset({"QUOTE"})
@@ -124,28 +125,23 @@ def validate_stop_required(cmd_type: str, payload: dict) -> Tuple[bool, Optional
 async def _fetch_risk_context(engine: Any) -> Tuple[float, float]:
     """
     Returns (current_exposure_usd, today_loss_pct). Never raises.
-    current_exposure = sum(notional) from QUOTE where status IN ('DONE','PENDING').
+    current_exposure = sum(notional) from QUOTE where status IN ('DONE','PENDING'),
+    read as the sum of the risk_exposure ledger rows; recomputed from commands_domain only when the
+    ledger (migration 0008) is missing.
     RUNNING is excluded (the command being validated is RUNNING).
     """
     exposure = 0.0
     today_loss_pct = 0.0
     try:
         async with engine.begin() as conn:
-            r = await conn.execute(
-                text(
-                    """
-                    SELECT COALESCE(SUM(
-                        COALESCE(
-                            (payload->>'notional')::float,
-                            (payload->>'notional_usd')::float,
-                            0
-                        )
-                    ), 0) AS exposure
-                    FROM commands_domain
-                    WHERE type = 'QUOTE' AND status IN ('DONE', 'PENDING')
-                    """
-                )
-            )
+            ledger = await read_ledger_exposure(conn)
+        if ledger is not None:
+            return (ledger, today_loss_pct)
+    except Exception:
+        pass
+    try:
+        async with engine.begin() as conn:
+            r = await conn.execute(stmt("quote_exposure_sum"))
             row = r.mappings().first()
             if row and row.get("exposure") is not None:
                 exposure = float(row["exposure"])
@@ -199,7 +195,7 @@ async def risk_guard(
     if not ok:
         return (False, f"{RISK_HARD_LIMITS_BLOCK_REASON_PREFIX}{reason}")
 
-    # 3) net exposure (atomic risk_state or computed)
+    # 3) net exposure (atomic reservation, sharded per symbol, or computed)
     notional = _get_notional(payload)
     max_exposure_usd_val = capital * (max_exposure / 100.0)
     exposure_for_leverage = current_exposure_usd
@@ -208,7 +204,7 @@ async def risk_guard(
             async with engine.begin() as conn:
                 from app.risk.atomic_exposure_guard import atomic_exposure_guard, RiskError
                 exposure_for_leverage = await atomic_exposure_guard(
-                    conn, notional, max_exposure_usd_val
+                    conn, notional, max_exposure_usd_val, symbol=ledger_symbol(payload)
                 )
         except RiskError as e:
             return (False, f"{RISK_HARD_LIMITS_BLOCK_REASON_PREFIX}{str(e)}")
@@ -100,8 +100,9 @@ async def is_lockout_active(engine: Any) -> Tuple[bool, str, str]:
                 text(
                     """
                     SELECT COUNT(*) AS cnt FROM domain_events
-                    WHERE created_at::date = CURRENT_DATE
-                      AND event_type = 'MARK_FAILED'
+                    WHERE event_type = 'MARK_FAILED'
+                      AND created_at >= date_trunc('day', NOW())
+                      AND created_at < date_trunc('day', NOW()) + interval '1 day'
                     """
                 )
             )
@@ -0,0 +1,130 @@
+"""
+Cached /risk/state snapshot. The snapshot is recomputed at most once per RISK_STATE_CACHE_TTL_SEC
+(concurrent callers share one computation) and dropped as soon as Postgres reports a change that
+moves it: migration 0012 emits pg_notify(RISK_STATE_CHANNEL, ...) on MARK_FAILED inserts and on
+exposure writes (risk_state / risk_exposure_shards). Without a listener the TTL alone bounds
+staleness. RISK_STATE_CACHE_TTL_SEC=0 disables caching. Never raises.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+RISK_STATE_CHANNEL = "anchor_risk_state"
+LISTEN_RECONNECT_SEC = 10.0
+
+
+def risk_state_cache_ttl() -> float:
+    try:
+        return max(0.0, float((os.getenv("RISK_STATE_CACHE_TTL_SEC") or "5").strip()))
+    except ValueError:
+        return 5.0
+
+
+class RiskStateCache:
+    """One snapshot plus a generation counter; invalidate() bumps the generation."""
+
+    def __init__(self, ttl_sec: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self._ttl = ttl_sec
+        self._clock = clock
+        self._lock = asyncio.Lock()
+        self._value: Optional[Dict[str, Any]] = None
+        self._stored_at = 0.0
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl(self) -> float:
+        return risk_state_cache_ttl() if self._ttl is None else self._ttl
+
+    def _fresh(self) -> Optional[Dict[str, Any]]:
+        if self._value is None or self._clock() - self._stored_at >= self.ttl:
+            return None
+        return self._value
+
+    def invalidate(self, *_args: Any) -> None:
+        """Drop the snapshot. Signature accepts asyncpg notify callback args."""
+        self._generation += 1
+        self._value = None
+
+    async def get(
+        self,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda v: v.get("status") == "OK",
+    ) -> Dict[str, Any]:
+        """Return the cached snapshot or compute a new one. Only cacheable() results are stored."""
+        if self.ttl <= 0:
+            return await compute()
+        value = self._fresh()
+        if value is not None:
+            self.hits += 1
+            return value
+        async with self._lock:
+            value = self._fresh()
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            generation = self._generation
+            value = await compute()
+            # An invalidation that lands mid-compute may postdate what we read: do not store.
+            if generation == self._generation and cacheable(value):
+                self._value = value
+                self._stored_at = self._clock()
+            return value
+
+
+class RiskStateListener:
+    """LISTEN on RISK_STATE_CHANNEL (dedicated asyncpg connection); every notify invalidates the cache."""
+
+    def __init__(self, dsn: str, cache: RiskStateCache, channel: str = RISK_STATE_CHANNEL):
+        self._dsn = dsn
+        self._cache = cache
+        self._channel = channel
+        self._conn: Optional[Any] = None
+
+    @property
+    def listening(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    def _on_terminate(self, *_args: Any) -> None:
+        self._conn = None
+
+    async def start(self) -> bool:
+        """Open the listener if not already open. Returns True when listening."""
+        if self.listening:
+            return True
+        if not self._dsn:
+            return False
+        try:
+            import asyncpg
+            conn = await asyncpg.connect(dsn=self._dsn)
+            await conn.add_listener(self._channel, self._cache.invalidate)
+            conn.add_termination_listener(self._on_terminate)
+            self._conn = conn
+            # Changes made while we were not listening were never delivered.
+            self._cache.invalidate()
+            return True
+        except Exception as e:
+            print(f"[risk/state] LISTEN {self._channel} failed: {e}", flush=True)
+            self._conn = None
+            return False
+
+    async def run(self) -> None:
+        """Keep the listener up; reconnects every LISTEN_RECONNECT_SEC after a drop."""
+        while True:
+            await self.start()
+            await asyncio.sleep(LISTEN_RECONNECT_SEC)
+
+    async def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+
+risk_state_cache = RiskStateCache()
@@ -0,0 +1,81 @@
+"""
+Worker wakeup on new commands_domain work: Postgres LISTEN on a dedicated asyncpg connection.
+API emits pg_notify(COMMANDS_DOMAIN_CHANNEL, id) when a command becomes PENDING (create / retry).
+The worker waits on the notification instead of sleeping a fixed interval; a timeout keeps polling
+as a safety net (missed notify, dropped listener). Never raises; without a listener wait() is a sleep.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Optional
+
+COMMANDS_DOMAIN_CHANNEL = "anchor_commands_domain"
+LISTEN_RECONNECT_SEC = 10.0
+
+
+class PendingWakeup:
+    """Holds the LISTEN connection and an event that is set on every notify."""
+
+    def __init__(self, dsn: str, channel: str = COMMANDS_DOMAIN_CHANNEL):
+        self._dsn = dsn
+        self._channel = channel
+        self._event = asyncio.Event()
+        self._conn: Optional[Any] = None
+        self._last_connect_attempt = 0.0
+
+    @property
+    def listening(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    def _on_notify(self, *_args: Any) -> None:
+        self._event.set()
+
+    def _on_terminate(self, *_args: Any) -> None:
+        self._conn = None
+
+    async def start(self) -> bool:
+        """Open the listener connection if not already open. Returns True when listening."""
+        if self.listening:
+            return True
+        if not self._dsn:
+            return False
+        now = time.monotonic()
+        if self._last_connect_attempt and now - self._last_connect_attempt < LISTEN_RECONNECT_SEC:
+            return False
+        self._last_connect_attempt = now
+        try:
+            import asyncpg
+            conn = await asyncpg.connect(dsn=self._dsn)
+            await conn.add_listener(self._channel, self._on_notify)
+            conn.add_termination_listener(self._on_terminate)
+            self._conn = conn
+            return True
+        except Exception as e:
+            print(f"[domain] LISTEN {self._channel} failed: {e}", flush=True)
+            self._conn = None
+            return False
+
+    def clear(self) -> None:
+        """Call before picking so a notify that arrives during the pick is not lost."""
+        self._event.clear()
+
+    async def wait(self, timeout: float) -> bool:
+        """Block until a notify arrives or timeout elapses. Returns True when woken by a notify."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=max(0.0, timeout))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+
+def listen_enabled() -> bool:
+    return (os.getenv("DOMAIN_WORKER_LISTEN") or "1").strip() == "1"
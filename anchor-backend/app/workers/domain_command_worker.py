@@ -1,17 +1,27 @@
 import asyncio
 import os
+import signal
 import time
 from collections import deque
-from typing import Any, Dict, Optional
-
-from sqlalchemy import text
+from typing import Any, Dict, List, Optional
 
 from app.workers import command_worker as cw
 from app.actions.protocol import Action, ActionOutput
 from app.actions.registry import get_action, init_actions, register
+from app.actions.execution import get_action_executor
+from app.executors.http_transport import get_exchange_transport
+from app.executors.server_time import get_server_time_tracker
+from app.ops.kill_switch import get_kill_switch_cache
+from app.ops.notify import close_telegram_dispatcher, get_telegram_dispatcher
 from app.actions.runner import DomainCommandRunner
-from app.domain_events import append_domain_event
+from app.workers.domain_command_wakeup import PendingWakeup, listen_enabled
+from app.domain_events import _event_row, append_domain_event, get_engine_event_sink
 from app.policies.registry import get_policies, init_policies
+from app.db.pool import pool_metrics_snapshot, warm_pools
+from app.db.statements import stmt
+from app.ops.event_retention import retention_config, run_event_maintenance
+from app.policies.runner import policy_eval_mode, policy_latency
+from app.policies.terminal_ledger import recent_terminals
 from app.risk.lockout import is_lockout_active, is_command_allowed
 from app.risk.hard_limits import risk_guard
 from app.risk.policy_engine import RiskPolicyEngine
@@ -613,6 +623,15 @@ POLL_INTERVAL_SEC = float(
     os.getenv("DOMAIN_WORKER_POLL_INTERVAL_SEC", os.getenv("WORKER_POLL_INTERVAL_SEC", "1.0"))
 )
 DOMAIN_WORKER_ID = os.getenv("DOMAIN_WORKER_ID", "domain-worker")
+# With LISTEN active the idle worker blocks on NOTIFY; this is only the safety-net re-poll.
+LISTEN_FALLBACK_POLL_SEC = float(os.getenv("DOMAIN_WORKER_LISTEN_FALLBACK_SEC", "30"))
+
+# Batch claiming: >1 claims up to N PENDING rows per pick and runs them concurrently.
+# Default 1 keeps the one-command-per-pick behaviour.
+DOMAIN_WORKER_BATCH_SIZE = max(1, int(os.getenv("DOMAIN_WORKER_BATCH_SIZE", "1")))
+DOMAIN_WORKER_MAX_IN_FLIGHT = max(
+    1, int(os.getenv("DOMAIN_WORKER_MAX_IN_FLIGHT") or str(DOMAIN_WORKER_BATCH_SIZE))
+)
 
 # Kill switch: env (priority) or Redis. Event throttle + DB throttle.
 def _kill_switch_state() -> tuple:
@@ -629,6 +648,21 @@ HEARTBEAT_INTERVAL_SEC = float(os.getenv("WORKER_HEARTBEAT_SECONDS", "30"))
 _last_heartbeat_ts: list = [0.0]
 WORKER_HEARTBEAT_COMMAND_ID = "anchor:worker_heartbeat"
 
+# domain_events partition maintenance (app/ops/event_retention.py); first pass right after start.
+# Runs as a background task so DDL lock waits never stall picking; one pass in flight.
+EVENT_MAINTENANCE_INTERVAL_SEC = retention_config()["interval_sec"]
+_last_event_maintenance_ts: list = [0.0]
+_event_maintenance_task: list = [None]
+
+
+async def _run_event_maintenance_logged() -> None:
+    maint = await run_event_maintenance(engine)
+    if maint.get("created") or maint.get("retired") or not maint.get("ok"):
+        print(f"[domain] event maintenance {maint}", flush=True)
+
+# Exchange clock-offset samples (app/executors/server_time.py) refreshed off the loop; one refresh in flight
+_server_time_refresh: list = [None]
+
 # Panic guard: sliding window of unhandled exception timestamps
 WORKER_PANIC_THRESHOLD = int(os.getenv("WORKER_PANIC_THRESHOLD", "999999"))
 WORKER_PANIC_WINDOW_SECONDS = float(os.getenv("WORKER_PANIC_WINDOW_SECONDS", "60"))
@@ -644,16 +678,7 @@ async def _domain_mark_done(command_id: str, result: Optional[Dict[str, Any]] =
 
     async with engine.begin() as conn:
         r = await conn.execute(
-            text(
-                """
-                UPDATE commands_domain
-                SET status='DONE',
-                    result=(:result)::jsonb,
-                    error=NULL,
-                    updated_at=NOW()
-                WHERE id=:id AND status IN ('PENDING','RUNNING')
-                """
-            ),
+            stmt("mark_done"),
             {"id": command_id, "result": result_json},
         )
 
@@ -673,16 +698,7 @@ async def _domain_mark_failed(
 
     async with engine.begin() as conn:
         r = await conn.execute(
-            text(
-                """
-                UPDATE commands_domain
-                SET status='FAILED',
-                    result=(:result)::jsonb,
-                    error=:reason,
-                    updated_at=NOW()
-                WHERE id=:id AND status IN ('PENDING','RUNNING')
-                """
-            ),
+            stmt("mark_failed"),
             {"id": command_id, "result": result_json, "reason": reason},
         )
 
@@ -690,18 +706,80 @@ async def _domain_mark_failed(
     return r.rowcount
 
 
+async def _domain_finalize(
+    command_id: str,
+    status: str,
+    attempt: int,
+    event_type: str,
+    event_payload: Optional[Dict[str, Any]] = None,
+    result: Optional[Dict[str, Any]] = None,
+    reason: Optional[str] = None,
+    detail: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Terminal write in one round trip: UPDATE commands_domain to DONE/FAILED, record the
+    (command_id, attempt) in domain_command_terminals and INSERT the terminal event
+    (MARK_DONE / MARK_FAILED / *_BLOCK) through a CTE, in one transaction.
+    The event is only written when the row actually transitioned. Buffered events are flushed
+    first so the terminal event stays last in the log.
+    """
+    import json
+
+    if status == "DONE":
+        result_obj = _ensure_json_object(result)
+        error = None
+    else:
+        result_obj = _ensure_json_object({"ok": False, "reason": reason, "detail": detail or {}})
+        error = reason
+    result_json = json.dumps(result_obj, ensure_ascii=False)
+    _, _, _, payload_json, created_at = _event_row(command_id, event_type, attempt, event_payload)
+
+    await get_engine_event_sink().flush()
+    async with engine.begin() as conn:
+        r = await conn.execute(
+            stmt("finalize"),
+            {
+                "id": command_id,
+                "status": status,
+                "result": result_json,
+                "error": error,
+                "event_type": event_type,
+                "attempt": int(attempt),
+                "payload": payload_json,
+                "created_at": created_at,
+            },
+        )
+        n = len(r.all())
+    if n:
+        recent_terminals.add(command_id, int(attempt))
+
+    print(f"[domain] finalize {status} id={command_id} event={event_type} rows={n}", flush=True)
+    return n
+
+
 async def _oldest_pending_command_id() -> Optional[str]:
     """Read-only: id of oldest PENDING command (no lock). Used when kill switch ON to attach KILL_SWITCH_ON event."""
     async with engine.begin() as conn:
         r = await conn.execute(
-            text(
-                "SELECT id FROM commands_domain WHERE status = 'PENDING' ORDER BY created_at ASC LIMIT 1"
-            ),
+            stmt("oldest_pending"),
         )
         row = r.mappings().first()
     return str(row["id"]) if row else None
 
 
+def _picked_row_to_item(row: Any) -> Dict[str, Any]:
+    item = {
+        "id": str(row["id"]),
+        "type": row.get("type"),
+        "payload": row.get("payload") or {},
+        "attempt": int(row["attempt"]) if row.get("attempt") is not None else 0,
+    }
+    if "terminal_written" in row:
+        # ledger probe done inside the pick; IdempotencyPolicy reads it instead of querying
+        item["terminal_written"] = bool(row["terminal_written"])
+    return item
+
+
 async def _pick_one_domain() -> Optional[Dict[str, Any]]:
     """
     从 commands_domain 中按 created_at 升序取一条 PENDING，并加锁/打标记。
@@ -709,38 +787,28 @@ async def _pick_one_domain() -> Optional[Dict[str, Any]]:
     """
     async with engine.begin() as conn:
         r = await conn.execute(
-            text(
-                """
-                WITH cte AS (
-                    SELECT id
-                    FROM commands_domain
-                    WHERE status='PENDING'
-                    ORDER BY created_at ASC
-                    FOR UPDATE SKIP LOCKED
-                    LIMIT 1
-                )
-                UPDATE commands_domain
-                SET status='RUNNING',
-                    attempt = attempt + 1,
-                    locked_by = :locked_by,
-                    locked_at = NOW(),
-                    updated_at = NOW()
-                WHERE id IN (SELECT id FROM cte)
-                RETURNING id, type, payload, attempt
-                """
-            ),
+            stmt("pick_one"),
             {"locked_by": DOMAIN_WORKER_ID},
         )
         row = r.mappings().first()
         if not row:
             return None
 
-        return {
-            "id": str(row["id"]),
-            "type": row.get("type"),
-            "payload": row.get("payload") or {},
-            "attempt": int(row["attempt"]) if row.get("attempt") is not None else 0,
-        }
+        return _picked_row_to_item(row)
+
+
+async def _pick_domain_batch(limit: int) -> List[Dict[str, Any]]:
+    """
+    Batch variant of _pick_one_domain: claim up to `limit` PENDING rows in one statement.
+    Same SKIP LOCKED claim and attempt = attempt + 1 per row; returned oldest first.
+    """
+    async with engine.begin() as conn:
+        r = await conn.execute(
+            stmt("pick_batch"),
+            {"locked_by": DOMAIN_WORKER_ID, "limit": max(1, int(limit))},
+        )
+        rows = sorted(r.mappings().all(), key=lambda row: row["created_at"])
+    return [_picked_row_to_item(row) for row in rows]
 
 
 _STRATEGY_V1_FORBIDDEN_KEYS = frozenset(
@@ -863,13 +931,22 @@ async def domain_worker_loop() -> None:
         _domain_mark_done,
         _domain_mark_failed,
         now_ts_fn=cw._now_ts,
+        finalize_fn=_domain_finalize,
         append_event_fn=append_domain_event,
         policies=get_policies(),
         policy_engine=engine,
         is_lockout_blocked_fn=_is_lockout_blocked,
         risk_guard_fn=_risk_guard,
+        pick_batch_fn=_pick_domain_batch,
+        batch_size=DOMAIN_WORKER_BATCH_SIZE,
+        max_in_flight=DOMAIN_WORKER_MAX_IN_FLIGHT,
     )
 
+    wakeup: Optional[PendingWakeup] = None
+    if listen_enabled():
+        from app.ops.state_store import _normalize_dsn
+        wakeup = PendingWakeup(_normalize_dsn(os.getenv("DATABASE_URL", cw.DATABASE_URL)))
+
     while True:
         try:
             # Fault injection for e2e (must be inside outer try so Panic Guard catches it)
@@ -888,14 +965,39 @@ async def domain_worker_loop() -> None:
                 )
                 try:
                     from app.ops.state_store import upsert_state_engine
+                    ks_cache = get_kill_switch_cache()
                     await upsert_state_engine(
                         engine,
                         "worker_heartbeat",
-                        {"last_heartbeat_at": ts_iso, "source": "worker"},
+                        {
+                            "last_heartbeat_at": ts_iso,
+                            "source": "worker",
+                            "policy_eval_mode": policy_eval_mode(),
+                            "policy_latency": policy_latency.snapshot(),
+                            "db_pool": pool_metrics_snapshot(),
+                            "action_executor": get_action_executor().stats(),
+                            "exchange_http": get_exchange_transport().stats(),
+                            "server_time": get_server_time_tracker().stats(),
+                            "kill_switch_cache": ks_cache.stats() if ks_cache is not None else None,
+                            "telegram": get_telegram_dispatcher().stats(),
+                        },
                     )
                 except Exception as ev:
                     print(f"[domain] worker_heartbeat state_store failed: {ev}", flush=True)
                 _last_heartbeat_ts[0] = now_ts
+            maint_task = _event_maintenance_task[0]
+            if (
+                EVENT_MAINTENANCE_INTERVAL_SEC > 0
+                and (maint_task is None or maint_task.done())
+                and now_ts - _last_event_maintenance_ts[0] >= EVENT_MAINTENANCE_INTERVAL_SEC
+            ):
+                _last_event_maintenance_ts[0] = now_ts
+                _event_maintenance_task[0] = asyncio.ensure_future(_run_event_maintenance_logged())
+            refresh = _server_time_refresh[0]
+            if (refresh is None or refresh.done()) and get_server_time_tracker().due():
+                _server_time_refresh[0] = asyncio.ensure_future(
+                    get_action_executor().run_blocking("SERVER_TIME", get_server_time_tracker().refresh_due)
+                )
             kill_enabled, kill_source = _kill_switch_state()
             if kill_enabled:
                 now_ts = time.time()
@@ -917,14 +1019,25 @@ async def domain_worker_loop() -> None:
                         print(f"[domain] KILL_SWITCH_ON append failed: {e}", flush=True)
                 await asyncio.sleep(1.0)
                 continue
-            res = await runner.run_one()
-            if res is None:
-                await asyncio.sleep(POLL_INTERVAL_SEC)
+            if wakeup is not None:
+                await wakeup.start()
+                wakeup.clear()
+            if DOMAIN_WORKER_BATCH_SIZE > 1:
+                results = await runner.run_batch()
+            else:
+                res = await runner.run_one()
+                results = [res] if res is not None else []
+            if not results:
+                if wakeup is not None and wakeup.listening:
+                    await wakeup.wait(min(LISTEN_FALLBACK_POLL_SEC, HEARTBEAT_INTERVAL_SEC))
+                else:
+                    await asyncio.sleep(POLL_INTERVAL_SEC)
                 continue
-            print(
-                f"picked domain command id={res['id']} type={res['type']} final_status={res['final_status']}",
-                flush=True,
-            )
+            for res in results:
+                print(
+                    f"picked domain command id={res['id']} type={res['type']} final_status={res['final_status']}",
+                    flush=True,
+                )
         except Exception as e:
             print(f"domain worker error: {e}", flush=True)
             now = time.time()
@@ -980,12 +1093,25 @@ async def domain_worker_loop() -> None:
 
 
 async def main() -> None:
-    """Domain-only worker: run domain_worker_loop (commands_domain)."""
+    """Domain-only worker: run domain_worker_loop (commands_domain). SIGTERM cancels it and cleans up."""
     from app.system.strict_check import run_strict_check
     await run_strict_check()
+    await warm_pools(use_asyncpg=False)
 
-    await domain_worker_loop()
+    task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+    try:
+        await domain_worker_loop()
+    finally:
+        # Queued alerts (e.g. the WORKER_PANIC one) and pending digests go out before exit.
+        await asyncio.to_thread(close_telegram_dispatcher)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    except asyncio.CancelledError:
+        print("[domain] worker stopped (SIGTERM)", flush=True)
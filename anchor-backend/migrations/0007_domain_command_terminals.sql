@@ -0,0 +1,18 @@
+-- Terminal-state ledger: one row per (command_id, attempt) that reached a terminal state.
+-- Written in the same transaction as the terminal row update + MARK_* event (worker finalize).
+-- Serves the idempotency policy as a primary-key probe instead of scanning domain_events.
+CREATE TABLE IF NOT EXISTS domain_command_terminals (
+  command_id TEXT NOT NULL,
+  attempt INT NOT NULL,
+  event_type TEXT NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (command_id, attempt)
+);
+
+-- Backfill from existing MARK_* events (idempotent)
+INSERT INTO domain_command_terminals (command_id, attempt, event_type, created_at)
+SELECT DISTINCT ON (command_id, attempt) command_id, attempt, event_type, created_at
+FROM domain_events
+WHERE event_type IN ('MARK_DONE', 'MARK_FAILED')
+ORDER BY command_id, attempt, created_at ASC
+ON CONFLICT (command_id, attempt) DO NOTHING;
@@ -0,0 +1,107 @@
+-- Exposure ledger: notional of QUOTE commands in DONE/PENDING, one row per symbol.
+-- Maintained by triggers on commands_domain so every writer (API, worker, scripts) keeps it current;
+-- risk_guard reads SUM(exposure_usd) over the ledger (a few rows) instead of summing commands_domain.
+-- Reconcile: python -m app.risk.exposure_ledger [--fix]
+CREATE TABLE IF NOT EXISTS risk_exposure (
+  symbol TEXT PRIMARY KEY,
+  exposure_usd NUMERIC NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Same notional rule as hard_limits._get_notional (notional, then notional_usd, else 0).
+-- Never raises; NaN/Infinity count as 0 so one bad payload cannot poison the running total.
+CREATE OR REPLACE FUNCTION risk_exposure_notional(p JSONB) RETURNS NUMERIC
+LANGUAGE plpgsql IMMUTABLE AS $$
+DECLARE
+  v NUMERIC;
+BEGIN
+  v := COALESCE((p->>'notional')::numeric, (p->>'notional_usd')::numeric, 0);
+  IF v::text IN ('NaN', 'Infinity', '-Infinity') THEN
+    RETURN 0;
+  END IF;
+  RETURN v;
+EXCEPTION WHEN others THEN
+  RETURN 0;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION risk_exposure_symbol(p JSONB) RETURNS TEXT
+LANGUAGE sql IMMUTABLE AS $$
+  SELECT CASE WHEN COALESCE(UPPER(p->>'symbol'), '') IN ('', '*') THEN 'UNKNOWN' ELSE UPPER(p->>'symbol') END
+$$;
+
+-- Applies per-symbol deltas in symbol order, so concurrent statements touching several symbols (batch
+-- picks) lock ledger rows in the same order and cannot deadlock. There is no total row: every writer
+-- would serialize on it until commit; readers sum the symbol rows instead.
+CREATE OR REPLACE FUNCTION risk_exposure_apply(p_symbols TEXT[], p_deltas NUMERIC[]) RETURNS VOID
+LANGUAGE sql AS $$
+  INSERT INTO risk_exposure (symbol, exposure_usd, updated_at)
+  SELECT d.symbol, SUM(d.delta), NOW()
+  FROM unnest(p_symbols, p_deltas) AS d(symbol, delta)
+  GROUP BY d.symbol
+  HAVING SUM(d.delta) <> 0
+  ORDER BY d.symbol
+  ON CONFLICT (symbol) DO UPDATE
+    SET exposure_usd = risk_exposure.exposure_usd + EXCLUDED.exposure_usd,
+        updated_at = NOW()
+$$;
+
+-- Statement-level: one sorted upsert per statement instead of one per row. Transition tables cannot
+-- be combined with UPDATE OF column lists or several events, hence three triggers and the QUOTE
+-- filter in the queries; an UPDATE that changes neither status nor payload nets to zero and is skipped.
+CREATE OR REPLACE FUNCTION risk_exposure_track() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  symbols TEXT[];
+  deltas NUMERIC[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(risk_exposure_symbol(payload)), array_agg(risk_exposure_notional(payload))
+    INTO symbols, deltas
+    FROM new_rows WHERE type = 'QUOTE' AND status IN ('DONE', 'PENDING');
+  ELSIF TG_OP = 'UPDATE' THEN
+    SELECT array_agg(d.symbol), array_agg(d.delta) INTO symbols, deltas
+    FROM (
+      SELECT risk_exposure_symbol(payload) AS symbol, risk_exposure_notional(payload) AS delta
+      FROM new_rows WHERE type = 'QUOTE' AND status IN ('DONE', 'PENDING')
+      UNION ALL
+      SELECT risk_exposure_symbol(payload), -risk_exposure_notional(payload)
+      FROM old_rows WHERE type = 'QUOTE' AND status IN ('DONE', 'PENDING')
+    ) d;
+  ELSE
+    SELECT array_agg(risk_exposure_symbol(payload)), array_agg(-risk_exposure_notional(payload))
+    INTO symbols, deltas
+    FROM old_rows WHERE type = 'QUOTE' AND status IN ('DONE', 'PENDING');
+  END IF;
+  IF symbols IS NOT NULL THEN
+    PERFORM risk_exposure_apply(symbols, deltas);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_risk_exposure_ins ON commands_domain;
+CREATE TRIGGER trg_risk_exposure_ins AFTER INSERT ON commands_domain
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION risk_exposure_track();
+
+DROP TRIGGER IF EXISTS trg_risk_exposure_upd ON commands_domain;
+CREATE TRIGGER trg_risk_exposure_upd AFTER UPDATE ON commands_domain
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION risk_exposure_track();
+
+DROP TRIGGER IF EXISTS trg_risk_exposure_del ON commands_domain;
+CREATE TRIGGER trg_risk_exposure_del AFTER DELETE ON commands_domain
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION risk_exposure_track();
+
+-- Seed from existing rows (idempotent: recomputes and overwrites).
+BEGIN;
+LOCK TABLE risk_exposure IN EXCLUSIVE MODE;
+DELETE FROM risk_exposure;
+INSERT INTO risk_exposure (symbol, exposure_usd, updated_at)
+SELECT risk_exposure_symbol(payload), SUM(risk_exposure_notional(payload)), NOW()
+FROM commands_domain
+WHERE type = 'QUOTE' AND status IN ('DONE', 'PENDING')
+GROUP BY 1;
+COMMIT;
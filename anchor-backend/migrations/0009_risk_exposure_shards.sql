@@ -0,0 +1,35 @@
+-- Sharded exposure reservations for RISK_EXPOSURE_ATOMIC=1 (replaces the risk_state id=1 row lock).
+-- Each symbol row reserves against its own allotment (reserved_usd <= allotted_usd); allotments are
+-- granted under the risk_state row lock so SUM(allotted_usd) <= max exposure. Orders on different
+-- symbols only contend when a shard runs out of allotment.
+CREATE TABLE IF NOT EXISTS risk_exposure_shards (
+  symbol TEXT PRIMARY KEY,
+  reserved_usd NUMERIC NOT NULL DEFAULT 0,
+  allotted_usd NUMERIC NOT NULL DEFAULT 0,
+  -- Max exposure the allotment was granted under. The fast path only runs while it equals the current
+  -- max, so lowering the limit sends every shard through the locked path, which re-grants allotments.
+  max_usd NUMERIC,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Carry over existing reservations (single-row ledger) into one shard, once.
+INSERT INTO risk_exposure_shards (symbol, reserved_usd, allotted_usd)
+SELECT 'UNKNOWN', current_exposure_usd, current_exposure_usd
+FROM risk_state
+WHERE id = 1 AND current_exposure_usd <> 0
+  AND NOT EXISTS (SELECT 1 FROM risk_exposure_shards);
+
+-- Ops reset (UPDATE risk_state SET current_exposure_usd=0 ...) also clears every shard.
+CREATE OR REPLACE FUNCTION risk_exposure_shards_reset() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  UPDATE risk_exposure_shards
+  SET reserved_usd = 0, allotted_usd = 0, updated_at = NOW()
+  WHERE reserved_usd <> 0 OR allotted_usd <> 0;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_risk_exposure_shards_reset ON risk_state;
+CREATE TRIGGER trg_risk_exposure_shards_reset AFTER UPDATE OF current_exposure_usd ON risk_state
+  FOR EACH ROW WHEN (NEW.current_exposure_usd = 0) EXECUTE FUNCTION risk_exposure_shards_reset();
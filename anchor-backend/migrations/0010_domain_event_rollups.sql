@@ -0,0 +1,51 @@
+-- Per-minute counters for the event types /ops/summary reads, maintained on every domain_events insert.
+-- A window of N minutes is a sum over at most N buckets (times slots), independent of the event log size.
+-- Each minute and type is split over 8 slots picked by backend pid, so concurrent writers
+-- do not queue on one row lock until commit; readers sum the slots.
+CREATE TABLE IF NOT EXISTS domain_event_rollups (
+  bucket TIMESTAMPTZ NOT NULL,
+  event_type TEXT NOT NULL,
+  slot SMALLINT NOT NULL DEFAULT 0,
+  cnt BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (bucket, event_type, slot)
+);
+
+-- Statement-level: a multi-row insert (buffered event sink) updates each bucket once.
+-- Only the types /ops/summary reads are counted; keep the list in sync with _OPS_SUMMARY_EVENT_TYPES.
+-- Rows are upserted in key order so concurrent inserts cannot deadlock on rollup rows.
+CREATE OR REPLACE FUNCTION domain_event_rollups_track() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO domain_event_rollups (bucket, event_type, slot, cnt)
+  SELECT date_trunc('minute', created_at), event_type, (pg_backend_pid() % 8)::smallint, COUNT(*)
+  FROM new_events
+  WHERE event_type IN ('POLICY_BLOCK', 'EXCEPTION', 'KILL_SWITCH_ON')
+  GROUP BY 1, 2
+  ORDER BY 1, 2
+  ON CONFLICT (bucket, event_type, slot) DO UPDATE
+    SET cnt = domain_event_rollups.cnt + EXCLUDED.cnt;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_domain_event_rollups ON domain_events;
+CREATE TRIGGER trg_domain_event_rollups AFTER INSERT ON domain_events
+  REFERENCING NEW TABLE AS new_events
+  FOR EACH STATEMENT EXECUTE FUNCTION domain_event_rollups_track();
+
+-- FAILED count in /ops/summary filters commands_domain on (status, updated_at).
+CREATE INDEX IF NOT EXISTS idx_commands_domain_status_updated
+  ON commands_domain (status, updated_at);
+
+-- Backfill the largest window /ops/summary serves (1440 minutes) into slot 0. Idempotent.
+BEGIN;
+LOCK TABLE domain_event_rollups IN EXCLUSIVE MODE;
+DELETE FROM domain_event_rollups
+WHERE bucket >= date_trunc('minute', NOW() - interval '1440 minutes');
+INSERT INTO domain_event_rollups (bucket, event_type, slot, cnt)
+SELECT date_trunc('minute', created_at), event_type, 0, COUNT(*)
+FROM domain_events
+WHERE created_at >= date_trunc('minute', NOW() - interval '1440 minutes')
+  AND event_type IN ('POLICY_BLOCK', 'EXCEPTION', 'KILL_SWITCH_ON')
+GROUP BY 1, 2;
+COMMIT;
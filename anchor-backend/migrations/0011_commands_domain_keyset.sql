@@ -0,0 +1,7 @@
+-- Keyset pagination for GET /domain-commands (ORDER BY created_at DESC, id DESC; ?before= cursor).
+CREATE INDEX IF NOT EXISTS idx_commands_domain_created_id
+  ON commands_domain (created_at DESC, id DESC);
+
+-- Keyset pagination for GET /domain-commands/{id}/events (ORDER BY created_at, id; ?after= cursor).
+CREATE INDEX IF NOT EXISTS idx_domain_events_command_created_id
+  ON domain_events (command_id, created_at, id);
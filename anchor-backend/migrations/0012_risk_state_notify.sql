@@ -0,0 +1,35 @@
+-- Invalidation signal for the API's cached /risk/state snapshot (app/risk/state_cache.py).
+-- NOTIFY is delivered on commit and deduplicated per transaction, so a burst costs one message.
+CREATE OR REPLACE FUNCTION risk_state_notify_failed() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM new_events WHERE event_type = 'MARK_FAILED') THEN
+    PERFORM pg_notify('anchor_risk_state', 'MARK_FAILED');
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_risk_state_notify_events ON domain_events;
+CREATE TRIGGER trg_risk_state_notify_events AFTER INSERT ON domain_events
+  REFERENCING NEW TABLE AS new_events
+  FOR EACH STATEMENT EXECUTE FUNCTION risk_state_notify_failed();
+
+CREATE OR REPLACE FUNCTION risk_state_notify_exposure() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM pg_notify('anchor_risk_state', 'exposure');
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_risk_state_notify_exposure ON risk_state;
+CREATE TRIGGER trg_risk_state_notify_exposure AFTER INSERT OR UPDATE OR DELETE ON risk_state
+  FOR EACH STATEMENT EXECUTE FUNCTION risk_state_notify_exposure();
+
+DROP TRIGGER IF EXISTS trg_risk_state_notify_shards ON risk_exposure_shards;
+CREATE TRIGGER trg_risk_state_notify_shards AFTER INSERT OR UPDATE OR DELETE ON risk_exposure_shards
+  FOR EACH STATEMENT EXECUTE FUNCTION risk_state_notify_exposure();
+
+-- /risk/state and the worker lockout check count today's MARK_FAILED with a created_at range
+-- on idx_domain_events_type_created (0004) instead of created_at::date = CURRENT_DATE.
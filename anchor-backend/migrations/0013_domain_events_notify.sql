@@ -0,0 +1,25 @@
+-- Push channel for GET /domain-commands/{id}/events/stream and /domain-events/stream.
+-- Each INSERT statement notifies 'anchor_domain_events' with its new ids ('12,13,14'); the API's
+-- single listener loads the rows once and fans them out to every SSE client (app/ops/event_hub.py).
+-- Ids are sent in groups of 300 to stay well under the 8000-byte NOTIFY payload limit.
+CREATE OR REPLACE FUNCTION domain_events_notify() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  ids TEXT;
+BEGIN
+  FOR ids IN
+    SELECT string_agg(id::text, ',' ORDER BY id)
+    FROM (SELECT id, (row_number() OVER (ORDER BY id) - 1) / 300 AS grp FROM new_events) t
+    GROUP BY grp
+    ORDER BY grp
+  LOOP
+    PERFORM pg_notify('anchor_domain_events', ids);
+  END LOOP;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_domain_events_notify ON domain_events;
+CREATE TRIGGER trg_domain_events_notify AFTER INSERT ON domain_events
+  REFERENCING NEW TABLE AS new_events
+  FOR EACH STATEMENT EXECUTE FUNCTION domain_events_notify();
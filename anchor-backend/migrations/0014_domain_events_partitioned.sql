@@ -0,0 +1,115 @@
+-- domain_events becomes a table partitioned by created_at, one partition per UTC day
+-- (domain_events_pYYYYMMDD). Queries that filter on a recent created_at window (policies, lockout,
+-- /ops/summary, /risk/state) only scan the one or two partitions they touch. Old days are detached
+-- or dropped by the retention job (app/ops/event_retention.py) instead of DELETE + VACUUM.
+--
+-- Migration path: the existing table is not copied. It is renamed to domain_events_legacy and
+-- attached as the partition for everything before tomorrow (UTC), so ids, rows and the id sequence
+-- are kept; retention drops it once its newest day is past the retention window.
+-- The attach builds the (id, created_at) primary-key index on the legacy table under the lock.
+-- A DEFAULT partition catches rows for days that have no partition yet, so inserts never fail.
+-- Idempotent: a no-op when domain_events is already partitioned.
+
+-- Creates the partition for one UTC day. Returns its name when created; NULL when it already exists,
+-- the day is covered by another partition (e.g. domain_events_legacy) or DEFAULT holds rows for it.
+CREATE OR REPLACE FUNCTION domain_events_create_partition(day DATE) RETURNS TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+  part TEXT := 'domain_events_p' || to_char(day, 'YYYYMMDD');
+  lo TIMESTAMPTZ := day::timestamp AT TIME ZONE 'UTC';
+BEGIN
+  IF to_regclass(part) IS NOT NULL THEN
+    RETURN NULL;
+  END IF;
+  EXECUTE format(
+    'CREATE TABLE %I PARTITION OF domain_events FOR VALUES FROM (%L) TO (%L)',
+    part, lo, lo + interval '1 day'
+  );
+  RETURN part;
+EXCEPTION
+  WHEN invalid_object_definition OR check_violation THEN
+    RAISE NOTICE 'domain_events partition for % not created: %', day, SQLERRM;
+    RETURN NULL;
+END;
+$$;
+
+DO $$
+DECLARE
+  legacy_hi TIMESTAMPTZ;
+  d DATE;
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'domain_events' AND relkind = 'p') THEN
+    RETURN;
+  END IF;
+
+  LOCK TABLE domain_events IN ACCESS EXCLUSIVE MODE;
+
+  SELECT (date_trunc('day', GREATEST(NOW(), COALESCE(MAX(created_at), NOW())) AT TIME ZONE 'UTC')
+          AT TIME ZONE 'UTC') + interval '1 day'
+    INTO legacy_hi
+    FROM domain_events;
+
+  ALTER TABLE domain_events RENAME TO domain_events_legacy;
+  -- A partition cannot keep its own PRIMARY KEY (id); it gets the parent's (id, created_at) on attach.
+  ALTER TABLE domain_events_legacy DROP CONSTRAINT domain_events_pkey;
+  ALTER INDEX IF EXISTS idx_domain_events_command_created RENAME TO idx_domain_events_legacy_command_created;
+  ALTER INDEX IF EXISTS idx_domain_events_type_created RENAME TO idx_domain_events_legacy_type_created;
+  ALTER INDEX IF EXISTS idx_domain_events_command_created_id RENAME TO idx_domain_events_legacy_command_created_id;
+  DROP TRIGGER IF EXISTS trg_domain_event_rollups ON domain_events_legacy;
+  DROP TRIGGER IF EXISTS trg_risk_state_notify_events ON domain_events_legacy;
+  DROP TRIGGER IF EXISTS trg_domain_events_notify ON domain_events_legacy;
+
+  CREATE TABLE domain_events (
+    id BIGINT NOT NULL DEFAULT nextval('domain_events_id_seq'),
+    command_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    attempt INT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+  ) PARTITION BY RANGE (created_at);
+
+  -- The sequence must outlive domain_events_legacy, which retention eventually drops.
+  ALTER TABLE domain_events_legacy ALTER COLUMN id DROP DEFAULT;
+  ALTER SEQUENCE domain_events_id_seq OWNED BY domain_events.id;
+
+  CREATE INDEX idx_domain_events_command_created ON domain_events (command_id, created_at DESC);
+  CREATE INDEX idx_domain_events_type_created ON domain_events (event_type, created_at DESC);
+  CREATE INDEX idx_domain_events_command_created_id ON domain_events (command_id, created_at, id);
+
+  -- Validated CHECK lets ATTACH skip its own scan of the legacy rows.
+  EXECUTE format(
+    'ALTER TABLE domain_events_legacy ADD CONSTRAINT domain_events_legacy_range CHECK (created_at < %L) NOT VALID',
+    legacy_hi
+  );
+  ALTER TABLE domain_events_legacy VALIDATE CONSTRAINT domain_events_legacy_range;
+  EXECUTE format(
+    'ALTER TABLE domain_events ATTACH PARTITION domain_events_legacy FOR VALUES FROM (MINVALUE) TO (%L)',
+    legacy_hi
+  );
+
+  CREATE TABLE domain_events_default PARTITION OF domain_events DEFAULT;
+
+  d := (legacy_hi AT TIME ZONE 'UTC')::date;
+  FOR i IN 0..6 LOOP
+    PERFORM domain_events_create_partition(d + i);
+  END LOOP;
+END;
+$$;
+
+-- Statement triggers live on the partitioned parent; their transition tables see the rows of every
+-- partition. Same functions as 0010 / 0012 / 0013.
+DROP TRIGGER IF EXISTS trg_domain_event_rollups ON domain_events;
+CREATE TRIGGER trg_domain_event_rollups AFTER INSERT ON domain_events
+  REFERENCING NEW TABLE AS new_events
+  FOR EACH STATEMENT EXECUTE FUNCTION domain_event_rollups_track();
+
+DROP TRIGGER IF EXISTS trg_risk_state_notify_events ON domain_events;
+CREATE TRIGGER trg_risk_state_notify_events AFTER INSERT ON domain_events
+  REFERENCING NEW TABLE AS new_events
+  FOR EACH STATEMENT EXECUTE FUNCTION risk_state_notify_failed();
+
+DROP TRIGGER IF EXISTS trg_domain_events_notify ON domain_events;
+CREATE TRIGGER trg_domain_events_notify AFTER INSERT ON domain_events
+  REFERENCING NEW TABLE AS new_events
+  FOR EACH STATEMENT EXECUTE FUNCTION domain_events_notify();
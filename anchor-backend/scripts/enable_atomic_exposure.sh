@@ -1,5 +1,5 @@
 #!/usr/bin/env bash
-# Enable atomic exposure mode (risk_state ledger). Run migration first.
+# Enable atomic exposure mode (per-symbol reservation shards, migration 0009). Run migrations first.
 # Usage: bash scripts/enable_atomic_exposure.sh
 set -euo pipefail
 
@@ -0,0 +1,115 @@
+"""Shared in-memory stand-ins for the database handles the app code takes (not a test module)."""
+from typing import Any, List, Optional
+
+
+class FakeAcquire:
+    def __init__(self, conn) -> None:
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePool:
+    """asyncpg pool: acquire() hands out the one fake connection."""
+
+    def __init__(self, conn) -> None:
+        self.conn = conn
+
+    def acquire(self):
+        return FakeAcquire(self.conn)
+
+
+def pool_getter(conn):
+    """Async replacement for main._get_domain_pg_pool returning a FakePool around conn."""
+
+    async def get_pool():
+        return FakePool(conn)
+
+    return get_pool
+
+
+class FakeResult:
+    """SQLAlchemy Result: scalar(), mappings().first() / .all(), rowcount."""
+
+    def __init__(self, value: Any = None, rows=(), row: Any = None, rowcount: int = 0) -> None:
+        self._value = value
+        self._rows = list(rows)
+        self._row = row
+        self.rowcount = rowcount
+
+    def scalar(self):
+        return self._value
+
+    def mappings(self):
+        return self
+
+    def first(self):
+        if self._row is not None:
+            return self._row
+        return self._rows[0] if self._rows else None
+
+    def all(self):
+        return self._rows
+
+
+class FakeTransaction:
+    def __init__(self, conn: "FakeConnection") -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        self._conn.engine.transactions.append([])
+        return self._conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self, engine: "FakeEngine") -> None:
+        self.engine = engine
+
+    def begin(self) -> FakeTransaction:
+        return FakeTransaction(self)
+
+    async def execute(self, stmt, params: Optional[dict] = None):
+        sql = str(stmt)
+        self.engine.statements.append(sql)
+        if self.engine.transactions:
+            self.engine.transactions[-1].append(sql)
+        return self.engine.respond(sql, params)
+
+
+class _FakeConnect:
+    def __init__(self, conn: FakeConnection) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeEngine:
+    """
+    SQLAlchemy AsyncEngine: begin() and connect() (with conn.begin()) on one fake connection.
+    Every statement is recorded in .statements and, per transaction, in .transactions; subclasses
+    answer queries by overriding respond(sql, params).
+    """
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+        self.transactions: List[List[str]] = []
+
+    def respond(self, sql: str, params: Optional[dict]) -> FakeResult:
+        return FakeResult()
+
+    def begin(self) -> FakeTransaction:
+        return FakeTransaction(FakeConnection(self))
+
+    def connect(self) -> _FakeConnect:
+        return _FakeConnect(FakeConnection(self))
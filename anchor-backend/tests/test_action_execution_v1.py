@@ -0,0 +1,102 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.actions.context import ActionContext
+from app.actions.execution import ActionExecutor
+from app.actions.protocol import Action, AsyncAction
+from app.actions.steps import default_pipeline_steps
+
+
+class _SleepyAction(Action):
+    name = "SLOW"
+
+    def __init__(self) -> None:
+        self.thread = None
+
+    def run(self, command):
+        self.thread = threading.current_thread()
+        time.sleep(0.2)
+        return {"ok": True, "result": {"slept": True}, "error": None}
+
+
+class _AwaitingAction(AsyncAction):
+    name = "ASYNCY"
+
+    def __init__(self) -> None:
+        self.thread = None
+
+    async def run_async(self, command):
+        self.thread = threading.current_thread()
+        await asyncio.sleep(0)
+        return {"ok": True, "result": {"id": command["id"]}, "error": None}
+
+
+def _ctx(cmd_type: str) -> ActionContext:
+    return ActionContext(now_ts=123, command_id="c1", cmd_type=cmd_type, attempt=1, payload={}, raw={})
+
+
+class ActionExecutionV1Test(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.executor = ActionExecutor(max_threads=4, default_limit=4)
+
+    async def asyncTearDown(self) -> None:
+        self.executor.shutdown()
+
+    async def test_sync_action_runs_off_the_loop(self) -> None:
+        action = _SleepyAction()
+        ctx = _ctx("SLOW")
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        t = asyncio.create_task(ticker())
+        out = await self.executor.run_action(action, ctx, ctx.to_command_dict(), default_pipeline_steps)
+        t.cancel()
+
+        self.assertEqual(out["result"], {"slept": True, "ts": 123})
+        self.assertIsNot(action.thread, threading.main_thread())
+        self.assertGreater(ticks, 5)
+
+    async def test_async_action_is_awaited_on_the_loop(self) -> None:
+        action = _AwaitingAction()
+        ctx = _ctx("ASYNCY")
+
+        out = await self.executor.run_action(action, ctx, ctx.to_command_dict(), default_pipeline_steps)
+
+        self.assertEqual(out["result"], {"id": "c1", "ts": 123})
+        self.assertIs(action.thread, threading.main_thread())
+        self.assertEqual(action.run({}), {"ok": False, "result": None, "error": {"code": "ASYNC_ACTION", "message": "use run_async"}})
+
+    async def test_slow_type_limit_does_not_hold_up_other_types(self) -> None:
+        with mock.patch.dict(os.environ, {"ACTION_CONCURRENCY_SLOW": "1"}):
+            slow = [asyncio.create_task(self.executor.run_blocking("SLOW", time.sleep, 0.2)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            stats = self.executor.stats()["lanes"]["SLOW"]
+            t0 = time.perf_counter()
+            self.assertEqual(await self.executor.run_blocking("FAST", lambda: "fast"), "fast")
+            fast_elapsed = time.perf_counter() - t0
+            await asyncio.gather(*slow)
+
+        self.assertEqual((stats["limit"], stats["in_flight"], stats["waiting"]), (1, 1, 1))
+        self.assertLess(fast_elapsed, 0.1)
+        self.assertEqual(self.executor.stats()["lanes"]["SLOW"]["completed"], 2)
+
+    async def test_blocking_exceptions_propagate(self) -> None:
+        def boom() -> None:
+            raise RuntimeError("exchange down")
+
+        with self.assertRaises(RuntimeError):
+            await self.executor.run_blocking("ORDER", boom)
+        self.assertEqual(self.executor.stats()["lanes"]["ORDER"]["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
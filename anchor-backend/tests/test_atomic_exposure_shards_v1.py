@@ -0,0 +1,134 @@
+import os
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from app.risk.atomic_exposure_guard import RiskError, atomic_exposure_guard
+from db_fakes import FakeResult
+
+
+class _ShardConn:
+    """In-memory stand-in for risk_exposure_shards / risk_state (matches the guard's statements)."""
+
+    def __init__(self, shards=None, max_usd=Decimal(300)):
+        self.shards = {k: list(v) for k, v in (shards or {}).items()}
+        # max_usd column per shard: preset shards were granted under max_usd.
+        self.max_usd = {k: max_usd for k in self.shards}
+        self.risk_state = Decimal(0)
+        self.global_locks = 0
+
+    async def execute(self, stmt, params=None):
+        sql = " ".join(str(stmt).split())
+        p = params or {}
+        if sql.startswith("UPDATE risk_exposure_shards SET reserved_usd = reserved_usd + :notional"):
+            shard = self.shards.get(p["symbol"])
+            if shard is None or shard[0] + p["notional"] > shard[1] or self.max_usd[p["symbol"]] != p["max"]:
+                return FakeResult()
+            shard[0] += p["notional"]
+            return FakeResult(rows=[{"reserved_usd": shard[0]}])
+        if sql.startswith("SELECT COALESCE(SUM(reserved_usd), 0)"):
+            return FakeResult(rows=[{"total": sum((s[0] for s in self.shards.values()), Decimal(0))}])
+        if "FROM risk_state WHERE id=1 FOR UPDATE" in sql:
+            self.global_locks += 1
+            return FakeResult(rows=[{"current_exposure_usd": self.risk_state}])
+        if sql.startswith("INSERT INTO risk_exposure_shards"):
+            if p["symbol"] not in self.shards:
+                self.shards[p["symbol"]] = [Decimal(0), Decimal(0)]
+                self.max_usd[p["symbol"]] = p["max"]
+            return FakeResult()
+        if sql.startswith("SELECT symbol, reserved_usd, allotted_usd, max_usd"):
+            return FakeResult(rows=
+                [
+                    {"symbol": k, "reserved_usd": v[0], "allotted_usd": v[1], "max_usd": self.max_usd[k]}
+                    for k, v in sorted(self.shards.items())
+                ]
+            )
+        if "SET allotted_usd = LEAST(allotted_usd, reserved_usd), max_usd = :max" in sql:
+            for k, shard in self.shards.items():
+                shard[1] = min(shard[1], shard[0])
+                self.max_usd[k] = p["max"]
+            return FakeResult()
+        if "SET allotted_usd = reserved_usd" in sql:
+            for shard in self.shards.values():
+                shard[1] = min(shard[1], shard[0])
+            return FakeResult()
+        if "SET reserved_usd = :reserved, allotted_usd = :allotted" in sql:
+            self.shards[p["symbol"]] = [p["reserved"], p["allotted"]]
+            return FakeResult()
+        if sql.startswith("UPDATE risk_state SET current_exposure_usd = :total"):
+            self.risk_state = p["total"]
+            return FakeResult()
+        raise AssertionError(f"unexpected statement: {sql}")
+
+
+class AtomicExposureShardsV1Test(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch.dict(os.environ, {"RISK_EXPOSURE_SHARDED": "1"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_first_reservation_takes_global_lock_and_grants_chunk(self) -> None:
+        conn = _ShardConn()
+
+        total = await atomic_exposure_guard(conn, 5, 300, symbol="BTCUSDT")
+
+        self.assertEqual(total, 5.0)
+        self.assertEqual(conn.global_locks, 1)
+        self.assertEqual(conn.shards["BTCUSDT"], [Decimal(5), Decimal(35)])
+        self.assertEqual(conn.risk_state, Decimal(5))
+
+    async def test_reservation_within_allotment_skips_global_lock(self) -> None:
+        conn = _ShardConn({"BTCUSDT": [Decimal(5), Decimal(35)]})
+
+        total = await atomic_exposure_guard(conn, 10, 300, symbol="BTCUSDT")
+
+        self.assertEqual(total, 15.0)
+        self.assertEqual(conn.global_locks, 0)
+
+    async def test_global_limit_blocks_across_symbols(self) -> None:
+        conn = _ShardConn({"BTCUSDT": [Decimal(250), Decimal(250)]})
+
+        with self.assertRaises(RiskError):
+            await atomic_exposure_guard(conn, 60, 300, symbol="ETHUSDT")
+        self.assertEqual(conn.shards["ETHUSDT"], [Decimal(0), Decimal(0)])
+
+    async def test_unused_allotment_is_reclaimed_from_other_shards(self) -> None:
+        conn = _ShardConn({"BTCUSDT": [Decimal(10), Decimal(280)]})
+
+        total = await atomic_exposure_guard(conn, 200, 300, symbol="ETHUSDT")
+
+        self.assertEqual(total, 210.0)
+        self.assertEqual(conn.shards["BTCUSDT"], [Decimal(10), Decimal(10)])
+        self.assertEqual(conn.shards["ETHUSDT"][0], Decimal(200))
+        allotted = sum(s[1] for s in conn.shards.values())
+        self.assertLessEqual(allotted, Decimal(300))
+
+    async def test_lowered_limit_rejects_reservation_within_old_allotment(self) -> None:
+        conn = _ShardConn({"BTCUSDT": [Decimal(100), Decimal(200)], "ETHUSDT": [Decimal(50), Decimal(100)]})
+
+        # 20 fits BTCUSDT's allotment (granted under max 300), but 150 + 20 > the new max 160.
+        with self.assertRaises(RiskError):
+            await atomic_exposure_guard(conn, 20, 160, symbol="BTCUSDT")
+        self.assertEqual(conn.global_locks, 1)
+
+        total = await atomic_exposure_guard(conn, 10, 160, symbol="BTCUSDT")
+        self.assertEqual(total, 160.0)
+        self.assertLessEqual(sum(s[1] for s in conn.shards.values()), Decimal(160))
+        self.assertEqual(set(conn.max_usd.values()), {Decimal(160)})
+
+    async def test_allotments_never_exceed_limit(self) -> None:
+        conn = _ShardConn()
+        reserved = Decimal(0)
+        for i in range(100):
+            try:
+                await atomic_exposure_guard(conn, 7, 300, symbol=f"S{i % 5}")
+                reserved += 7
+            except RiskError:
+                pass
+            self.assertLessEqual(sum(s[1] for s in conn.shards.values()), Decimal(300))
+
+        self.assertEqual(reserved, Decimal(294))
+
+
+if __name__ == "__main__":
+    unittest.main()
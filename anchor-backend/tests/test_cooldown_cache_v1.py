@@ -0,0 +1,86 @@
+import os
+import time
+import unittest
+from unittest import mock
+from unittest.mock import AsyncMock
+
+from app.actions.runner import DomainCommandRunner
+
+from app.policies.builtins import CooldownAfterFailPolicy
+from app.policies.cooldown_cache import LastFailureCache
+
+
+class _ExplodingEngine:
+    def begin(self):
+        raise AssertionError("database must not be queried")
+
+
+class LastFailureCacheV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_memory_backend_keeps_latest_timestamp(self) -> None:
+        cache = LastFailureCache()
+        now = time.time()
+        with mock.patch.dict(os.environ, {"POLICY_COOLDOWN_BACKEND": "memory"}):
+            await cache.record("fail", now)
+            await cache.record("FAIL", now - 10)
+            value, source = await cache.get("FAIL")
+
+        self.assertEqual(value, now)
+        self.assertEqual(source, "memory")
+
+    async def test_unknown_type_is_a_miss(self) -> None:
+        with mock.patch.dict(os.environ, {"POLICY_COOLDOWN_BACKEND": "memory"}):
+            value, source = await LastFailureCache().get("NOOP")
+
+        self.assertIsNone(value)
+        self.assertEqual(source, "miss")
+
+
+class CooldownAfterFailPolicyV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_cached_failure_blocks_without_database(self) -> None:
+        cache = LastFailureCache()
+        env = {"POLICY_COOLDOWN_BACKEND": "memory", "POLICY_FAIL_COOLDOWN_SECONDS": "30"}
+        with mock.patch.dict(os.environ, env), mock.patch("app.policies.builtins.last_failures", cache):
+            await cache.record("CDTEST")
+            decision = await CooldownAfterFailPolicy().check(None, {"type": "CDTEST"}, _ExplodingEngine())
+
+        self.assertFalse(decision["allowed"])
+        self.assertEqual(decision["code"], "COOLDOWN_AFTER_FAIL")
+
+    async def test_expired_failure_allows(self) -> None:
+        cache = LastFailureCache()
+        env = {"POLICY_COOLDOWN_BACKEND": "memory", "POLICY_FAIL_COOLDOWN_SECONDS": "30"}
+        with mock.patch.dict(os.environ, env), mock.patch("app.policies.builtins.last_failures", cache):
+            await cache.record("CDTEST", time.time() - 60)
+            decision = await CooldownAfterFailPolicy().check(None, {"type": "CDTEST"}, _ExplodingEngine())
+
+        self.assertTrue(decision["allowed"])
+
+
+class RunnerRecordsFailureV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_mark_failed_records_last_failure_for_type(self) -> None:
+        cache = LastFailureCache()
+
+        async def pick_one():
+            return {"id": "cmd-cd-1", "type": "CDRUN", "attempt": 1, "payload": {}}
+
+        runner = DomainCommandRunner(
+            pick_one,
+            lambda t: None,
+            AsyncMock(return_value=1),
+            AsyncMock(return_value=1),
+            now_ts_fn=lambda: 123,
+            finalize_fn=AsyncMock(return_value=1),
+        )
+        with mock.patch.dict(os.environ, {"POLICY_COOLDOWN_BACKEND": "memory"}), mock.patch(
+            "app.actions.runner.last_failures", cache
+        ):
+            result = await runner.run_one()
+            value, source = await cache.get("CDRUN")
+
+        self.assertEqual(result["final_status"], "FAILED")
+        self.assertIsNotNone(value)
+        self.assertEqual(source, "memory")
+
+
+if __name__ == "__main__":
+    unittest.main()
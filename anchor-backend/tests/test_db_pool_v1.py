@@ -0,0 +1,104 @@
+import asyncio
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy import create_engine, text
+
+from app.db.pool import InstrumentedPool, PoolMetrics, _record_query, engine_options, instrument_engine, pool_config
+
+
+class _RawAcquire:
+    def __init__(self, raw) -> None:
+        self.raw = raw
+
+    async def __aenter__(self):
+        await asyncio.sleep(0.01)
+        return "conn"
+
+    async def __aexit__(self, *exc):
+        self.raw.released += 1
+        return False
+
+
+class _RawPool:
+    def __init__(self) -> None:
+        self.released = 0
+
+    def acquire(self, timeout=None):
+        return _RawAcquire(self)
+
+    def get_size(self):
+        return 3
+
+    def get_idle_size(self):
+        return 2
+
+    def get_min_size(self):
+        return 1
+
+    def get_max_size(self):
+        return 5
+
+    async def fetchval(self, sql):
+        return 1
+
+
+class DbPoolV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_acquire_wait_and_in_use_are_tracked(self) -> None:
+        metrics = PoolMetrics()
+        raw = _RawPool()
+        pool = InstrumentedPool(raw, metrics)
+
+        async with pool.acquire() as conn:
+            self.assertEqual(conn, "conn")
+            self.assertEqual(metrics.in_use, 1)
+
+        self.assertEqual(metrics.in_use, 0)
+        self.assertEqual(raw.released, 1)
+        snap = pool.stats()
+        self.assertEqual(snap["acquire_wait"]["count"], 1)
+        self.assertGreater(snap["acquire_wait"]["max_ms"], 0.0)
+        self.assertEqual((snap["size"], snap["idle"], snap["max_size"]), (3, 2, 5))
+        # Non-acquire calls go straight to the underlying pool.
+        self.assertEqual(await pool.fetchval("SELECT 1"), 1)
+
+    def test_query_logger_records_duration(self) -> None:
+        metrics = PoolMetrics()
+
+        _record_query(metrics)(SimpleNamespace(elapsed=0.25))
+
+        self.assertEqual(metrics.query.snapshot()["last_ms"], 250.0)
+
+    def test_engine_queries_and_checkouts_are_tracked(self) -> None:
+        metrics = PoolMetrics()
+        engine = create_engine("sqlite://")
+        instrument_engine(engine, metrics)
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            self.assertEqual(metrics.in_use, 1)
+
+        self.assertEqual(metrics.in_use, 0)
+        self.assertEqual(metrics.query.count, 1)
+
+    def test_sizing_from_env(self) -> None:
+        env = {"DB_POOL_MIN_SIZE": "4", "DB_POOL_MAX_SIZE": "2", "DB_STATEMENT_CACHE_SIZE": "0", "DB_POOL_WARMUP": "9"}
+        with mock.patch.dict(os.environ, env):
+            cfg = pool_config()
+            opts = engine_options()
+
+        self.assertEqual((cfg["min_size"], cfg["max_size"], cfg["warmup"]), (4, 4, 4))
+        self.assertEqual(opts["pool_size"], 4)
+        self.assertEqual(opts["connect_args"], {"prepared_statement_cache_size": 0})
+
+    def test_defaults(self) -> None:
+        with mock.patch.dict(os.environ, {}, clear=True):
+            cfg = pool_config()
+
+        self.assertEqual((cfg["min_size"], cfg["max_size"], cfg["statement_cache_size"]), (1, 5, 1024))
+
+
+if __name__ == "__main__":
+    unittest.main()
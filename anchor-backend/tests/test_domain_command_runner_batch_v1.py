@@ -0,0 +1,97 @@
+import asyncio
+import unittest
+
+from app.actions.runner import DomainCommandRunner
+from app.workers.domain_command_worker import NoopAction
+
+
+def _noop_item(index):
+    return {"id": f"noop-batch-{index}", "type": "NOOP", "attempt": 1, "payload": {}}
+
+
+class DomainCommandRunnerBatchV1Test(unittest.IsolatedAsyncioTestCase):
+    def _runner(self, items, events, mark_done, max_in_flight=None, batch_size=3):
+        picked_limits = []
+
+        async def pick_one():
+            raise AssertionError("pick_one must not be used in batch mode")
+
+        async def pick_batch(limit):
+            picked_limits.append(limit)
+            batch = list(items[:limit])
+            del items[:limit]
+            return batch
+
+        async def append_event(command_id, event_type, attempt, payload):
+            events.append((command_id, event_type, attempt))
+
+        async def mark_failed(command_id, reason, detail=None):
+            return 1
+
+        runner = DomainCommandRunner(
+            pick_one,
+            lambda command_type: NoopAction() if command_type == "NOOP" else None,
+            mark_done,
+            mark_failed,
+            now_ts_fn=lambda: 123,
+            append_event_fn=append_event,
+            pick_batch_fn=pick_batch,
+            batch_size=batch_size,
+            max_in_flight=max_in_flight,
+        )
+        return runner, picked_limits
+
+    async def test_run_batch_runs_each_command_to_terminal_state(self) -> None:
+        events = []
+        done_ids = []
+
+        async def mark_done(command_id, result=None):
+            done_ids.append(command_id)
+            return 1
+
+        items = [_noop_item(i) for i in range(5)]
+        runner, picked_limits = self._runner(items, events, mark_done)
+
+        results = await runner.run_batch()
+
+        self.assertEqual(picked_limits, [3])
+        self.assertEqual([r["id"] for r in results], ["noop-batch-0", "noop-batch-1", "noop-batch-2"])
+        self.assertTrue(all(r["final_status"] == "DONE" for r in results))
+        self.assertEqual(sorted(done_ids), ["noop-batch-0", "noop-batch-1", "noop-batch-2"])
+        for cid in done_ids:
+            per_cmd = [e[1] for e in events if e[0] == cid]
+            self.assertEqual(per_cmd, ["PICKED", "ACTION_OK", "MARK_DONE"])
+            self.assertTrue(all(e[2] == 1 for e in events if e[0] == cid))
+
+    async def test_run_batch_respects_in_flight_cap(self) -> None:
+        events = []
+        active = [0]
+        peak = [0]
+
+        async def mark_done(command_id, result=None):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+            return 1
+
+        items = [_noop_item(i) for i in range(6)]
+        runner, _ = self._runner(items, events, mark_done, max_in_flight=2, batch_size=6)
+
+        results = await runner.run_batch()
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(peak[0], 2)
+
+    async def test_run_batch_returns_empty_when_nothing_pending(self) -> None:
+        async def mark_done(command_id, result=None):
+            return 1
+
+        runner, picked_limits = self._runner([], [], mark_done)
+
+        self.assertEqual(await runner.run_batch(), [])
+        self.assertEqual(picked_limits, [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
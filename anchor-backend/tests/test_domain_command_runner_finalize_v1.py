@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import AsyncMock
+
+from app.actions.runner import DomainCommandRunner
+from app.workers.domain_command_worker import NoopAction
+
+
+class DomainCommandRunnerFinalizeV1Test(unittest.IsolatedAsyncioTestCase):
+    async def _run(self, cmd_type, **runner_kwargs):
+        events = []
+
+        async def pick_one():
+            return {"id": "cmd-1", "type": cmd_type, "attempt": 2, "payload": {}}
+
+        async def append_event(command_id, event_type, attempt, payload):
+            events.append(event_type)
+
+        mark_done = AsyncMock(return_value=1)
+        mark_failed = AsyncMock(return_value=1)
+        finalize = AsyncMock(return_value=1)
+        runner = DomainCommandRunner(
+            pick_one,
+            lambda t: NoopAction() if t == "NOOP" else None,
+            mark_done,
+            mark_failed,
+            now_ts_fn=lambda: 123,
+            append_event_fn=append_event,
+            finalize_fn=finalize,
+            **runner_kwargs,
+        )
+        result = await runner.run_one()
+        return result, events, mark_done, mark_failed, finalize
+
+    async def test_done_uses_single_finalize_write(self) -> None:
+        result, events, mark_done, mark_failed, finalize = await self._run("NOOP")
+
+        self.assertEqual(result["final_status"], "DONE")
+        self.assertEqual(events, ["PICKED", "ACTION_OK"])
+        mark_done.assert_not_awaited()
+        mark_failed.assert_not_awaited()
+        finalize.assert_awaited_once()
+        args = finalize.await_args
+        self.assertEqual(args.args[:4], ("cmd-1", "DONE", 2, "MARK_DONE"))
+        self.assertEqual(args.args[4]["attempt"], 2)
+        self.assertEqual(args.kwargs["result"]["type"], "noop")
+
+    async def test_unknown_type_finalizes_failed_with_mark_failed_event(self) -> None:
+        result, events, mark_done, mark_failed, finalize = await self._run("NOPE")
+
+        self.assertEqual(result["final_status"], "FAILED")
+        self.assertEqual(events, ["PICKED", "ACTION_FAIL"])
+        mark_failed.assert_not_awaited()
+        args = finalize.await_args
+        self.assertEqual(args.args[:4], ("cmd-1", "FAILED", 2, "MARK_FAILED"))
+        self.assertEqual(args.kwargs["reason"], "UNKNOWN_TYPE")
+
+    async def test_risk_guard_block_finalizes_with_block_event(self) -> None:
+        async def risk_guard(cmd_type, payload):
+            return (False, "RISK_HARD_LIMITS_STOP_REQUIRED")
+
+        result, events, _, mark_failed, finalize = await self._run("NOOP", risk_guard_fn=risk_guard)
+
+        self.assertEqual(result["final_status"], "FAILED")
+        self.assertEqual(events, ["PICKED"])
+        mark_failed.assert_not_awaited()
+        args = finalize.await_args
+        self.assertEqual(args.args[:4], ("cmd-1", "FAILED", 2, "RISK_HARD_LIMITS_BLOCK"))
+
+
+if __name__ == "__main__":
+    unittest.main()
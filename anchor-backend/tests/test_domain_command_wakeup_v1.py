@@ -0,0 +1,32 @@
+import unittest
+
+from app.workers.domain_command_wakeup import COMMANDS_DOMAIN_CHANNEL, PendingWakeup
+
+
+class DomainCommandWakeupV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_wait_times_out_without_notify(self) -> None:
+        wakeup = PendingWakeup("")
+
+        self.assertFalse(await wakeup.start())
+        self.assertFalse(wakeup.listening)
+        self.assertFalse(await wakeup.wait(0.01))
+
+    async def test_notify_wakes_waiter(self) -> None:
+        wakeup = PendingWakeup("")
+        wakeup.clear()
+
+        wakeup._on_notify(None, 123, COMMANDS_DOMAIN_CHANNEL, "noop-1")
+
+        self.assertTrue(await wakeup.wait(5.0))
+
+    async def test_clear_drops_notify_seen_before_pick(self) -> None:
+        wakeup = PendingWakeup("")
+        wakeup._on_notify(None, 123, COMMANDS_DOMAIN_CHANNEL, "noop-1")
+
+        wakeup.clear()
+
+        self.assertFalse(await wakeup.wait(0.01))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from fastapi import HTTPException
+
+from app import main
+from db_fakes import pool_getter
+
+
+class _Tx:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Conn:
+    def __init__(self, existing=()) -> None:
+        self.existing = set(existing)
+        self.fetches = []
+        self.executes = []
+
+    def transaction(self):
+        return _Tx()
+
+    async def fetch(self, sql, ids, types, payloads, now):
+        self.fetches.append((sql, ids, types, payloads))
+        ts = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        return [
+            {"id": i, "status": "PENDING", "created_at": ts, "updated_at": ts}
+            for i in ids
+            if i not in self.existing
+        ]
+
+    async def execute(self, sql, *args):
+        self.executes.append((sql, args))
+
+
+_TESTNET_ORDER = {
+    "symbol": "BTCUSDT",
+    "side": "BUY",
+    "notional": 50,
+    "stop_price": 100,
+    "order_type": "market",
+    "created_by": "ops",
+    "idempotency_key": "k-1",
+    "execution_mode": "testnet",
+    "market": "binance_testnet",
+    "source": "ops_manual",
+}
+
+
+class DomainCommandsBulkV1Test(unittest.IsolatedAsyncioTestCase):
+    async def _bulk(self, conn, commands):
+        with mock.patch.object(main, "_get_domain_pg_pool", pool_getter(conn)):
+            return await main.create_domain_commands_bulk({"commands": commands})
+
+    async def test_one_insert_and_one_wakeup_for_the_batch(self) -> None:
+        conn = _Conn()
+
+        out = await self._bulk(conn, [{"type": "NOOP"}, {"type": "QUOTE", "payload": {"symbol": "ETHUSDT"}}, {"type": "FAIL"}])
+
+        self.assertEqual((out["created"], out["duplicate"], out["rejected"]), (3, 0, 0))
+        self.assertEqual(len(conn.fetches), 1)
+        self.assertIn("unnest", conn.fetches[0][0])
+        self.assertEqual(conn.fetches[0][2], ["NOOP", "QUOTE", "FAIL"])
+        quote = json.loads(conn.fetches[0][3][1])
+        self.assertEqual(quote, {"symbol": "ETHUSDT", "side": "BUY", "notional": 100})
+        self.assertEqual(len(conn.executes), 1)
+        self.assertTrue(all(r["status"] == "PENDING" for r in out["results"]))
+        self.assertTrue(out["results"][1]["id"].startswith("quote-"))
+
+    async def test_per_item_rejections_keep_request_order(self) -> None:
+        conn = _Conn()
+
+        out = await self._bulk(
+            conn,
+            [
+                {"type": "ORDER", "gate": "testnet", "payload": _TESTNET_ORDER},
+                {"type": "ORDER", "gate": "testnet", "payload": dict(_TESTNET_ORDER, symbol="DOGEUSDT")},
+                {"type": "ORDER", "payload": _TESTNET_ORDER},
+                {"type": "DELETE_ALL"},
+                "not-an-object",
+            ],
+        )
+
+        self.assertEqual([r["result"] for r in out["results"]], ["created", "rejected", "rejected", "rejected", "rejected"])
+        self.assertEqual(
+            [r.get("error") for r in out["results"][1:]],
+            ["TESTNET_SYMBOL_INVALID", "ORDER_GATE_INVALID", "TYPE_NOT_SUPPORTED", "ITEM_NOT_OBJECT"],
+        )
+        self.assertEqual(conn.fetches[0][2], ["ORDER"])
+        self.assertEqual(json.loads(conn.fetches[0][3][0])["execution_mode"], "testnet")
+
+    async def test_validation_chain_reported_per_item(self) -> None:
+        out = await self._bulk(_Conn(), [{"type": "QUOTE"}])
+
+        validation = out["results"][0]["validation"]
+        self.assertIn("is_valid", validation)
+        self.assertIsInstance(validation["error_codes"], list)
+
+    async def test_client_ids_make_replays_idempotent(self) -> None:
+        conn = _Conn(existing={"replay-1"})
+
+        out = await self._bulk(
+            conn,
+            [{"type": "NOOP", "id": "replay-1"}, {"type": "NOOP", "id": "replay-2"}, {"type": "NOOP", "id": "replay-2"}],
+        )
+
+        self.assertEqual([r["result"] for r in out["results"]], ["duplicate", "created", "duplicate"])
+        self.assertEqual(conn.fetches[0][1], ["replay-1", "replay-2"])
+
+    async def test_nothing_valid_means_no_database_call(self) -> None:
+        conn = _Conn()
+
+        out = await self._bulk(conn, [{"type": "NOPE"}])
+
+        self.assertEqual(out["rejected"], 1)
+        self.assertEqual(conn.fetches, [])
+
+    async def test_request_size_limits(self) -> None:
+        with self.assertRaises(HTTPException) as ctx:
+            await main.create_domain_commands_bulk({"commands": []})
+        self.assertEqual(ctx.exception.status_code, 400)
+
+        with mock.patch.object(main, "DOMAIN_COMMANDS_BULK_MAX", 2):
+            with self.assertRaises(HTTPException) as ctx:
+                await main.create_domain_commands_bulk({"commands": [{"type": "NOOP"}] * 3})
+        self.assertEqual(ctx.exception.status_code, 413)
+
+
+if __name__ == "__main__":
+    unittest.main()
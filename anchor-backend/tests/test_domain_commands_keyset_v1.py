@@ -0,0 +1,103 @@
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+
+import app.main as main
+from app.ops.pg_stream import RowStream, decode_cursor, encode_cursor
+from db_fakes import pool_getter
+
+
+def _command_row(i):
+    return {
+        "id": f"cmd-{i}",
+        "type": "NOOP",
+        "status": "DONE",
+        "attempt": 1,
+        "locked_by": None,
+        "locked_at": None,
+        "result": {},
+        "error": None,
+        "payload": {},
+        "created_at": datetime(2026, 1, 1, 0, 0, i, tzinfo=timezone.utc),
+        "updated_at": None,
+    }
+
+
+class _Conn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def fetch(self, sql, *args):
+        self.calls.append((sql, args))
+        return self.rows[: args[-1]]
+
+
+class CursorV1Test(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        ts = datetime(2026, 3, 4, 5, 6, 7, 890000, tzinfo=timezone.utc)
+
+        self.assertEqual(decode_cursor(encode_cursor(ts, "abc")), (ts, "abc"))
+        self.assertEqual(decode_cursor(encode_cursor(ts, 42)), (ts, 42))
+
+    def test_malformed_cursor_raises_value_error(self) -> None:
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class ListDomainCommandsKeysetV1Test(unittest.IsolatedAsyncioTestCase):
+    async def _list(self, conn, **kwargs):
+        response = Response()
+        with mock.patch.object(main, "_get_domain_pg_pool", pool_getter(conn)):
+            out = await main.list_domain_commands(response, **kwargs)
+        return out, response
+
+    async def test_full_page_sets_next_cursor(self) -> None:
+        conn = _Conn([_command_row(i) for i in range(3)])
+
+        out, response = await self._list(conn, limit=2)
+
+        self.assertEqual([c["id"] for c in out], ["cmd-0", "cmd-1"])
+        created_at, cid = decode_cursor(response.headers["X-Next-Cursor"])
+        self.assertEqual(cid, "cmd-1")
+        self.assertEqual(created_at, _command_row(1)["created_at"])
+
+    async def test_before_cursor_adds_keyset_predicate(self) -> None:
+        conn = _Conn([_command_row(0)])
+        cursor = encode_cursor(_command_row(5)["created_at"], "cmd-5")
+
+        out, response = await self._list(conn, limit=10, before=cursor)
+
+        sql, args = conn.calls[0]
+        self.assertIn("(created_at, id) < ($1::timestamptz, $2::text)", sql)
+        self.assertEqual(args, (_command_row(5)["created_at"], "cmd-5", 10))
+        self.assertNotIn("X-Next-Cursor", response.headers)
+        self.assertEqual(len(out), 1)
+
+    async def test_bad_cursor_is_400(self) -> None:
+        with self.assertRaises(HTTPException) as cm:
+            await self._list(_Conn([]), before="%%%")
+        self.assertEqual(cm.exception.status_code, 400)
+
+    async def test_ndjson_streams_without_query_on_pool(self) -> None:
+        conn = _Conn([])
+        opened = []
+
+        async def open_row_stream(dsn, sql, args, render, header=""):
+            opened.append(sql)
+            return mock.Mock(spec=RowStream)
+
+        with mock.patch.object(main, "open_row_stream", open_row_stream):
+            out, _ = await self._list(conn, fmt="ndjson")
+
+        self.assertIsInstance(out, StreamingResponse)
+        self.assertEqual(out.media_type, "application/x-ndjson")
+        self.assertEqual(conn.calls, [])
+        self.assertIn("FROM commands_domain", opened[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
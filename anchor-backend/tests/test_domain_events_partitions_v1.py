@@ -0,0 +1,122 @@
+import os
+import unittest
+from datetime import date, datetime, timezone
+from unittest import mock
+
+from app.ops.event_retention import partition_upper_bound, partitions_to_retire, retention_cutoff, run_event_maintenance
+from db_fakes import FakeEngine, FakeResult
+
+_PARTITIONS = [
+    {"name": "domain_events_default", "bound": "DEFAULT"},
+    {"name": "domain_events_legacy", "bound": "FOR VALUES FROM (MINVALUE) TO ('2026-09-01 00:00:00+00')"},
+    {"name": "domain_events_p20260901", "bound": "FOR VALUES FROM ('2026-09-01 00:00:00+00') TO ('2026-09-02 00:00:00+00')"},
+    {"name": "domain_events_p20261017", "bound": "FOR VALUES FROM ('2026-10-17 00:00:00+00') TO ('2026-10-18 00:00:00+00')"},
+]
+
+
+class _Engine(FakeEngine):
+    def __init__(self, relkind="p", locked=True, fail_on=None):
+        super().__init__()
+        self.relkind = relkind
+        self.locked = locked
+        self.fail_on = fail_on
+
+    def respond(self, sql, params):
+        if "pg_try_advisory_lock" in sql:
+            return FakeResult(self.locked)
+        if "relkind" in sql:
+            return FakeResult(self.relkind)
+        if "domain_events_create_partition" in sql:
+            day = params["day"]
+            return FakeResult(None if day == date(2026, 10, 17) else f"domain_events_p{day:%Y%m%d}")
+        if "pg_inherits" in sql:
+            return FakeResult(rows=_PARTITIONS)
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError("canceling statement due to lock timeout")
+        return FakeResult(rowcount=3)
+
+
+_ENV = {"DOMAIN_EVENTS_RETENTION_DAYS": "30", "DOMAIN_EVENTS_PARTITIONS_AHEAD": "3"}
+
+
+class DomainEventsPartitionsV1Test(unittest.IsolatedAsyncioTestCase):
+    def test_upper_bound_parsing(self) -> None:
+        self.assertEqual(
+            partition_upper_bound(_PARTITIONS[1]["bound"]), datetime(2026, 9, 1, tzinfo=timezone.utc)
+        )
+        self.assertIsNone(partition_upper_bound("DEFAULT"))
+        self.assertIsNone(partition_upper_bound("FOR VALUES FROM ('2026-09-01') TO (MAXVALUE)"))
+
+    def test_only_days_before_the_window_are_retired(self) -> None:
+        cutoff = retention_cutoff(date(2026, 10, 17), 30)
+        names = partitions_to_retire([(p["name"], p["bound"]) for p in _PARTITIONS], cutoff)
+
+        self.assertEqual(cutoff, datetime(2026, 9, 17, tzinfo=timezone.utc))
+        self.assertEqual(names, ["domain_events_legacy", "domain_events_p20260901"])
+        # Names outside the partition naming scheme are never interpolated into DDL.
+        self.assertEqual(partitions_to_retire([("x; DROP TABLE y", _PARTITIONS[2]["bound"])], cutoff), [])
+
+    async def test_creates_ahead_and_detaches_old_days(self) -> None:
+        engine = _Engine()
+        with mock.patch.dict(os.environ, _ENV):
+            out = await run_event_maintenance(engine, today=date(2026, 10, 17))
+
+        self.assertTrue(out["ok"])
+        self.assertEqual(out["created"], ["domain_events_p20261018", "domain_events_p20261019"])
+        self.assertEqual(out["retired"], ["domain_events_legacy", "domain_events_p20260901"])
+        ddl = [s for s in engine.statements if "DETACH" in s or "DROP TABLE" in s]
+        self.assertEqual(len(ddl), 2)
+        self.assertTrue(all("DETACH PARTITION" in s for s in ddl))
+        self.assertTrue(any("domain_event_rollups" in s for s in engine.statements))
+        self.assertEqual(out["purged_default"], 3)
+
+    async def test_each_ddl_commits_in_its_own_transaction(self) -> None:
+        engine = _Engine()
+        with mock.patch.dict(os.environ, _ENV):
+            await run_event_maintenance(engine, today=date(2026, 10, 17))
+
+        for tx in engine.transactions:
+            self.assertLessEqual(len([s for s in tx if "lock_timeout" not in s]), 1)
+        ddl = [tx for tx in engine.transactions if any("DETACH" in s for s in tx)]
+        self.assertEqual(len(ddl), 2)
+        self.assertIn("pg_advisory_unlock", engine.statements[-1])
+
+    async def test_failed_step_keeps_earlier_work_and_unlocks(self) -> None:
+        engine = _Engine(fail_on="domain_events_p20260901")
+        with mock.patch.dict(os.environ, _ENV):
+            out = await run_event_maintenance(engine, today=date(2026, 10, 17))
+
+        self.assertFalse(out["ok"])
+        self.assertIn("lock timeout", out["error"])
+        self.assertEqual(sum("DETACH PARTITION domain_events_legacy" in s for s in engine.statements), 1)
+        self.assertFalse(any("DELETE" in s for s in engine.statements))
+        self.assertIn("pg_advisory_unlock", engine.statements[-1])
+
+    async def test_drop_mode_and_dry_run(self) -> None:
+        engine = _Engine()
+        with mock.patch.dict(os.environ, dict(_ENV, DOMAIN_EVENTS_RETENTION_MODE="drop")):
+            await run_event_maintenance(engine, today=date(2026, 10, 17))
+            dry = _Engine()
+            out = await run_event_maintenance(dry, dry_run=True, today=date(2026, 10, 17))
+
+        self.assertEqual(sum("DROP TABLE" in s for s in engine.statements), 2)
+        self.assertEqual(out["retired"], ["domain_events_legacy", "domain_events_p20260901"])
+        self.assertFalse(any("DROP" in s or "DELETE" in s or "create_partition" in s for s in dry.statements))
+
+    async def test_skips_when_locked_or_not_partitioned(self) -> None:
+        locked = await run_event_maintenance(_Engine(locked=False))
+        plain = await run_event_maintenance(_Engine(relkind="r"))
+
+        self.assertEqual((locked["skipped"], plain["skipped"]), ("locked", "not_partitioned"))
+
+    async def test_zero_retention_keeps_everything(self) -> None:
+        engine = _Engine()
+        with mock.patch.dict(os.environ, dict(_ENV, DOMAIN_EVENTS_RETENTION_DAYS="0")):
+            out = await run_event_maintenance(engine, today=date(2026, 10, 17))
+
+        self.assertEqual(out["retired"], [])
+        self.assertFalse(any("pg_inherits" in s for s in engine.statements))
+
+
+if __name__ == "__main__":
+    unittest.main()
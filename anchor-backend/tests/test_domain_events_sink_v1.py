@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from app.domain_events import DomainEventSink, _append_via_sink, _event_row
+
+
+def _row(command_id, event_type, attempt=1):
+    return (command_id, event_type, attempt, "{}", datetime.now(timezone.utc))
+
+
+class DomainEventSinkV1Test(unittest.IsolatedAsyncioTestCase):
+    def _sink(self, writes, **kwargs):
+        async def write_rows(rows):
+            writes.append([(r[0], r[1]) for r in rows])
+
+        return DomainEventSink(write_rows, **kwargs)
+
+    async def test_barrier_event_flushes_everything_before_it_in_order(self) -> None:
+        writes = []
+        sink = self._sink(writes, flush_interval_sec=60)
+
+        for event_type in ("PICKED", "POLICY_ALLOW", "ACTION_OK"):
+            await _append_via_sink(sink, _row("noop-1", event_type))
+        self.assertEqual(writes, [])
+
+        await _append_via_sink(sink, _row("noop-1", "MARK_DONE"))
+
+        self.assertEqual(
+            writes,
+            [[("noop-1", "PICKED"), ("noop-1", "POLICY_ALLOW"), ("noop-1", "ACTION_OK"), ("noop-1", "MARK_DONE")]],
+        )
+
+    async def test_size_trigger_flushes_in_background(self) -> None:
+        writes = []
+        sink = self._sink(writes, flush_interval_sec=60, max_batch=2)
+
+        sink.append(_row("noop-1", "PICKED"))
+        sink.append(_row("noop-2", "PICKED"))
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(writes, [[("noop-1", "PICKED"), ("noop-2", "PICKED")]])
+
+    async def test_time_trigger_flushes_in_background(self) -> None:
+        writes = []
+        sink = self._sink(writes, flush_interval_sec=0.01)
+
+        sink.append(_row("ops-worker", "WORKER_HEARTBEAT"))
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(writes, [[("ops-worker", "WORKER_HEARTBEAT")]])
+
+    async def test_failed_flush_is_counted_and_swallowed(self) -> None:
+        async def write_rows(rows):
+            raise RuntimeError("db down")
+
+        sink = DomainEventSink(write_rows, flush_interval_sec=60)
+        sink.append(_row("noop-1", "PICKED"))
+
+        await sink.flush()
+
+        self.assertEqual(sink.dropped, 1)
+        self.assertEqual(sink.written, 0)
+
+    async def test_failed_batch_is_retried_row_by_row(self) -> None:
+        writes = []
+
+        async def write_rows(rows):
+            if len(rows) > 1 or rows[0][0] == "bad":
+                raise RuntimeError("invalid input")
+            writes.append((rows[0][0], rows[0][1]))
+
+        sink = DomainEventSink(write_rows, flush_interval_sec=60)
+        for command_id in ("noop-1", "bad", "noop-2"):
+            sink.append(_row(command_id, "PICKED"))
+
+        with mock.patch("builtins.print"):
+            await sink.flush()
+
+        self.assertEqual(writes, [("noop-1", "PICKED"), ("noop-2", "PICKED")])
+        self.assertEqual((sink.written, sink.dropped), (2, 1))
+
+    def test_event_row_trims_payload(self) -> None:
+        row = _event_row("noop-1", "PICKED", 2, {"type": "NOOP", "attempt": 2, "ignore_me": "x"})
+
+        self.assertEqual(row[:3], ("noop-1", "PICKED", 2))
+        self.assertNotIn("ignore_me", row[3])
+
+
+if __name__ == "__main__":
+    unittest.main()
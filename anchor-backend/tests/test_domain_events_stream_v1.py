@@ -0,0 +1,141 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from app import main
+from app.ops import event_hub
+from app.ops.event_hub import DOMAIN_EVENTS_CHANNEL, DomainEventHub
+from db_fakes import pool_getter
+
+
+def _row(i: int, command_id: str = "c1", event_type: str = "PICKED") -> dict:
+    return {
+        "id": i,
+        "command_id": command_id,
+        "event_type": event_type,
+        "attempt": 1,
+        "payload": {},
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+    }
+
+
+class _Conn:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.queries = []
+
+    async def fetch(self, sql, *args):
+        self.queries.append((sql, args))
+        if "ANY($1::bigint[])" in sql:
+            wanted = set(args[0])
+            return [r for r in self.rows if r["id"] in wanted]
+        return [r for r in self.rows if r["command_id"] == args[0]]
+
+
+class _ListeningHub(DomainEventHub):
+    @property
+    def listening(self) -> bool:
+        return True
+
+    async def start(self) -> bool:
+        return True
+
+
+class DomainEventHubV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_one_fetch_fans_out_by_command(self) -> None:
+        conn = _Conn([_row(1, "c1"), _row(2, "c2"), _row(3, "c1")])
+
+        hub = _ListeningHub("postgres://x", pool_getter(conn))
+        only_c1 = await hub.subscribe("c1")
+        everything = await hub.subscribe(None)
+
+        hub._on_notify(None, 1, DOMAIN_EVENTS_CHANNEL, "1,2,3")
+        c1_rows = await only_c1.next_batch(5.0)
+        all_rows = await everything.next_batch(5.0)
+
+        self.assertEqual([r["id"] for r in c1_rows], [1, 3])
+        self.assertEqual([r["id"] for r in all_rows], [1, 2, 3])
+        self.assertEqual(hub.fetches, 1)
+        await hub.close()
+
+    async def test_notify_without_subscribers_fetches_nothing(self) -> None:
+        hub = DomainEventHub("", mock.AsyncMock())
+
+        hub._on_notify(None, 1, DOMAIN_EVENTS_CHANNEL, "1,2")
+
+        self.assertEqual(hub._pending_ids, set())
+
+    async def test_listener_drop_closes_subscribers(self) -> None:
+        hub = _ListeningHub("postgres://x", mock.AsyncMock())
+        sub = await hub.subscribe("c1")
+
+        hub._on_terminate(None)
+
+        self.assertTrue(sub.closed)
+        self.assertEqual(hub.subscriber_count, 0)
+        await hub.close()
+
+    async def test_slow_subscriber_is_closed(self) -> None:
+        hub = _ListeningHub("postgres://x", mock.AsyncMock())
+        sub = await hub.subscribe(None)
+
+        with mock.patch.object(event_hub, "SUBSCRIBER_MAX_PENDING", 2):
+            hub.dispatch([_row(1), _row(2), _row(3)])
+
+        self.assertTrue(sub.closed)
+        self.assertEqual(hub.subscriber_count, 0)
+        await hub.close()
+
+    async def test_without_listener_subscription_starts_closed(self) -> None:
+        hub = DomainEventHub("", mock.AsyncMock())
+
+        sub = await hub.subscribe("c1")
+
+        self.assertTrue(sub.closed)
+        self.assertEqual(await sub.next_batch(0.01), [])
+
+
+class DomainEventsSseV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_backlog_then_live_until_terminal(self) -> None:
+        conn = _Conn([_row(1), _row(2, event_type="ACTION_OK"), _row(3, event_type="MARK_DONE")])
+        conn_backlog = _Conn(conn.rows[:1])
+
+        hub = _ListeningHub("postgres://x", pool_getter(conn))
+        with mock.patch.object(main.app.state, "domain_event_hub", hub, create=True), mock.patch.object(
+            main, "_get_domain_pg_pool", pool_getter(conn_backlog)
+        ):
+            gen = main._sse_domain_events("c1", None, True)
+            chunks = [await gen.__anext__(), await gen.__anext__()]
+            # Row 1 arrives again via notify after the backlog read: it must not be sent twice.
+            hub._on_notify(None, 1, DOMAIN_EVENTS_CHANNEL, "1,2,3")
+            chunks += [c async for c in gen]
+
+        text = "".join(chunks)
+        ids = [int(line[4:]) for line in text.splitlines() if line.startswith("id: ")]
+        self.assertEqual(ids, [1, 2, 3])
+        self.assertTrue(text.startswith("retry: 3000\n\n"))
+        data = [json.loads(line[6:]) for line in text.splitlines() if line.startswith("data: ")]
+        self.assertEqual(data[-1]["event_type"], "MARK_DONE")
+        self.assertEqual(hub.subscriber_count, 0)
+        await hub.close()
+
+    async def test_resume_overlaps_events_that_committed_late(self) -> None:
+        conn = _Conn([_row(4), _row(7, event_type="MARK_DONE")])
+
+        hub = _ListeningHub("postgres://x", mock.AsyncMock())
+        with mock.patch.object(main.app.state, "domain_event_hub", hub, create=True), mock.patch.object(
+            main, "_get_domain_pg_pool", pool_getter(conn)
+        ):
+            text = "".join([c async for c in main._sse_domain_events("c1", 6, True)])
+
+        sql, args = conn.queries[0]
+        self.assertIn("id > $2::bigint OR created_at >=", sql)
+        self.assertEqual(args, ("c1", 6, main._SSE_RESUME_OVERLAP_SEC))
+        # Id 4 committed after the client saw 6: it is sent on resume.
+        self.assertEqual([int(line[4:]) for line in text.splitlines() if line.startswith("id: ")], [4, 7])
+        await hub.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
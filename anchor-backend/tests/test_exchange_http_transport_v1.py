@@ -0,0 +1,163 @@
+import json
+import socket
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.executors.http_transport import DnsCache, ExchangeHttpTransport
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.peers.add(self.client_address[1])
+        if self.path.startswith("/slow"):
+            time.sleep(0.2)
+        if self.path.startswith("/reject"):
+            self._reply(400, {"code": -1013, "msg": "bad qty"})
+            return
+        self._reply(200, {"path": self.path, "key": self.headers.get("X-MBX-APIKEY")})
+        if self.path.startswith("/bye"):
+            # Server drops the keep-alive connection after replying (idle timeout on the exchange side).
+            self.close_connection = True
+
+    def do_POST(self):
+        self.server.peers.add(self.client_address[1])
+        length = int(self.headers.get("Content-Length") or 0)
+        self._reply(200, {"orderId": 1, "status": "FILLED", "body": self.rfile.read(length).decode()})
+
+
+class ExchangeHttpTransportV1Test(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        cls.server.peers = set()
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        self.server.peers.clear()
+        self.lookups = 0
+
+        def resolve(host, port, *args):
+            self.lookups += 1
+            return socket.getaddrinfo(host, port, *args)
+
+        self.transport = ExchangeHttpTransport(max_per_host=2, dns=DnsCache(60.0, resolve))
+
+    def tearDown(self) -> None:
+        self.transport.close()
+
+    def _get(self, path: str, timeout: float = 5.0):
+        req = urllib.request.Request(f"{self.base}{path}", method="GET", headers={"X-MBX-APIKEY": "k"})
+        return self.transport.urlopen(req, timeout=timeout)
+
+    def test_keep_alive_reuses_one_connection_and_one_dns_lookup(self) -> None:
+        with self._get("/fapi/v1/time") as first:
+            self.assertEqual(json.loads(first.read()), {"path": "/fapi/v1/time", "key": "k"})
+        with self._get("/fapi/v1/time") as second:
+            second.read()
+
+        self.assertFalse(first.timing["reused"])
+        self.assertTrue(second.timing["reused"])
+        self.assertEqual(second.timing["connect_ms"], 0.0)
+        self.assertEqual(len(self.server.peers), 1)
+        self.assertEqual(self.lookups, 1)
+        self.assertEqual(set(first.timing), {"host", "reused", "connect_ms", "tls_ms", "ttfb_ms", "total_ms"})
+        stats = self.transport.stats()["hosts"][f"{self.base}"]
+        self.assertEqual((stats["requests"], stats["reused"]), (2, 1))
+
+    def test_http_errors_match_urllib(self) -> None:
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            self._get("/reject")
+
+        self.assertEqual(ctx.exception.code, 400)
+        self.assertEqual(json.loads(ctx.exception.read())["code"], -1013)
+        # The connection stays usable after an HTTP error response.
+        with self._get("/ok") as resp:
+            self.assertEqual(resp.status, 200)
+        self.assertEqual(len(self.server.peers), 1)
+
+    def test_connection_closed_by_server_is_not_reused(self) -> None:
+        with self._get("/bye") as resp:
+            resp.read()
+        time.sleep(0.05)
+        req = urllib.request.Request(f"{self.base}/fapi/v1/order", data=b"symbol=BTCUSDT", method="POST")
+        with self.transport.urlopen(req, timeout=5.0) as resp:
+            self.assertEqual(json.loads(resp.read())["body"], "symbol=BTCUSDT")
+
+        self.assertFalse(resp.timing["reused"])
+        self.assertEqual(len(self.server.peers), 2)
+
+    def test_per_host_limit_queues_requests(self) -> None:
+        transport = ExchangeHttpTransport(max_per_host=1)
+        results = []
+
+        def call() -> None:
+            with transport.urlopen(f"{self.base}/slow", timeout=5.0) as resp:
+                results.append(resp.status)
+
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        transport.close()
+
+        self.assertEqual(results, [200, 200])
+        self.assertGreaterEqual(elapsed, 0.4)
+
+    def test_connection_refused_is_url_error(self) -> None:
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+
+        with self.assertRaises(urllib.error.URLError):
+            self.transport.urlopen(f"http://127.0.0.1:{port}/x", timeout=1.0)
+
+    def test_connect_and_tls_timeouts_are_url_errors_read_timeout_is_raw(self) -> None:
+        # Accepts TCP (kernel backlog) but never answers the TLS ClientHello.
+        silent = socket.socket()
+        silent.bind(("127.0.0.1", 0))
+        silent.listen(8)
+        self.addCleanup(silent.close)
+
+        with self.assertRaises(urllib.error.URLError) as tls:
+            self.transport.urlopen(f"https://127.0.0.1:{silent.getsockname()[1]}/x", timeout=0.2)
+        with mock.patch.object(socket.socket, "connect", side_effect=socket.timeout("timed out")):
+            with self.assertRaises(urllib.error.URLError) as tcp:
+                self._get("/fapi/v1/time", timeout=0.2)
+        with self.assertRaises(TimeoutError):
+            self._get("/slow", timeout=0.05)
+
+        self.assertIsInstance(tls.exception.reason, TimeoutError)
+        self.assertIsInstance(tcp.exception.reason, TimeoutError)
+
+
+if __name__ == "__main__":
+    unittest.main()
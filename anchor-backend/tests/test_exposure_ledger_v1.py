@@ -0,0 +1,67 @@
+import unittest
+
+from app.risk.exposure_ledger import compute_drift
+from app.risk.hard_limits import _fetch_risk_context
+from db_fakes import FakeEngine, FakeResult
+
+
+class _Engine(FakeEngine):
+    def __init__(self, ledger=None, ledger_error=False):
+        super().__init__()
+        self.ledger = ledger
+        self.ledger_error = ledger_error
+
+    def respond(self, sql, params):
+        if "FROM risk_exposure" in sql:
+            if self.ledger_error:
+                raise RuntimeError('relation "risk_exposure" does not exist')
+            return FakeResult(row={"exposure_usd": self.ledger} if self.ledger is not None else None)
+        return FakeResult(row={"exposure": 42.0})
+
+
+class FetchRiskContextLedgerV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_reads_single_ledger_row(self) -> None:
+        engine = _Engine(ledger=125.5)
+
+        exposure, loss_pct = await _fetch_risk_context(engine)
+
+        self.assertEqual(exposure, 125.5)
+        self.assertEqual(loss_pct, 0.0)
+        self.assertEqual(len(engine.statements), 1)
+        self.assertNotIn("commands_domain", engine.statements[0])
+        # Total is summed over the per-symbol rows; there is no '*' row to lock.
+        self.assertIn("SUM(exposure_usd)", engine.statements[0])
+
+    async def test_falls_back_to_sum_without_ledger(self) -> None:
+        engine = _Engine(ledger_error=True)
+
+        exposure, _ = await _fetch_risk_context(engine)
+
+        self.assertEqual(exposure, 42.0)
+        self.assertIn("commands_domain", engine.statements[-1])
+
+
+class ComputeDriftV1Test(unittest.TestCase):
+    def test_no_drift_when_ledger_matches(self) -> None:
+        ledger = {"*": 15.0, "BTCUSDT": 10.0, "ETHUSDT": 5.0}
+
+        self.assertEqual(compute_drift(ledger, {"BTCUSDT": 10.0, "ETHUSDT": 5.0}), {})
+
+    def test_total_is_derived_from_symbol_rows(self) -> None:
+        drift = compute_drift({"BTCUSDT": 10.0, "ETHUSDT": 7.0}, {"BTCUSDT": 10.0, "ETHUSDT": 5.0})
+
+        self.assertEqual(drift["*"], {"ledger": 17.0, "recomputed": 15.0, "drift": 2.0})
+        self.assertEqual(set(drift), {"*", "ETHUSDT"})
+
+    def test_reports_symbol_and_total_drift(self) -> None:
+        ledger = {"*": 20.0, "BTCUSDT": 15.0, "ETHUSDT": 5.0}
+
+        drift = compute_drift(ledger, {"BTCUSDT": 10.0})
+
+        self.assertEqual(set(drift), {"*", "BTCUSDT", "ETHUSDT"})
+        self.assertEqual(drift["*"], {"ledger": 20.0, "recomputed": 10.0, "drift": 10.0})
+        self.assertEqual(drift["ETHUSDT"]["recomputed"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from app.policies.builtins import IdempotencyPolicy
+from app.policies.terminal_ledger import TerminalLRU, recent_terminals
+
+
+class _ExplodingEngine:
+    def begin(self):
+        raise AssertionError("database must not be queried")
+
+
+class IdempotencyPolicyLedgerV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_pick_flag_false_allows_without_database(self) -> None:
+        decision = await IdempotencyPolicy().check(
+            None, {"id": "noop-ledger-1", "attempt": 1, "terminal_written": False}, _ExplodingEngine()
+        )
+
+        self.assertTrue(decision["allowed"])
+
+    async def test_pick_flag_true_blocks(self) -> None:
+        decision = await IdempotencyPolicy().check(
+            None, {"id": "noop-ledger-2", "attempt": 3, "terminal_written": True}, _ExplodingEngine()
+        )
+
+        self.assertFalse(decision["allowed"])
+        self.assertEqual(decision["code"], "IDEMPOTENT_BLOCK")
+        self.assertEqual(decision["detail"], {"command_id": "noop-ledger-2", "attempt": 3})
+
+    async def test_recent_terminal_blocks_without_database(self) -> None:
+        recent_terminals.add("noop-ledger-3", 2)
+
+        decision = await IdempotencyPolicy().check(None, {"id": "noop-ledger-3", "attempt": 2}, _ExplodingEngine())
+
+        self.assertFalse(decision["allowed"])
+
+
+class TerminalLRUV1Test(unittest.TestCase):
+    def test_evicts_least_recently_used(self) -> None:
+        lru = TerminalLRU(max_size=2)
+        lru.add("a", 1)
+        lru.add("b", 1)
+        self.assertTrue(lru.contains("a", 1))
+
+        lru.add("c", 1)
+
+        self.assertTrue(lru.contains("a", 1))
+        self.assertFalse(lru.contains("b", 1))
+        self.assertTrue(lru.contains("c", 1))
+        self.assertEqual(len(lru), 2)
+
+    def test_zero_size_disables_cache(self) -> None:
+        lru = TerminalLRU(max_size=0)
+        lru.add("a", 1)
+
+        self.assertFalse(lru.contains("a", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import os
+import queue
+import time
+import unittest
+from unittest import mock
+
+from app.ops import kill_switch
+from app.ops.kill_switch import REDIS_CHANNEL, REDIS_KEY, KillSwitchCache
+
+
+class _FakePubSub:
+    def __init__(self, redis):
+        self._redis = redis
+        self.channels = []
+
+    def subscribe(self, channel):
+        self._redis.check()
+        self.channels.append(channel)
+
+    def psubscribe(self, pattern):
+        self.channels.append(pattern)
+
+    def ping(self, message=None):
+        self._redis.check()
+        if not self._redis.half_open:
+            self._redis.messages.put({"type": "pong", "channel": None, "data": message})
+
+    def get_message(self, timeout=0.0):
+        self._redis.check()
+        try:
+            return self._redis.messages.get(timeout=min(timeout, 0.02))
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+class _FakeRedis:
+    def __init__(self, value="0"):
+        self.store = {REDIS_KEY: value}
+        self.messages = queue.Queue()
+        self.gets = 0
+        self.down = False
+        # Connection silently dead: writes "succeed", nothing ever comes back.
+        self.half_open = False
+
+    def check(self):
+        if self.down:
+            raise ConnectionError("redis down")
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return _FakePubSub(self)
+
+    def get(self, key):
+        self.check()
+        self.gets += 1
+        return self.store.get(key)
+
+    def publish(self, channel, value):
+        self.messages.put({"type": "message", "channel": channel, "data": value})
+
+    def keyspace_set(self, value):
+        self.store[REDIS_KEY] = value
+        self.messages.put({"type": "pmessage", "channel": f"__keyspace@0__:{REDIS_KEY}", "data": "set"})
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    def set(self, key, value):
+        self._ops.append(lambda: self._redis.store.__setitem__(key, value))
+
+    def publish(self, channel, value):
+        self._ops.append(lambda: self._redis.publish(channel, value))
+
+    def execute(self):
+        self._redis.check()
+        for op in self._ops:
+            op()
+
+
+def _wait(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class KillSwitchCacheV1Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.redis = _FakeRedis()
+        self.cache = KillSwitchCache(lambda: self.redis, max_staleness_sec=0.5, resync_sec=30.0)
+        patches = [
+            mock.patch.object(kill_switch, "_cache", self.cache),
+            mock.patch.object(kill_switch, "_redis_client", self.redis),
+            mock.patch.dict(os.environ, {"ANCHOR_KILL_SWITCH": "", "KILL_SWITCH_CACHE_DISABLE": ""}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(self.cache.stop)
+
+    def _start(self) -> None:
+        self.cache.start()
+        self.assertTrue(_wait(lambda: self.cache.stats()["live"]))
+
+    def test_reads_come_from_memory_while_subscribed(self) -> None:
+        self._start()
+        gets = self.redis.gets
+        for _ in range(50):
+            self.assertEqual(kill_switch.get_kill_switch_state(), (False, "none"))
+
+        self.assertEqual(self.redis.gets, gets)
+        self.assertEqual(self.cache.stats()["hits"], 50)
+
+    def test_publish_and_keyspace_events_update_the_cache(self) -> None:
+        self._start()
+        self.assertTrue(kill_switch.set_kill_switch_redis(True))
+        self.assertEqual(self.redis.store[REDIS_KEY], "1")
+        self.assertEqual(kill_switch.get_kill_switch_state(), (True, "redis"))
+
+        # Another process flips it off: only the published message reaches this cache.
+        self.redis.publish(REDIS_CHANNEL, "0")
+        self.assertTrue(_wait(lambda: self.cache.last_known() is False))
+        # A raw SET seen via keyspace notifications is re-read from the key.
+        self.redis.keyspace_set("1")
+        self.assertTrue(_wait(lambda: kill_switch.get_kill_switch_state() == (True, "redis")))
+
+    def test_dropped_subscription_falls_back_and_fails_closed(self) -> None:
+        self._start()
+        kill_switch.set_kill_switch_redis(True)
+        self.redis.down = True
+        self.assertTrue(_wait(lambda: not self.cache.stats()["live"]))
+        time.sleep(0.6)
+
+        # Past the staleness bound with Redis unreachable: the known ON state holds.
+        self.assertIsNone(self.cache.cached())
+        with mock.patch("builtins.print"):
+            self.assertEqual(kill_switch.get_kill_switch_state(), (True, "redis"))
+
+        self.redis.down = False
+        self.redis.store[REDIS_KEY] = "0"
+        self.assertEqual(kill_switch.get_kill_switch_state(), (False, "none"))
+        self.assertGreaterEqual(self.cache.stats()["reconnects"], 1)
+
+    def test_half_open_subscription_goes_stale(self) -> None:
+        self._start()
+        self.assertEqual(self.cache.cached(), False)
+        self.redis.half_open = True
+        time.sleep(0.7)
+
+        # Still "live" (no error), but nothing arrived within the bound: not trusted.
+        self.assertTrue(self.cache.stats()["live"])
+        self.assertIsNone(self.cache.cached())
+        self.redis.store[REDIS_KEY] = "1"
+        self.assertEqual(kill_switch.get_kill_switch_state(), (True, "redis"))
+
+    def test_unprimed_cache_reads_redis_directly(self) -> None:
+        self.redis.store[REDIS_KEY] = "1"
+
+        self.assertEqual(kill_switch.get_kill_switch_state(), (True, "redis"))
+        self.assertEqual(self.redis.gets, 1)
+        self.assertEqual(self.cache.last_known(), True)
+
+    def test_env_still_wins_and_disable_skips_cache(self) -> None:
+        with mock.patch.dict(os.environ, {"ANCHOR_KILL_SWITCH": "1"}):
+            self.assertEqual(kill_switch.get_kill_switch_state(), (True, "env"))
+        with mock.patch.dict(os.environ, {"KILL_SWITCH_CACHE_DISABLE": "1"}):
+            self.cache.confirm(True)
+            self.assertEqual(kill_switch.get_kill_switch_state(), (False, "none"))
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
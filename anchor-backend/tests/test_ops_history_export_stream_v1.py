@@ -0,0 +1,170 @@
+import csv
+import io
+import json
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+import app.main as main
+from app.ops import pg_stream
+from app.ops.pg_stream import RowStream
+from app.ops.state_store import build_state_history_export_query
+
+
+def _record(i):
+    return {
+        "id": i,
+        "key": "kill_switch",
+        "value": {"event_type": "KILL_SWITCH_ON", "actor": "ops", "source": "api", "note": f"line {i}"},
+        "created_at": datetime(2026, 1, 1, 0, 0, i, tzinfo=timezone.utc),
+    }
+
+
+class _Cursor:
+    def __init__(self, records):
+        self._records = list(records)
+
+    async def fetch(self, n):
+        out, self._records = self._records[:n], self._records[n:]
+        return out
+
+
+class _Conn:
+    def __init__(self):
+        self.closed = 0
+
+    async def close(self):
+        self.closed += 1
+
+
+class _FakeAsyncpgConn(_Conn):
+    def transaction(self, readonly=False):
+        return mock.Mock(start=mock.AsyncMock())
+
+    async def cursor(self, sql, *args):
+        return _Cursor([])
+
+
+def _fake_open_row_stream(records, calls):
+    async def open_row_stream(dsn, sql, args, render, header=""):
+        calls.append((sql, list(args)))
+        return RowStream(_Conn(), _Cursor(records), list(records), render, header, prefetch=len(records) + 1)
+
+    return open_row_stream
+
+
+async def _body(response: StreamingResponse) -> str:
+    parts = []
+    async for chunk in response.body_iterator:
+        parts.append(chunk if isinstance(chunk, str) else chunk.decode())
+    return "".join(parts)
+
+
+class HistoryExportQueryV1Test(unittest.TestCase):
+    def test_limit_none_has_no_limit_clause(self) -> None:
+        now = datetime.now(timezone.utc)
+
+        sql, params = build_state_history_export_query(now, now, None, actor="ops")
+
+        self.assertNotIn("LIMIT", sql)
+        self.assertEqual(params, [now, now, "ops"])
+
+    def test_limit_is_not_capped(self) -> None:
+        now = datetime.now(timezone.utc)
+
+        sql, params = build_state_history_export_query(now, now, 50000)
+
+        self.assertIn("LIMIT $3", sql)
+        self.assertEqual(params[-1], 50000)
+
+
+class HistoryExportStreamV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_json_export_is_a_streamed_array(self) -> None:
+        calls = []
+        with mock.patch.object(main, "open_row_stream", _fake_open_row_stream([_record(1), _record(2)], calls)):
+            response = await main.ops_state_history_export(
+                from_ts=None, to_ts=None, limit=0, event_type=None, actor=None, source=None, fmt="json"
+            )
+            body = await _body(response)
+
+        items = json.loads(body)
+        self.assertEqual([i["event_type"] for i in items], ["KILL_SWITCH_ON", "KILL_SWITCH_ON"])
+        self.assertIsInstance(items[0]["payload_json"], str)
+        self.assertNotIn("LIMIT", calls[0][0])
+
+    async def test_jsonl_export_has_one_object_per_line(self) -> None:
+        calls = []
+        with mock.patch.object(main, "open_row_stream", _fake_open_row_stream([_record(1), _record(2)], calls)):
+            response = await main.ops_state_history_export(
+                from_ts=None, to_ts=None, limit=10, event_type=None, actor=None, source=None, fmt="jsonl"
+            )
+            body = await _body(response)
+
+        lines = body.split("\n")
+        self.assertEqual(lines[-1], "")
+        self.assertEqual(len(lines[:-1]), 2)
+        self.assertEqual(json.loads(lines[0])["actor"], "ops")
+
+    async def test_csv_export_streams_header_and_rows(self) -> None:
+        calls = []
+        with mock.patch.object(main, "open_row_stream", _fake_open_row_stream([_record(1)], calls)):
+            response = await main.ops_state_history_export_csv(
+                from_ts=None, to_ts=None, limit=0, event_type=None, actor=None, source=None
+            )
+            body = await _body(response)
+
+        rows = list(csv.reader(io.StringIO(body, newline="")))
+        self.assertEqual(rows[0], ["ts", "event_type", "exec_mode", "actor", "source", "payload_json"])
+        self.assertEqual(rows[1][1], "KILL_SWITCH_ON")
+        self.assertIn("attachment", response.headers["content-disposition"])
+
+    async def test_db_failure_is_an_http_error_before_the_body(self) -> None:
+        async def open_row_stream(dsn, sql, args, render, header=""):
+            raise OSError("connection refused")
+
+        with mock.patch.object(main, "open_row_stream", open_row_stream):
+            with self.assertRaises(HTTPException) as ctx:
+                await main.ops_state_history_export_csv(
+                    from_ts=None, to_ts=None, limit=0, event_type=None, actor=None, source=None
+                )
+
+        self.assertEqual(ctx.exception.status_code, 500)
+
+    async def test_row_stream_fetches_in_prefetch_batches_and_closes(self) -> None:
+        conn = _Conn()
+        records = list(range(5))
+        cursor = _Cursor(records[2:])
+        rows = RowStream(conn, cursor, records[:2], lambda r: f"{r}\n", "h\n", prefetch=2)
+
+        body = "".join([chunk async for chunk in rows])
+        await rows.aclose()
+
+        self.assertEqual(body, "h\n0\n1\n2\n3\n4\n")
+        self.assertEqual(conn.closed, 1)
+
+    async def test_export_connections_are_capped(self) -> None:
+        connects = []
+
+        async def connect(dsn):
+            connects.append(dsn)
+            return _FakeAsyncpgConn()
+
+        with mock.patch.object(pg_stream, "EXPORT_STREAM_MAX_CONNECTIONS", 1), mock.patch.object(
+            pg_stream, "EXPORT_STREAM_ACQUIRE_TIMEOUT_SEC", 0.05
+        ), mock.patch.object(pg_stream, "_slots", {}), mock.patch("asyncpg.connect", connect):
+            first = await pg_stream.open_row_stream("dsn", "SELECT 1", [], str)
+            with self.assertRaises(HTTPException) as ctx:
+                await main._open_row_stream("SELECT 1", [], str)
+            await first.aclose()
+            second = await pg_stream.open_row_stream("dsn", "SELECT 1", [], str)
+            await second.aclose()
+
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertEqual(len(connects), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
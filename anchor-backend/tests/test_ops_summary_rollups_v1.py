@@ -0,0 +1,60 @@
+import re
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import app.main as main
+from db_fakes import pool_getter
+
+
+class _Conn:
+    def __init__(self, rollups=True):
+        self.rollups = rollups
+        self.queries = []
+
+    async def fetchrow(self, sql, *args):
+        self.queries.append(sql)
+        if "domain_event_rollups" in sql:
+            if not self.rollups:
+                raise main.asyncpg.exceptions.UndefinedTableError('relation "domain_event_rollups" does not exist')
+            return {"failed": 2, "policy_block": 5, "exception": 1, "kill_switch_on": 0}
+        return {"cnt": 3}
+
+    async def fetch(self, sql, *args):
+        self.queries.append(sql)
+        return []
+
+
+class OpsSummaryRollupsV1Test(unittest.IsolatedAsyncioTestCase):
+    async def _summary(self, conn):
+        with mock.patch.object(main, "_get_domain_pg_pool", pool_getter(conn)):
+            return await main._ops_summary(minutes=60, limit=10)
+
+    async def test_counts_come_from_one_rollup_query(self) -> None:
+        conn = _Conn()
+
+        out = await self._summary(conn)
+
+        self.assertEqual(out["counts"], {"FAILED": 2, "POLICY_BLOCK": 5, "EXCEPTION": 1, "KILL_SWITCH_ON": 0})
+        count_queries = [q for q in conn.queries if "COUNT(*)" in q or "SUM(cnt)" in q]
+        self.assertEqual(len(count_queries), 1)
+        self.assertNotIn("FROM domain_events", count_queries[0])
+
+    async def test_falls_back_to_event_counts_without_rollup_table(self) -> None:
+        conn = _Conn(rollups=False)
+
+        out = await self._summary(conn)
+
+        self.assertEqual(out["counts"], {"FAILED": 3, "POLICY_BLOCK": 3, "EXCEPTION": 3, "KILL_SWITCH_ON": 3})
+
+    def test_trigger_counts_exactly_the_summary_types(self) -> None:
+        sql = (Path(main.__file__).resolve().parents[1] / "migrations" / "0010_domain_event_rollups.sql").read_text()
+        body = sql.split("FUNCTION domain_event_rollups_track()", 1)[1].split("$$;", 1)[0]
+        filtered = re.search(r"event_type IN \(([^)]*)\)", body).group(1)
+
+        self.assertEqual(set(re.findall(r"'(\w+)'", filtered)), set(main._OPS_SUMMARY_EVENT_TYPES))
+        self.assertIn("ON CONFLICT (bucket, event_type, slot)", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+
+from app.policies.runner import policy_latency, run_policies
+
+
+class _Policy:
+    def __init__(self, name, allowed=True, delay=0.0, error=None):
+        self.name = name
+        self._allowed = allowed
+        self._delay = delay
+        self._error = error
+        self.started = None
+
+    async def check(self, ctx, command_dict, engine):
+        self.started = asyncio.get_running_loop().time()
+        await asyncio.sleep(self._delay)
+        if self._error:
+            raise self._error
+        return {"allowed": self._allowed, "code": "OK" if self._allowed else f"{self.name.upper()}_BLOCK", "message": "", "detail": None}
+
+
+class RunPoliciesConcurrentV1Test(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        policy_latency.reset()
+
+    async def test_first_block_in_declared_order_wins(self) -> None:
+        slow_block = _Policy("slow", allowed=False, delay=0.05)
+        fast_block = _Policy("fast", allowed=False, delay=0.0)
+
+        allowed, decision = await run_policies([slow_block, fast_block], None, {}, object(), mode="concurrent")
+
+        self.assertFalse(allowed)
+        self.assertEqual(decision["code"], "SLOW_BLOCK")
+
+    async def test_checks_run_concurrently(self) -> None:
+        policies = [_Policy(f"p{i}", delay=0.05) for i in range(4)]
+        loop = asyncio.get_running_loop()
+
+        t0 = loop.time()
+        allowed, _ = await run_policies(policies, None, {}, object(), mode="concurrent")
+
+        self.assertTrue(allowed)
+        self.assertLess(loop.time() - t0, 0.15)
+
+    async def test_exception_before_block_allows_like_sequential(self) -> None:
+        policies = [_Policy("boom", error=RuntimeError("db down")), _Policy("block", allowed=False)]
+
+        for mode in ("sequential", "concurrent"):
+            allowed, decision = await run_policies(policies, None, {}, object(), mode=mode)
+            self.assertTrue(allowed, mode)
+            self.assertIsNone(decision, mode)
+
+    async def test_latency_recorded_per_policy(self) -> None:
+        await run_policies([_Policy("a", delay=0.01), _Policy("b")], None, {}, object(), mode="sequential")
+
+        stats = policy_latency.snapshot()
+        self.assertEqual(set(stats), {"a", "b"})
+        self.assertEqual(stats["a"]["count"], 1)
+        self.assertGreaterEqual(stats["a"]["max_ms"], 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from app.db import statements
+from app.db.pool import pool_config
+from app.db.statements import STATEMENTS, asyncpg_sql, register, stmt
+
+
+class PreparedStatementsV1Test(unittest.TestCase):
+    def test_same_clause_every_call(self) -> None:
+        self.assertIs(stmt("pick_batch"), stmt("pick_batch"))
+        self.assertIn(":locked_by", stmt("pick_batch").text)
+        self.assertIn("$5::timestamptz[]", asyncpg_sql("events_insert"))
+
+    def test_engine_and_pool_event_inserts_match(self) -> None:
+        engine_sql = stmt("events_insert").text
+        self.assertEqual(
+            engine_sql.split("FROM unnest")[1].split("WITH ORDINALITY")[1],
+            asyncpg_sql("events_insert").split("FROM unnest")[1].split("WITH ORDINALITY")[1],
+        )
+
+    def test_duplicate_and_unknown_names_fail(self) -> None:
+        with self.assertRaises(ValueError):
+            register("finalize", "SELECT 1")
+        with self.assertRaises(KeyError):
+            stmt("no_such_statement")
+
+    def test_statement_cache_holds_every_registered_statement(self) -> None:
+        total = len(STATEMENTS) + len(statements.ASYNCPG_STATEMENTS)
+        self.assertGreater(pool_config()["statement_cache_size"], total)
+
+    def test_worker_call_sites_use_registry(self) -> None:
+        from app.workers import domain_command_worker
+        from app.policies import builtins
+        from app.risk import hard_limits
+
+        for mod in (domain_command_worker, builtins, hard_limits):
+            self.assertFalse(hasattr(mod, "text"), mod.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
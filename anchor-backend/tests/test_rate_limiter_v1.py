@@ -0,0 +1,72 @@
+import os
+import unittest
+from unittest import mock
+
+from app.policies.builtins import RateLimitPolicy
+from app.policies.rate_limiter import MemorySlidingWindow, SlidingWindowRateLimiter
+
+
+class _Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _ExplodingEngine:
+    def begin(self):
+        raise AssertionError("database must not be queried")
+
+
+class MemorySlidingWindowV1Test(unittest.TestCase):
+    def test_counts_within_window(self) -> None:
+        clock = _Clock(600.0)
+        window = MemorySlidingWindow(60, clock=clock)
+
+        self.assertEqual(window.hit("NOOP"), 1)
+        self.assertEqual(window.hit("NOOP"), 2)
+        self.assertEqual(window.hit("FAIL"), 1)
+
+    def test_previous_window_weighted_by_remaining_fraction(self) -> None:
+        clock = _Clock(600.0)
+        window = MemorySlidingWindow(60, clock=clock)
+        for _ in range(10):
+            window.hit("NOOP")
+
+        clock.now = 600.0 + 60 + 15
+
+        self.assertAlmostEqual(window.hit("NOOP"), 10 * 0.75 + 1)
+
+    def test_windows_older_than_previous_are_dropped(self) -> None:
+        clock = _Clock(600.0)
+        window = MemorySlidingWindow(60, clock=clock)
+        for _ in range(10):
+            window.hit("NOOP")
+
+        clock.now = 600.0 + 180
+
+        self.assertEqual(window.hit("NOOP"), 1)
+
+
+class RateLimitPolicyV1Test(unittest.IsolatedAsyncioTestCase):
+    async def test_blocks_after_limit_without_database(self) -> None:
+        env = {"POLICY_RATE_LIMIT_BACKEND": "memory", "POLICY_RATE_LIMIT_PER_MINUTE_RLTEST": "2"}
+        with mock.patch.dict(os.environ, env), mock.patch(
+            "app.policies.builtins.rate_limiter", SlidingWindowRateLimiter(60)
+        ):
+            policy = RateLimitPolicy()
+            first = await policy.check(None, {"type": "RLTEST"}, _ExplodingEngine())
+            second = await policy.check(None, {"type": "RLTEST"}, _ExplodingEngine())
+            third = await policy.check(None, {"type": "RLTEST"}, _ExplodingEngine())
+
+        self.assertTrue(first["allowed"])
+        self.assertTrue(second["allowed"])
+        self.assertFalse(third["allowed"])
+        self.assertEqual(third["code"], "RATE_LIMIT")
+        self.assertEqual(third["detail"]["backend"], "memory")
+        self.assertEqual(third["detail"]["limit"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+import unittest
+from unittest import mock
+
+from starlette.requests import Request
+
+from app.ops import response_cache as rc
+from app.ops.response_cache import ResponseCache, compute_etag, etag_matches
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _request(if_none_match: str = "") -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/ops/state", "headers": headers})
+
+
+class ResponseCacheV1Test(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.clock = _Clock()
+        self.cache = ResponseCache(clock=self.clock)
+        self.calls = 0
+
+    async def _compute(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"calls": self.calls, "generated_at": f"t{self.calls}"}
+
+    async def test_concurrent_requests_share_one_compute(self) -> None:
+        results = await asyncio.gather(*(self.cache.get("ops_state:", 1.0, self._compute) for _ in range(20)))
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len({body for body, _ in results}), 1)
+
+    async def test_ttl_zero_coalesces_but_does_not_store(self) -> None:
+        await asyncio.gather(*(self.cache.get("risk_state:", 0.0, self._compute) for _ in range(5)))
+        await self.cache.get("risk_state:", 0.0, self._compute)
+
+        self.assertEqual(self.calls, 2)
+
+    async def test_entry_expires_after_ttl(self) -> None:
+        await self.cache.get("ops_summary:30:10", 5.0, self._compute)
+        self.clock.now += 4.9
+        await self.cache.get("ops_summary:30:10", 5.0, self._compute)
+        self.assertEqual(self.calls, 1)
+
+        self.clock.now += 0.2
+        body, _ = await self.cache.get("ops_summary:30:10", 5.0, self._compute)
+        self.assertEqual(json.loads(body)["calls"], 2)
+
+    async def test_invalidate_drops_only_named_endpoints(self) -> None:
+        await self.cache.get("ops_state:", 60.0, self._compute)
+        await self.cache.get("ops_summary:30:10", 60.0, self._compute)
+
+        self.cache.invalidate("ops_state")
+        await self.cache.get("ops_state:", 60.0, self._compute)
+        await self.cache.get("ops_summary:30:10", 60.0, self._compute)
+
+        self.assertEqual(self.calls, 3)
+
+    async def test_compute_error_reaches_every_waiter_and_is_not_cached(self) -> None:
+        async def boom():
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        results = await asyncio.gather(
+            *(self.cache.get("ops_summary:30:10", 5.0, boom) for _ in range(3)), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(self.calls, 1)
+
+        await self.cache.get("ops_summary:30:10", 5.0, self._compute)
+        self.assertEqual(self.calls, 2)
+
+    def test_etag_ignores_generated_at(self) -> None:
+        a = compute_etag({"enabled": True, "generated_at": "2026-01-01T00:00:00Z"})
+        b = compute_etag({"enabled": True, "generated_at": "2026-01-01T00:00:05Z"})
+        c = compute_etag({"enabled": False, "generated_at": "2026-01-01T00:00:05Z"})
+
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+        self.assertTrue(a.startswith('W/"'))
+
+    def test_etag_matching(self) -> None:
+        etag = 'W/"abc"'
+
+        self.assertTrue(etag_matches('W/"abc"', etag))
+        self.assertTrue(etag_matches('"abc"', etag))
+        self.assertTrue(etag_matches('"x", W/"abc"', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches('W/"abd"', etag))
+        self.assertFalse(etag_matches("", etag))
+
+    async def test_unchanged_poll_gets_304_without_body(self) -> None:
+        async def compute():
+            return {"enabled": False, "generated_at": "now"}
+
+        with mock.patch.object(rc, "response_cache", self.cache):
+            first = await rc.cached_json_response(_request(), "ops_state", compute)
+            second = await rc.cached_json_response(_request(first.headers["etag"]), "ops_state", compute)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(json.loads(first.body), {"enabled": False, "generated_at": "now"})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.body, b"")
+        self.assertEqual(second.headers["etag"], first.headers["etag"])
+
+    def test_ttl_from_env(self) -> None:
+        with mock.patch.dict(os.environ, {"RESPONSE_CACHE_TTL_OPS_SUMMARY": "12"}):
+            self.assertEqual(rc.response_cache_ttl("ops_summary"), 12.0)
+        with mock.patch.dict(os.environ, {"RESPONSE_CACHE_DISABLE": "1"}):
+            self.assertEqual(rc.response_cache_ttl("ops_summary"), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
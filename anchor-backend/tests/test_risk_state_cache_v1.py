@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+
+from app.risk.state_cache import RISK_STATE_CHANNEL, RiskStateCache, RiskStateListener
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RiskStateCacheV1Test(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.clock = _Clock()
+        self.cache = RiskStateCache(ttl_sec=5.0, clock=self.clock)
+        self.calls = 0
+
+    async def _compute(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return {"status": "OK", "consecutive_losses": self.calls}
+
+    async def test_snapshot_reused_within_ttl(self) -> None:
+        first = await self.cache.get(self._compute)
+        self.clock.now += 4.9
+        second = await self.cache.get(self._compute)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        self.clock.now += 0.2
+        third = await self.cache.get(self._compute)
+        self.assertEqual(third["consecutive_losses"], 2)
+
+    async def test_notify_invalidates_snapshot(self) -> None:
+        await self.cache.get(self._compute)
+
+        # asyncpg listener callback signature: (connection, pid, channel, payload)
+        self.cache.invalidate(None, 123, RISK_STATE_CHANNEL, "MARK_FAILED")
+        value = await self.cache.get(self._compute)
+
+        self.assertEqual(value["consecutive_losses"], 2)
+
+    async def test_concurrent_callers_share_one_compute(self) -> None:
+        results = await asyncio.gather(*(self.cache.get(self._compute) for _ in range(10)))
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    async def test_invalidation_during_compute_is_not_stored(self) -> None:
+        async def compute():
+            self.calls += 1
+            self.cache.invalidate()
+            return {"status": "OK", "consecutive_losses": self.calls}
+
+        await self.cache.get(compute)
+        await self.cache.get(compute)
+
+        self.assertEqual(self.calls, 2)
+
+    async def test_degraded_result_not_cached(self) -> None:
+        async def compute():
+            self.calls += 1
+            return {"status": "UNKNOWN"}
+
+        await self.cache.get(compute)
+        await self.cache.get(compute)
+
+        self.assertEqual(self.calls, 2)
+
+    async def test_zero_ttl_disables_cache(self) -> None:
+        cache = RiskStateCache(ttl_sec=0.0, clock=self.clock)
+
+        await cache.get(self._compute)
+        await cache.get(self._compute)
+
+        self.assertEqual(self.calls, 2)
+
+    async def test_listener_without_dsn_does_not_listen(self) -> None:
+        listener = RiskStateListener("", self.cache)
+
+        self.assertFalse(await listener.start())
+        self.assertFalse(listener.listening)
+        await listener.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+
+from app.executors.production_order_executor import signing_timestamp_ms
+from app.executors.server_time import ServerTimeTracker
+
+URL = "https://testnet.binancefuture.com/fapi/v1/time"
+
+
+class _Exchange:
+    """Fake clock pair: local monotonic seconds and an exchange clock offset (and optionally skewed) from it."""
+
+    def __init__(self, offset_ms: float, rtt_ms: float = 20.0, drift_ppm: float = 0.0) -> None:
+        self.now = 1000.0
+        self.offset_ms = offset_ms
+        self.rtt_ms = rtt_ms
+        self.drift_ppm = drift_ppm
+        self.request_share = 0.5
+        self.calls = 0
+        self.down = False
+
+    def clock(self) -> float:
+        return self.now
+
+    def server_ms(self) -> float:
+        return self.now * 1000.0 * (1 + self.drift_ppm / 1e6) + self.offset_ms
+
+    def fetch(self, url):
+        self.calls += 1
+        if self.down:
+            self.now += self.rtt_ms / 1000.0
+            return None
+        self.now += self.rtt_ms * self.request_share / 1000.0
+        server = int(self.server_ms())
+        self.now += self.rtt_ms * (1 - self.request_share) / 1000.0
+        return server
+
+
+def _tracker(ex: _Exchange, **kw) -> ServerTimeTracker:
+    opts = dict(refresh_sec=30.0, max_age_sec=120.0, max_rtt_ms=1000.0, window=8, drift_min_span_sec=60.0)
+    opts.update(kw)
+    return ServerTimeTracker(fetch=ex.fetch, clock=ex.clock, **opts)
+
+
+class ServerTimeOffsetV1Test(unittest.TestCase):
+    def test_cold_call_samples_then_answers_locally(self) -> None:
+        ex = _Exchange(offset_ms=-1500.0)
+        tracker = _tracker(ex)
+
+        first = tracker.timestamp_ms(URL, fallback_ms=1)
+        ex.now += 5.0
+        second = tracker.timestamp_ms(URL, fallback_ms=1)
+
+        self.assertEqual(ex.calls, 1)
+        self.assertEqual(first, int(ex.server_ms() - 5000.0 - 10.0))
+        self.assertLessEqual(abs(second - ex.server_ms()), 1)
+        stats = tracker.stats()["endpoints"][URL]
+        self.assertEqual((stats["syncs"], stats["hits"], stats["samples"]), (1, 1, 1))
+
+    def test_lowest_rtt_sample_wins(self) -> None:
+        ex = _Exchange(offset_ms=250.0, rtt_ms=400.0)
+        tracker = _tracker(ex)
+        tracker.sample(URL)
+        ex.rtt_ms = 10.0
+        ex.now += 1.0
+        tracker.sample(URL)
+        ex.rtt_ms, ex.request_share = 600.0, 0.1
+        ex.now += 1.0
+        # Asymmetric slow sample: its midpoint is 240 ms off the instant the server read its clock.
+        tracker.sample(URL)
+
+        self.assertLessEqual(abs(tracker.estimate_ms(URL) - ex.server_ms()), 5)
+        self.assertEqual(tracker.stats()["endpoints"][URL]["min_rtt_ms"], 10.0)
+
+    def test_drift_is_fitted_and_extrapolated(self) -> None:
+        ex = _Exchange(offset_ms=0.0, drift_ppm=200.0)
+        tracker = _tracker(ex)
+        for _ in range(5):
+            tracker.sample(URL)
+            ex.now += 30.0
+
+        ex.now += 20.0
+        self.assertAlmostEqual(tracker.stats()["endpoints"][URL]["drift_ppm"], 200.0, delta=5.0)
+        self.assertLessEqual(abs(tracker.estimate_ms(URL) - ex.server_ms()), 2)
+
+    def test_stale_estimate_resamples_and_failure_falls_back(self) -> None:
+        ex = _Exchange(offset_ms=100.0)
+        tracker = _tracker(ex)
+        tracker.timestamp_ms(URL, fallback_ms=1)
+        ex.now += 121.0
+        self.assertIsNone(tracker.estimate_ms(URL))
+
+        ex.down = True
+        self.assertEqual(tracker.timestamp_ms(URL, fallback_ms=42), 42)
+        ex.down = False
+        tracker.timestamp_ms(URL, fallback_ms=42)
+
+        stats = tracker.stats()["endpoints"][URL]
+        self.assertEqual((ex.calls, stats["fallbacks"], stats["failures"], stats["syncs"]), (3, 1, 1, 2))
+
+    def test_slow_samples_are_not_kept(self) -> None:
+        ex = _Exchange(offset_ms=0.0, rtt_ms=1500.0)
+        tracker = _tracker(ex)
+
+        # The synchronous sample still signs with serverTime, but does not become the estimate.
+        self.assertIsNotNone(tracker.timestamp_ms(URL, fallback_ms=7))
+        self.assertIsNone(tracker.estimate_ms(URL))
+        self.assertEqual(tracker.stats()["endpoints"][URL]["rejected"], 1)
+
+    def test_refresh_due_samples_known_endpoints_only_when_due(self) -> None:
+        ex = _Exchange(offset_ms=0.0)
+        tracker = _tracker(ex)
+        self.assertFalse(tracker.due())
+        tracker.timestamp_ms(URL, fallback_ms=1)
+        self.assertFalse(tracker.due())
+
+        ex.now += 31.0
+        self.assertTrue(tracker.due())
+        self.assertEqual(tracker.refresh_due(), 1)
+        self.assertEqual(tracker.refresh_due(), 0)
+        self.assertEqual(ex.calls, 2)
+
+    def test_production_signing_uses_tracker_only_for_real_sends(self) -> None:
+        creds = {"base_url": "https://api.binance.com", "api_key": "k", "api_secret": "s"}
+
+        self.assertEqual(signing_timestamp_ms(creds, 123, transport_enabled=False, opener=None), 123)
+        self.assertEqual(signing_timestamp_ms(creds, 123, transport_enabled=True, opener=object()), 123)
+        self.assertEqual(
+            signing_timestamp_ms(dict(creds, base_url="https://evil.example"), 123, transport_enabled=True, opener=None),
+            123,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from app.ops import notify
+from app.ops.notify import TelegramDispatcher, _post_telegram
+
+
+class _TelegramStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.lock:
+            server.hits += 1
+            status, payload = server.script.pop(0) if server.script else (200, {"ok": True})
+            if status == 200:
+                server.delivered.append(body["text"])
+        if server.delay:
+            time.sleep(server.delay)
+        raw = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+def _wait(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TelegramDispatcherV1Test(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _TelegramStub)
+        cls.server.lock = threading.Lock()
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        self.server.script = []
+        self.server.delivered = []
+        self.server.hits = 0
+        self.server.delay = 0.0
+        env = {
+            "TELEGRAM_NOTIFY_ENABLED": "1",
+            "TELEGRAM_BOT_TOKEN": "t",
+            "TELEGRAM_CHAT_ID": "c",
+            "TELEGRAM_API_BASE": f"http://127.0.0.1:{self.server.server_address[1]}",
+        }
+        env_patch = mock.patch.dict(os.environ, env)
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+        self.now = 1000.0
+        self.dispatcher = TelegramDispatcher(
+            maxsize=8, throttle_sec=60.0, max_retries=2, backoff_sec=0.01, clock=lambda: self.now
+        )
+        self.addCleanup(self.dispatcher.close)
+
+    def test_send_telegram_returns_before_delivery(self) -> None:
+        self.server.delay = 0.3
+        with mock.patch.object(notify, "_dispatcher", self.dispatcher):
+            t0 = time.perf_counter()
+            notify.send_telegram("[EXCEPTION] id=c1", throttle_key="EXCEPTION")
+            elapsed = time.perf_counter() - t0
+
+        self.assertLess(elapsed, 0.1)
+        self.assertTrue(_wait(lambda: self.server.delivered == ["[EXCEPTION] id=c1"]))
+
+    def test_alerts_within_window_become_one_digest(self) -> None:
+        for i in range(4):
+            self.dispatcher.submit(f"[POLICY_BLOCK] id=c{i}", "POLICY_BLOCK")
+        self.dispatcher.submit("[EXCEPTION] id=x", "EXCEPTION")
+
+        self.assertTrue(self.dispatcher.drain())
+        self.assertEqual(self.server.delivered, ["[POLICY_BLOCK] id=c0", "[EXCEPTION] id=x"])
+        self.now += 61.0
+
+        self.assertTrue(_wait(lambda: len(self.server.delivered) == 3))
+        first, other, digest = self.server.delivered
+        self.assertEqual((first, other), ("[POLICY_BLOCK] id=c0", "[EXCEPTION] id=x"))
+        self.assertTrue(digest.startswith("[digest POLICY_BLOCK] 3 alerts in "))
+        self.assertIn("[POLICY_BLOCK] id=c3", digest)
+        stats = self.dispatcher.stats()
+        self.assertEqual((stats["sent"], stats["coalesced"], stats["digests"]), (3, 3, 1))
+
+    def test_retries_5xx_and_429_then_gives_up_on_4xx(self) -> None:
+        self.server.script = [
+            (500, {"ok": False}),
+            (429, {"ok": False, "parameters": {"retry_after": 0}}),
+        ]
+        self.dispatcher.submit("retry me", "A")
+        self.assertTrue(_wait(lambda: self.server.delivered == ["retry me"]))
+        self.assertEqual(self.dispatcher.stats()["retries"], 2)
+
+        self.server.script = [(403, {"ok": False, "description": "bot was blocked"})]
+        with mock.patch("builtins.print"):
+            self.dispatcher.submit("blocked", "B")
+            self.assertTrue(_wait(lambda: self.dispatcher.stats()["failed"] == 1))
+        self.assertEqual(self.server.hits, 4)
+
+    def test_full_queue_drops_and_counts(self) -> None:
+        entered, gate = threading.Event(), threading.Event()
+
+        def slow_send(text):
+            entered.set()
+            return (gate.wait(2.0), False, None)
+
+        dispatcher = TelegramDispatcher(send=slow_send, maxsize=2, throttle_sec=0.0)
+        self.addCleanup(dispatcher.close)
+        self.addCleanup(gate.set)
+
+        self.assertTrue(dispatcher.submit("m0", "k0"))
+        self.assertTrue(entered.wait(2.0))
+        with mock.patch("builtins.print"):
+            results = [dispatcher.submit(f"m{i}", f"k{i}") for i in range(1, 5)]
+        gate.set()
+
+        # One alert is with the sender, two fit in the queue, the rest are dropped.
+        self.assertEqual(results, [True, True, False, False])
+        self.assertTrue(_wait(lambda: dispatcher.stats()["sent"] == 3))
+        self.assertEqual(dispatcher.stats()["dropped"], 2)
+
+    def test_alerts_queued_behind_a_slow_send_are_coalesced(self) -> None:
+        entered, gate, sent = threading.Event(), threading.Event(), []
+
+        def slow_send(text):
+            if not sent:
+                entered.set()
+                gate.wait(2.0)
+                self.now += 5.0  # the first send outlasts the window
+            sent.append(text)
+            return (True, False, None)
+
+        dispatcher = TelegramDispatcher(send=slow_send, throttle_sec=1.0, clock=lambda: self.now)
+        self.addCleanup(dispatcher.close)
+        dispatcher.submit("a0", "K")
+        self.assertTrue(entered.wait(2.0))
+        for i in range(1, 4):
+            dispatcher.submit(f"a{i}", "K")
+        gate.set()
+
+        self.assertTrue(dispatcher.drain())
+        self.assertEqual(sent, ["a0"])
+        self.assertEqual(dispatcher.stats()["coalesced"], 3)
+        self.now += 1.0
+        self.assertTrue(_wait(lambda: len(sent) == 2))
+        self.assertTrue(sent[1].startswith("[digest K] 3 alerts"))
+
+    def test_close_sends_pending_digest(self) -> None:
+        self.dispatcher.submit("first", "K")
+        self.dispatcher.submit("second", "K")
+        self.assertTrue(self.dispatcher.drain())
+        self.dispatcher.close()
+
+        self.assertEqual(self.server.delivered[0], "first")
+        self.assertTrue(self.server.delivered[1].startswith("[digest K] 1 alerts"))
+
+    def test_close_telegram_dispatcher_flushes_the_process_dispatcher(self) -> None:
+        with mock.patch.object(notify, "_dispatcher", None):
+            notify.close_telegram_dispatcher()
+        self.dispatcher.throttle_sec = 60.0
+        self.dispatcher.submit("first", "K")
+        self.dispatcher.submit("second", "K")
+        with mock.patch.object(notify, "_dispatcher", self.dispatcher):
+            notify.close_telegram_dispatcher()
+
+        self.assertEqual(len(self.server.delivered), 2)
+        self.assertEqual(self.dispatcher.stats()["pending_digests"], 0)
+
+    def test_disabled_is_a_no_op(self) -> None:
+        with mock.patch.dict(os.environ, {"TELEGRAM_NOTIFY_ENABLED": "0"}), mock.patch.object(
+            notify, "_dispatcher", self.dispatcher
+        ):
+            notify.send_telegram("x")
+        self.assertEqual(self.dispatcher.stats()["enqueued"], 0)
+        self.assertEqual(_post_telegram("direct")[0], True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ import unittest
 import urllib.error
 from unittest.mock import patch
 
+from app.executors.server_time import get_server_time_tracker
 from app.executors.testnet_order_executor import run_real_testnet_order_request
 
 
@@ -46,6 +47,10 @@ class _FakeResponse:
 
 
 class TestnetRealWireV1Test(unittest.TestCase):
+    def setUp(self):
+        # Each case starts without a clock-offset estimate, so the signing path samples /time.
+        get_server_time_tracker().reset()
+
     def test_helper_stays_disabled_without_explicit_enable(self):
         with patch.dict(os.environ, {}, clear=False):
             out, requested, terminal_type, terminal_payload = run_real_testnet_order_request(
@@ -79,7 +84,7 @@ class TestnetRealWireV1Test(unittest.TestCase):
                 "TESTNET_EXCHANGE_API_SECRET": "real-secret",
             },
             clear=False,
-        ), patch("app.executors.testnet_order_executor.urllib.request.urlopen", side_effect=_fake_urlopen):
+        ), patch("app.executors.testnet_order_executor.exchange_urlopen", side_effect=_fake_urlopen):
             out, requested, terminal_type, terminal_payload = run_real_testnet_order_request(
                 _transport_input(),
                 456,
@@ -122,7 +127,7 @@ class TestnetRealWireV1Test(unittest.TestCase):
                 "TESTNET_EXCHANGE_API_SECRET": "real-secret",
             },
             clear=False,
-        ), patch("app.executors.testnet_order_executor.urllib.request.urlopen", side_effect=_fake_urlopen):
+        ), patch("app.executors.testnet_order_executor.exchange_urlopen", side_effect=_fake_urlopen):
             out, requested, terminal_type, terminal_payload = run_real_testnet_order_request(
                 _transport_input(),
                 456,
@@ -154,7 +159,7 @@ class TestnetRealWireV1Test(unittest.TestCase):
             },
             clear=False,
         ), patch(
-            "app.executors.testnet_order_executor.urllib.request.urlopen",
+            "app.executors.testnet_order_executor.exchange_urlopen",
             side_effect=_fake_urlopen,
         ):
             out, requested, terminal_type, terminal_payload = run_real_testnet_order_request(
@@ -183,7 +188,7 @@ class TestnetRealWireV1Test(unittest.TestCase):
             },
             clear=False,
         ), patch(
-            "app.executors.testnet_order_executor.urllib.request.urlopen",
+            "app.executors.testnet_order_executor.exchange_urlopen",
             side_effect=_fake_urlopen,
         ):
             out, requested, terminal_type, terminal_payload = run_real_testnet_order_request(
@@ -35,6 +35,7 @@ DEFAULT_HTTP_TIMEOUT_SECONDS = 10.0
 
 sys.path.insert(0, str(ROOT / "anchor-backend"))
 
+from app.executors.http_transport import exchange_urlopen  # noqa: E402
 from app.executors.production_credentials import (  # noqa: E402
     load_production_credentials,
     redacted_credential_shape,
@@ -96,7 +97,7 @@ def signed_get(
         method="GET",
         headers={"X-MBX-APIKEY": api_key},
     )
-    open_call = opener or urllib.request.urlopen
+    open_call = opener or exchange_urlopen
     try:
         with open_call(request, timeout=timeout_seconds) as response:
             status = int(getattr(response, "status", 200))
@@ -85,6 +85,64 @@ if [ -f "$MIGRATION_OPS_STATE" ]; then
   docker compose -f "$BACKEND_DIR/docker-compose.yml" exec -T postgres psql -U "$PG_USER" -d "$PG_DB" -v ON_ERROR_STOP=1 < "$MIGRATION_OPS_STATE"
   echo "OK: ops_state migration applied"
 fi
+
+# Apply terminal ledger migration (worker pick/finalize read and write it)
+MIGRATION_TERMINALS="${MIGRATION_TERMINALS:-$BACKEND/migrations/0007_domain_command_terminals.sql}"
+if [ -f "$MIGRATION_TERMINALS" ]; then
+  echo "Applying migration 0007_domain_command_terminals..."
+  docker compose -f "$BACKEND_DIR/docker-compose.yml" exec -T postgres psql -U "$PG_USER" -d "$PG_DB" -v ON_ERROR_STOP=1 < "$MIGRATION_TERMINALS"
+  echo "OK: domain_command_terminals migration applied"
+fi
+
+# Apply exposure ledger migration (risk_guard reads risk_exposure)
+MIGRATION_EXPOSURE="${MIGRATION_EXPOSURE:-$BACKEND/migrations/0008_risk_exposure_ledger.sql}"
+if [ -f "$MIGRATION_EXPOSURE" ]; then
+  echo "Applying migration 0008_risk_exposure_ledger..."
+  docker compose -f "$BACKEND_DIR/docker-compose.yml" exec -T postgres psql -U "$PG_USER" -d "$PG_DB" -v ON_ERROR_STOP=1 < "$MIGRATION_EXPOSURE"
+  echo "OK: risk_exposure migration applied"
+fi
+
+# Apply sharded exposure reservations migration (RISK_EXPOSURE_ATOMIC=1 reserves per symbol)
+MIGRATION_EXPOSURE_SHARDS="${MIGRATION_EXPOSURE_SHARDS:-$BACKEND/migrations/0009_risk_exposure_shards.sql}"
+if [ -f "$MIGRATION_EXPOSURE_SHARDS" ]; then
+  echo "Applying migration 0009_risk_exposure_shards..."
+  docker compose -f "$BACKEND_DIR/docker-compose.yml" exec -T postgres psql -U "$PG_USER" -d "$PG_DB" -v ON_ERROR_STOP=1 < "$MIGRATION_EXPOSURE_SHARDS"
+  echo "OK: risk_exposure_shards migration applied"
+fi
+
+# Apply event rollups migration (/ops/summary reads domain_event_rollups)
+MIGRATION_EVENT_ROLLUPS="${MIGRATION_EVENT_ROLLUPS:-$BACKEND/migrations/0010_domain_event_rollups.sql}"
+if [ -f "$MIGRATION_EVENT_ROLLUPS" ]; then
+  echo "Applying migration 0010_domain_event_rollups..."
+  docker compose -f "$BACKEND_DIR/docker-compose.yml" exec -T postgres psql -U "$PG_USER" -d "$PG_DB" -v ON_ERROR_STOP=1 < "$MIGRATION_EVENT_ROLLUPS"
+  echo "OK: domain_event_rollups migration applied"
+fi
+
+# Apply keyset pagination indexes (/domain-commands and events ?before= / ?after= cursors)
+MIGRATION_KEYSET="${MIGRATION_KEYSET:-$BACKEND/migrations/0011_commands_domain_keyset.sql}"
+if [ -f "$MIGRATION_KEYSET" ]; then
+  echo "Applying migration 0011_commands_domain_keyset..."
+  docker compose -f "$BACKEND_DIR/docker-compose.yml" exec -T postgres psql -U "$PG_USER" -d "$PG_DB" -v ON_ERROR_STOP=1 < "$MIGRATION_KEYSET"
+  echo "OK: keyset indexes applied"
+fi
+MIGRATION_RISK_NOTIFY="${MIGRATION_RISK_NOTIFY:-$BACKEND/migrations/0012_risk_state_notify.sql}"
+if [ -f "$MIGRATION_RISK_NOTIFY" ]; then
+  echo "Applying migration 0012_risk_state_notify..."
+  docker compose -f "$BACKEND_DIR/docker-compose.yml" exec -T postgres psql -U "$PG_USER" -d "$PG_DB" -v ON_ERROR_STOP=1 < "$MIGRATION_RISK_NOTIFY"
+  echo "OK: risk_state notify triggers applied"
+fi
+MIGRATION_EVENTS_NOTIFY="${MIGRATION_EVENTS_NOTIFY:-$BACKEND/migrations/0013_domain_events_notify.sql}"
+if [ -f "$MIGRATION_EVENTS_NOTIFY" ]; then
+  echo "Applying migration 0013_domain_events_notify..."
+  docker compose -f "$BACKEND_DIR/docker-compose.yml" exec -T postgres psql -U "$PG_USER" -d "$PG_DB" -v ON_ERROR_STOP=1 < "$MIGRATION_EVENTS_NOTIFY"
+  echo "OK: domain_events notify trigger applied"
+fi
+MIGRATION_EVENTS_PARTITIONED="${MIGRATION_EVENTS_PARTITIONED:-$BACKEND/migrations/0014_domain_events_partitioned.sql}"
+if [ -f "$MIGRATION_EVENTS_PARTITIONED" ]; then
+  echo "Applying migration 0014_domain_events_partitioned..."
+  docker compose -f "$BACKEND_DIR/docker-compose.yml" exec -T postgres psql -U "$PG_USER" -d "$PG_DB" -v ON_ERROR_STOP=1 < "$MIGRATION_EVENTS_PARTITIONED"
+  echo "OK: domain_events partitioned by day"
+fi
 echo
 
 echo "=============================="